@@ -0,0 +1,136 @@
+import argparse
+import sys
+from datetime import date
+from typing import List, Optional
+
+from app.configuration.configuration import settings
+from app.core.dabatase import SessionLocal, engine
+
+
+def rebuild_efficiency(args: argparse.Namespace) -> int:
+    from app.service.AnalyticsService import AnalyticsService
+
+    with SessionLocal() as db:
+        inserted = AnalyticsService(db).rebuild_efficiency(start=args.start, end=args.end)
+    print(f"vehicle_daily_efficiency: {inserted} filas reconstruidas")
+    return 0
+
+
+def migrate(args: argparse.Namespace) -> int:
+    from app.core.schema import migrate as apply_migration
+
+    with engine.begin() as connection:
+        version = apply_migration(connection)
+    print(f"schema_version: {version}")
+    return 0
+
+
+def sync_indexes(args: argparse.Namespace) -> int:
+    from app.core.schema import sync_indexes as apply_indexes
+
+    with engine.begin() as connection:
+        for name in apply_indexes(connection, drop_obsolete=not args.keep_obsolete):
+            print(name)
+    return 0
+
+
+def ensure_partitions(args: argparse.Namespace) -> int:
+    from app.core.partitions import ensure_partitions as create_partitions
+
+    with engine.begin() as connection:
+        for name in create_partitions(connection, ahead=args.ahead):
+            print(name)
+    return 0
+
+
+def partition_performances(args: argparse.Namespace) -> int:
+    from app.core.partitions import partition_existing_table
+
+    with engine.begin() as connection:
+        moved = partition_existing_table(connection)
+    print(f"performances: {moved} filas movidas a la tabla particionada")
+    return 0
+
+
+def archive_performances(args: argparse.Namespace) -> int:
+    from app.core.partitions import apply_retention, export_file
+
+    exporter = export_file(args.export_dir) if args.export_dir else None
+    with engine.begin() as connection:
+        moved = apply_retention(connection, args.keep_months, archive=args.mode == "archive", exporter=exporter)
+    for name, rows in moved:
+        print(f"{name}: {rows} filas")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Tareas administrativas de IntegriApp")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-efficiency",
+        help="Reconstruye el rollup diario de rendimiento a partir de performances"
+    )
+    rebuild.add_argument("--start", type=date.fromisoformat, help="Primer día a reconstruir (YYYY-MM-DD)")
+    rebuild.add_argument("--end", type=date.fromisoformat, help="Último día a reconstruir (YYYY-MM-DD)")
+    rebuild.set_defaults(handler=rebuild_efficiency)
+
+    migration = commands.add_parser(
+        "migrate",
+        help="Crea tablas e índices faltantes y registra la versión de esquema que verifica el arranque"
+    )
+    migration.set_defaults(handler=migrate)
+
+    indexes = commands.add_parser(
+        "sync-indexes",
+        help="Crea los índices declarados en los modelos que falten en una base existente"
+    )
+    indexes.add_argument(
+        "--keep-obsolete",
+        action="store_true",
+        help="No elimina los índices de columna que reemplazan los compuestos"
+    )
+    indexes.set_defaults(handler=sync_indexes)
+
+    partitions = commands.add_parser(
+        "ensure-partitions",
+        help="Crea las particiones mensuales de performances del mes actual y los siguientes"
+    )
+    partitions.add_argument("--ahead", type=int, help="Meses a crear por adelantado")
+    partitions.set_defaults(handler=ensure_partitions)
+
+    partitioning = commands.add_parser(
+        "partition-performances",
+        help="Convierte una tabla performances existente en particionada por mes"
+    )
+    partitioning.set_defaults(handler=partition_performances)
+
+    retention = commands.add_parser(
+        "archive-performances",
+        help="Saca de la tabla caliente los performances fuera de la ventana de retención"
+    )
+    retention.add_argument(
+        "--keep-months",
+        type=int,
+        default=settings.performance_retention_months,
+        help="Meses completos que se conservan además del actual"
+    )
+    retention.add_argument(
+        "--mode",
+        choices=("archive", "drop"),
+        default="archive",
+        help="archive los copia a performances_archive; drop sólo los elimina"
+    )
+    retention.add_argument("--export-dir", help="Directorio donde escribir un .ndjson.gz por partición o lote")
+    retention.set_defaults(handler=archive_performances)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
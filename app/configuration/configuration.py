@@ -1,14 +1,73 @@
+from typing import Literal, Optional
+
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
 
     database_url: str
+    database_mode: Literal["sync", "async"] = "sync"
+    async_database_url: Optional[str] = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_warmup: int = 1
+    db_connection_budget: int = 0
+    database_replica_urls: str = ""
+    async_database_replica_urls: str = ""
+    db_replica_retry_seconds: float = 30.0
+    read_your_writes_seconds: float = 5.0
+    schema_check: Literal["strict", "warn", "off"] = "warn"
+    warmup_statements: bool = True
+    startup_timeout_seconds: float = 10.0
+    bulk_import_chunk_size: int = 1000
+    bulk_import_max_errors: int = 1000
+    batch_complete_max_items: int = 5000
+    batch_get_max_ids: int = 5000
+    export_batch_size: int = 1000
+    completion_write_behind: bool = False
+    write_behind_flush_ms: int = 200
+    write_behind_batch_size: int = 500
+    write_behind_queue_size: int = 10000
+    write_behind_journal_dir: str = ""
+    write_behind_journal_fsync: bool = False
+    write_behind_status_ttl_seconds: float = 3600.0
+    performance_partitioning: bool = False
+    performance_partitions_ahead: int = 2
+    performance_partition_check_hours: float = 24.0
+    performance_retention_months: int = 12
+    search_backend: Literal["auto", "database", "memory"] = "auto"
+    search_max_candidates: int = 1000
+    search_index_check_seconds: float = 5.0
+    cache_backend: Literal["auto", "memory", "redis", "none"] = "auto"
+    cache_ttl_seconds: float = 60.0
+    cache_max_entries: int = 10000
+    cache_redis_url: str = Field("", validation_alias=AliasChoices("cache_redis_url", "redis_url"))
+    count_cache_ttl_seconds: float = 30.0
+    count_cache_max_entries: int = 1000
+    events_transport: Literal["auto", "memory", "postgres"] = "auto"
+    events_queue_size: int = 256
+    events_heartbeat_seconds: float = 15.0
+    events_stream_max_seconds: float = 300.0
+    events_retry_ms: int = 2000
+    request_timing_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
     app_name: str = "IntegriApp"
     app_version: str = "1.0.0"
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    web_workers: int = 0
+    web_preload: bool = True
+    web_loop: Literal["auto", "uvloop", "asyncio"] = "auto"
+    web_http: Literal["auto", "httptools", "h11"] = "auto"
+    web_max_requests: int = 10000
+    web_max_requests_jitter: int = 1000
+    web_timeout: int = 60
+    web_graceful_timeout: int = 30
 
 
     model_config = SettingsConfigDict(
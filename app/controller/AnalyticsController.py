@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from app.core.dabatase import get_read_db
+from app.service.AnalyticsService import AnalyticsService
+from app.schema.Efficiency import EfficiencyBucketSize, EfficiencyResponse
+
+
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["analytics"]
+)
+
+
+def get_analytics_service(db: Session = Depends(get_read_db)) -> AnalyticsService:
+    return AnalyticsService(db)
+
+
+@router.get("/vehicles/{vehicle_id}/efficiency", response_model=EfficiencyResponse)
+def get_vehicle_efficiency(
+    vehicle_id: int,
+    start: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    end: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    bucket: EfficiencyBucketSize = Query("day", description="Agrupación temporal: day, week o month"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    return service.get_vehicle_efficiency(vehicle_id, start=start, end=end, bucket=bucket)
+
+
+@router.get("/fleet/efficiency", response_model=EfficiencyResponse)
+def get_fleet_efficiency(
+    start: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    end: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    bucket: EfficiencyBucketSize = Query("day", description="Agrupación temporal: day, week o month"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    return service.get_fleet_efficiency(start=start, end=end, bucket=bucket)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
+
+from app.core.dabatase import get_async_read_db
+from app.service.AsyncAnalyticsService import AsyncAnalyticsService
+from app.schema.Efficiency import EfficiencyBucketSize, EfficiencyResponse
+
+
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["analytics"]
+)
+
+
+def get_analytics_service(db: AsyncSession = Depends(get_async_read_db)) -> AsyncAnalyticsService:
+    return AsyncAnalyticsService(db)
+
+
+@router.get("/vehicles/{vehicle_id}/efficiency", response_model=EfficiencyResponse)
+async def get_vehicle_efficiency(
+    vehicle_id: int,
+    start: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    end: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    bucket: EfficiencyBucketSize = Query("day", description="Agrupación temporal: day, week o month"),
+    service: AsyncAnalyticsService = Depends(get_analytics_service)
+):
+    return await service.get_vehicle_efficiency(vehicle_id, start=start, end=end, bucket=bucket)
+
+
+@router.get("/fleet/efficiency", response_model=EfficiencyResponse)
+async def get_fleet_efficiency(
+    start: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    end: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    bucket: EfficiencyBucketSize = Query("day", description="Agrupación temporal: day, week o month"),
+    service: AsyncAnalyticsService = Depends(get_analytics_service)
+):
+    return await service.get_fleet_efficiency(start=start, end=end, bucket=bucket)
@@ -0,0 +1,196 @@
+from fastapi import APIRouter, Body, Depends, status, Query, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.dabatase import get_async_read_db, get_async_write_db
+from app.service.AsyncRouteService import AsyncRouteService
+from app.schema.Route import (
+    RouteBatchResponse,
+    RouteCreate,
+    RouteExpandedResponse,
+    RouteUpdate,
+    RouteResponse,
+    route_response_model,
+)
+from app.schema.RouteComplete import RouteComplete, RouteCompleteItem, RouteCompleteBatchResponse, RouteCompletionStatus
+from app.configuration.configuration import settings
+from app.enum.RouteExpansion import RouteExpansion
+from app.enum.RouteStatus import RouteStatus
+from app.core.counting import CountMode, set_total_count
+from app.core.expand import parse_expand
+from app.core.events import SSE_HEADERS, sse_stream, websocket_stream
+from app.core.pagination import set_next_cursor
+from app.core.serialization import list_response, model_response
+from app.core.etag import (
+    ROUTE_VERSION_FIELDS,
+    compute_etag,
+    entity_etag,
+    etag_matches,
+    expanded_versions,
+    has_conditional_header,
+    not_modified,
+    set_etag,
+)
+
+EXPAND_DESCRIPTION = "Relaciones a incluir, separadas por coma: vehicle, performance"
+
+router = APIRouter(
+    prefix="/api/routes",
+    tags=["routes"]
+)
+
+
+def get_route_service(db: AsyncSession = Depends(get_async_write_db)) -> AsyncRouteService:
+    return AsyncRouteService(db)
+
+
+def get_route_read_service(db: AsyncSession = Depends(get_async_read_db)) -> AsyncRouteService:
+    return AsyncRouteService(db)
+
+
+@router.get("/", response_model=List[RouteExpandedResponse])
+async def get_all_routes(
+    request: Request,
+    skip: int = Query(0, ge=0, description="Número de registros a omitir"),
+    limit: int = Query(100, ge=1, le=500, description="Límite de registros"),
+    status: Optional[RouteStatus] = Query(None, description="Estado de la ruta"),
+    vehicle_id: Optional[int] = Query(None, description="ID del vehículo"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente (X-Next-Cursor)"),
+    count: CountMode = Query("none", description="Total en X-Total-Count: exact, estimated (estadísticas del planner) o none"),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    service: AsyncRouteService = Depends(get_route_read_service)
+):
+    expansions = parse_expand(expand, RouteExpansion)
+    expanded = sorted(expansion.value for expansion in expansions)
+    # Las versiones de la ruta no cubren lo embebido: con expand el ETag se calcula sobre la página cargada
+    if has_conditional_header(request) and not expansions:
+        versions = await service.get_route_versions(
+            skip=skip,
+            limit=limit,
+            status=status,
+            vehicle_id=vehicle_id,
+            cursor=cursor
+        )
+        etag = compute_etag(versions, "routes", limit)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    routes = await service.get_all_routes(
+        skip=skip,
+        limit=limit,
+        status=status,
+        vehicle_id=vehicle_id,
+        cursor=cursor,
+        expand=expansions
+    )
+    etag = compute_etag(expanded_versions(routes, ROUTE_VERSION_FIELDS, expanded), "routes", limit, *expanded)
+    if expansions and etag_matches(request, etag):
+        return not_modified(etag)
+
+    payload = list_response(route_response_model(expansions), routes)
+    set_next_cursor(payload, routes, limit, "id")
+    set_etag(payload, etag)
+    set_total_count(payload, await service.count_routes(count, status=status, vehicle_id=vehicle_id))
+    return payload
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_route_events(
+    vehicle_id: Optional[int] = Query(None, description="Sólo eventos de este vehículo"),
+    status: Optional[List[RouteStatus]] = Query(None, description="Sólo eventos con estos estados (se puede repetir)"),
+):
+    return StreamingResponse(sse_stream(vehicle_id, status), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.websocket("/events/ws")
+async def route_events_websocket(
+    websocket: WebSocket,
+    vehicle_id: Optional[int] = Query(None, description="Sólo eventos de este vehículo"),
+    status: Optional[List[RouteStatus]] = Query(None, description="Sólo eventos con estos estados (se puede repetir)"),
+):
+    await websocket_stream(websocket, vehicle_id, status)
+
+
+@router.get("/{route_id}", response_model=RouteExpandedResponse, response_model_exclude_unset=True)
+async def get_route(
+    route_id: int,
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    service: AsyncRouteService = Depends(get_route_read_service)
+):
+    route = await service.get_route_by_id(route_id, parse_expand(expand, RouteExpansion))
+    etag = entity_etag("route", route)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return route
+
+
+@router.post("/", response_model=RouteResponse, status_code=status.HTTP_201_CREATED)
+async def create_route(
+    route_data: RouteCreate,
+    service: AsyncRouteService = Depends(get_route_service)
+):
+    return await service.create_route(route_data)
+
+
+@router.post("/batch-get", response_model=RouteBatchResponse)
+async def batch_get_routes(
+    ids: List[int] = Body(..., embed=True, min_length=1, max_length=settings.batch_get_max_ids, description="IDs a consultar; la respuesta conserva el orden"),
+    service: AsyncRouteService = Depends(get_route_read_service)
+):
+    return model_response(await service.get_routes_by_ids(ids))
+
+
+@router.put("/{route_id}", response_model=RouteResponse)
+async def update_route(
+    route_id: int,
+    route_data: RouteUpdate,
+    service: AsyncRouteService = Depends(get_route_service)
+):
+    return await service.update_route(route_id, route_data)
+
+
+@router.delete("/{route_id}", status_code=status.HTTP_200_OK)
+async def delete_route(
+    route_id: int,
+    service: AsyncRouteService = Depends(get_route_service)
+):
+    return await service.delete_route(route_id)
+
+@router.patch("/complete", response_model=RouteCompleteBatchResponse)
+async def complete_routes(
+    items: List[RouteCompleteItem] = Body(..., min_length=1, max_length=settings.batch_complete_max_items),
+    service: AsyncRouteService = Depends(get_route_service)
+):
+    return await service.complete_routes(items)
+
+
+@router.get("/completions/{token}", response_model=RouteCompletionStatus)
+async def get_completion_status(token: str):
+    # Sólo consulta la cola de completados en proceso: no abre sesión de base de datos
+    return await AsyncRouteService.get_completion_status(token)
+
+
+@router.patch(
+    "/{route_id}/complete",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": RouteCompletionStatus, "description": "Completado encolado (COMPLETION_WRITE_BEHIND)"}}
+)
+async def complete_route(
+    route_id: int,
+    payload: RouteComplete,
+    response: Response,
+    version: Optional[int] = Query(None, ge=1, description="Versión esperada de la ruta; si otra petición la modificó se responde 409"),
+    service: AsyncRouteService = Depends(get_route_service)
+):
+    # Con versión esperada el conflicto debe responderse ya, así que ese caso sigue siendo síncrono
+    if settings.completion_write_behind and version is None:
+        queued = await service.queue_completion(route_id, payload)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{router.prefix}/completions/{queued.token}"
+        return queued
+    return await service.complete_route(route_id, payload, expected_version=version)
+
@@ -0,0 +1,171 @@
+from fastapi import APIRouter, Body, Depends, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+
+from app.core.dabatase import get_async_read_db, get_async_write_db
+from app.service.AsyncVehicleService import AsyncVehicleService
+from app.schema.Vehicle import VehicleBatchResponse, VehicleCreate, VehicleUpdate, VehicleResponse
+from app.schema.VehicleBulkImport import VehicleBulkImportResponse
+from app.configuration.configuration import settings
+from app.core.ingest import iter_row_chunks, resolve_format
+from app.core.counting import CountMode, set_total_count
+from app.core.pagination import set_next_cursor
+from app.core.search import SEARCH_TRUNCATED_HEADER
+from app.core.serialization import list_response, model_response
+from app.core.etag import (
+    VEHICLE_VERSION_FIELDS,
+    compute_etag,
+    entity_etag,
+    etag_matches,
+    has_conditional_header,
+    not_modified,
+    row_versions,
+    set_etag,
+)
+
+
+router = APIRouter(
+    prefix="/api/vehicles",
+    tags=["vehicles"]
+)
+
+
+def get_vehicle_service(db: AsyncSession = Depends(get_async_write_db)) -> AsyncVehicleService:
+    return AsyncVehicleService(db)
+
+
+def get_vehicle_read_service(db: AsyncSession = Depends(get_async_read_db)) -> AsyncVehicleService:
+    return AsyncVehicleService(db)
+
+
+@router.get("/", response_model=List[VehicleResponse])
+async def get_all_vehicles(
+    request: Request,
+    skip: int = Query(0, ge=0, description="Número de registros a omitir"),
+    limit: int = Query(100, ge=1, le=500, description="Límite de registros"),
+    active_only: bool = Query(False, description="Filtrar solo vehículos activos"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente (X-Next-Cursor)"),
+    count: CountMode = Query("none", description="Total en X-Total-Count: exact, estimated (estadísticas del planner) o none"),
+    service: AsyncVehicleService = Depends(get_vehicle_read_service)
+):
+    if has_conditional_header(request):
+        versions = await service.get_vehicle_versions(
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            cursor=cursor
+        )
+        etag = compute_etag(versions, "vehicles", limit)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    vehicles = await service.get_all_vehicles(
+        skip=skip,
+        limit=limit,
+        active_only=active_only,
+        cursor=cursor
+    )
+    payload = list_response(VehicleResponse, vehicles)
+    set_next_cursor(payload, vehicles, limit, "id")
+    set_etag(payload, compute_etag(row_versions(vehicles, VEHICLE_VERSION_FIELDS), "vehicles", limit))
+    set_total_count(payload, await service.count_vehicles(count, active_only=active_only))
+    return payload
+
+
+@router.get("/search", response_model=List[VehicleResponse])
+async def search_vehicles(
+    q: str = Query(..., min_length=1, max_length=50, description="Texto a buscar en placa, marca o modelo (con menos de 3 caracteres, sólo por prefijo)"),
+    skip: int = Query(0, ge=0, description="Número de resultados a omitir"),
+    limit: int = Query(20, ge=1, le=100, description="Límite de resultados"),
+    active_only: bool = Query(False, description="Filtrar solo vehículos activos"),
+    service: AsyncVehicleService = Depends(get_vehicle_read_service)
+):
+    vehicles, truncated = await service.search_vehicles(q, skip=skip, limit=limit, active_only=active_only)
+    payload = list_response(VehicleResponse, vehicles)
+    if truncated:
+        payload.headers[SEARCH_TRUNCATED_HEADER] = "true"
+    return payload
+
+
+@router.get("/{vehicle_id}", response_model=VehicleResponse)
+async def get_vehicle(
+    vehicle_id: int,
+    request: Request,
+    response: Response,
+    service: AsyncVehicleService = Depends(get_vehicle_read_service)
+):
+    vehicle = await service.get_vehicle_by_id(vehicle_id)
+    etag = entity_etag("vehicle", vehicle)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return vehicle
+
+
+@router.post("/", response_model=VehicleResponse, status_code=status.HTTP_201_CREATED)
+async def create_vehicle(
+    vehicle_data: VehicleCreate,
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    return await service.create_vehicle(vehicle_data)
+
+
+@router.post("/bulk", response_model=VehicleBulkImportResponse)
+async def bulk_import_vehicles(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Formato del cuerpo; por defecto se infiere del Content-Type"),
+    chunk_size: int = Query(settings.bulk_import_chunk_size, ge=1, le=5000, description="Filas por INSERT"),
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    data_format = resolve_format(request.headers.get("content-type"), format)
+    report = VehicleBulkImportResponse()
+
+    async for chunk in iter_row_chunks(request.stream(), data_format, chunk_size):
+        result = await service.import_vehicles(chunk)
+        report.merge(result, settings.bulk_import_max_errors)
+
+    return report
+
+
+@router.post("/batch-get", response_model=VehicleBatchResponse)
+async def batch_get_vehicles(
+    ids: List[int] = Body(..., embed=True, min_length=1, max_length=settings.batch_get_max_ids, description="IDs a consultar; la respuesta conserva el orden"),
+    service: AsyncVehicleService = Depends(get_vehicle_read_service)
+):
+    return model_response(await service.get_vehicles_by_ids(ids))
+
+
+@router.put("/{vehicle_id}", response_model=VehicleResponse)
+async def update_vehicle(
+    vehicle_id: int,
+    vehicle_data: VehicleUpdate,
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    return await service.update_vehicle(vehicle_id, vehicle_data)
+
+
+@router.patch("/{vehicle_id}/deactivate", response_model=VehicleResponse)
+async def deactivate_vehicle(
+    vehicle_id: int,
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    update_data = VehicleUpdate(is_active=False)
+    return await service.update_vehicle(vehicle_id, update_data)
+
+
+@router.patch("/{vehicle_id}/activate", response_model=VehicleResponse)
+async def activate_vehicle(
+    vehicle_id: int,
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    update_data = VehicleUpdate(is_active=True)
+    return await service.update_vehicle(vehicle_id, update_data)
+
+
+@router.delete("/{vehicle_id}", status_code=status.HTTP_200_OK)
+async def delete_vehicle(
+    vehicle_id: int,
+    soft: bool = Query(True, description="Soft delete (True) o Hard delete (False)"),
+    service: AsyncVehicleService = Depends(get_vehicle_service)
+):
+    return await service.delete_vehicle(vehicle_id, soft=soft)
\ No newline at end of file
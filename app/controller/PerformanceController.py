@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from app.core.dabatase import get_db
-from app.service.PerformanceService import PerformanceService
+from app.core.dabatase import get_read_db
+from app.service.PerformanceService import PerformanceService, export_performances
 from app.schema.Performance import PerformanceResponse
+from app.configuration.configuration import settings
+from app.core.replicas import recent_write
+from app.core.export import EXPORT_MEDIA_TYPES, content_disposition
+from app.core.counting import CountMode, set_total_count
+from app.core.pagination import set_next_cursor
+from app.core.serialization import list_response
+from app.core.etag import (
+    PERFORMANCE_VERSION_FIELDS,
+    compute_etag,
+    etag_matches,
+    has_conditional_header,
+    not_modified,
+    row_versions,
+    set_etag,
+)
 
 
 router = APIRouter(
@@ -13,14 +29,48 @@ router = APIRouter(
 )
 
 
-def get_performance_service(db: Session = Depends(get_db)) -> PerformanceService:
+def get_performance_service(db: Session = Depends(get_read_db)) -> PerformanceService:
     return PerformanceService(db)
 
 
 @router.get("/", response_model=List[PerformanceResponse])
 def get_all_performances(
+    request: Request,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=500, description="Límite de registros"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente (X-Next-Cursor)"),
+    count: CountMode = Query("none", description="Total en X-Total-Count: exact, estimated (estadísticas del planner) o none"),
+    service: PerformanceService = Depends(get_performance_service)
+):
+    if has_conditional_header(request):
+        versions = service.get_performance_versions(skip=skip, limit=limit, cursor=cursor)
+        etag = compute_etag(versions, "performances", limit)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    performances = service.get_all_performances(skip=skip, limit=limit, cursor=cursor)
+    payload = list_response(PerformanceResponse, performances)
+    set_next_cursor(payload, performances, limit, "created_at", "route_id")
+    set_etag(payload, compute_etag(row_versions(performances, PERFORMANCE_VERSION_FIELDS), "performances", limit))
+    set_total_count(payload, service.count_performances(count))
+    return payload
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_all_performances(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de exportación"),
+):
+    return StreamingResponse(
+        export_performances(format, settings.export_batch_size, primary=recent_write(request)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": content_disposition("performances", format)}
+    )
+
+
+@router.get("/{route_id}", response_model=PerformanceResponse)
+def get_performance_by_route_id(
+    route_id: int,
     service: PerformanceService = Depends(get_performance_service)
 ):
-    return service.get_all_performances(skip=skip, limit=limit)
+    return service.get_performance_by_route_id(route_id)
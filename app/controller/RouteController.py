@@ -1,12 +1,39 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Body, Depends, status, Query, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.core.dabatase import get_db
+from app.core.dabatase import get_read_db, get_write_db
 from app.service.RouteService import RouteService
-from app.schema.Route import RouteCreate, RouteUpdate, RouteResponse
-from app.schema.RouteComplete import RouteComplete
+from app.schema.Route import (
+    RouteBatchResponse,
+    RouteCreate,
+    RouteExpandedResponse,
+    RouteUpdate,
+    RouteResponse,
+    route_response_model,
+)
+from app.schema.RouteComplete import RouteComplete, RouteCompleteItem, RouteCompleteBatchResponse, RouteCompletionStatus
+from app.configuration.configuration import settings
+from app.enum.RouteExpansion import RouteExpansion
 from app.enum.RouteStatus import RouteStatus
+from app.core.counting import CountMode, set_total_count
+from app.core.expand import parse_expand
+from app.core.events import SSE_HEADERS, sse_stream, websocket_stream
+from app.core.pagination import set_next_cursor
+from app.core.serialization import list_response, model_response
+from app.core.etag import (
+    ROUTE_VERSION_FIELDS,
+    compute_etag,
+    entity_etag,
+    etag_matches,
+    expanded_versions,
+    has_conditional_header,
+    not_modified,
+    set_etag,
+)
+
+EXPAND_DESCRIPTION = "Relaciones a incluir, separadas por coma: vehicle, performance"
 
 router = APIRouter(
     prefix="/api/routes",
@@ -14,31 +41,91 @@ router = APIRouter(
 )
 
 
-def get_route_service(db: Session = Depends(get_db)) -> RouteService:
+def get_route_service(db: Session = Depends(get_write_db)) -> RouteService:
     return RouteService(db)
 
 
-@router.get("/", response_model=List[RouteResponse])
+def get_route_read_service(db: Session = Depends(get_read_db)) -> RouteService:
+    return RouteService(db)
+
+
+@router.get("/", response_model=List[RouteExpandedResponse])
 def get_all_routes(
+    request: Request,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=500, description="Límite de registros"),
     status: Optional[RouteStatus] = Query(None, description="Estado de la ruta"),
     vehicle_id: Optional[int] = Query(None, description="ID del vehículo"),
-    service: RouteService = Depends(get_route_service)
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente (X-Next-Cursor)"),
+    count: CountMode = Query("none", description="Total en X-Total-Count: exact, estimated (estadísticas del planner) o none"),
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    service: RouteService = Depends(get_route_read_service)
 ):
-    return service.get_all_routes(
+    expansions = parse_expand(expand, RouteExpansion)
+    expanded = sorted(expansion.value for expansion in expansions)
+    # Las versiones de la ruta no cubren lo embebido: con expand el ETag se calcula sobre la página cargada
+    if has_conditional_header(request) and not expansions:
+        versions = service.get_route_versions(
+            skip=skip,
+            limit=limit,
+            status=status,
+            vehicle_id=vehicle_id,
+            cursor=cursor
+        )
+        etag = compute_etag(versions, "routes", limit)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    routes = service.get_all_routes(
         skip=skip,
         limit=limit,
         status=status,
-        vehicle_id=vehicle_id
+        vehicle_id=vehicle_id,
+        cursor=cursor,
+        expand=expansions
     )
+    etag = compute_etag(expanded_versions(routes, ROUTE_VERSION_FIELDS, expanded), "routes", limit, *expanded)
+    if expansions and etag_matches(request, etag):
+        return not_modified(etag)
+
+    payload = list_response(route_response_model(expansions), routes)
+    set_next_cursor(payload, routes, limit, "id")
+    set_etag(payload, etag)
+    set_total_count(payload, service.count_routes(count, status=status, vehicle_id=vehicle_id))
+    return payload
 
-@router.get("/{route_id}", response_model=RouteResponse)
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_route_events(
+    vehicle_id: Optional[int] = Query(None, description="Sólo eventos de este vehículo"),
+    status: Optional[List[RouteStatus]] = Query(None, description="Sólo eventos con estos estados (se puede repetir)"),
+):
+    return StreamingResponse(sse_stream(vehicle_id, status), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.websocket("/events/ws")
+async def route_events_websocket(
+    websocket: WebSocket,
+    vehicle_id: Optional[int] = Query(None, description="Sólo eventos de este vehículo"),
+    status: Optional[List[RouteStatus]] = Query(None, description="Sólo eventos con estos estados (se puede repetir)"),
+):
+    await websocket_stream(websocket, vehicle_id, status)
+
+
+@router.get("/{route_id}", response_model=RouteExpandedResponse, response_model_exclude_unset=True)
 def get_route(
     route_id: int,
-    service: RouteService = Depends(get_route_service)
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, description=EXPAND_DESCRIPTION),
+    service: RouteService = Depends(get_route_read_service)
 ):
-    return service.get_route_by_id(route_id)
+    route = service.get_route_by_id(route_id, parse_expand(expand, RouteExpansion))
+    etag = entity_etag("route", route)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return route
 
 
 @router.post("/", response_model=RouteResponse, status_code=status.HTTP_201_CREATED)
@@ -49,6 +136,14 @@ def create_route(
     return service.create_route(route_data)
 
 
+@router.post("/batch-get", response_model=RouteBatchResponse)
+def batch_get_routes(
+    ids: List[int] = Body(..., embed=True, min_length=1, max_length=settings.batch_get_max_ids, description="IDs a consultar; la respuesta conserva el orden"),
+    service: RouteService = Depends(get_route_read_service)
+):
+    return model_response(service.get_routes_by_ids(ids))
+
+
 @router.put("/{route_id}", response_model=RouteResponse)
 def update_route(
     route_id: int,
@@ -65,11 +160,37 @@ def delete_route(
 ):
     return service.delete_route(route_id)
 
-@router.patch("/{route_id}/complete", status_code=status.HTTP_200_OK)
+@router.patch("/complete", response_model=RouteCompleteBatchResponse)
+def complete_routes(
+    items: List[RouteCompleteItem] = Body(..., min_length=1, max_length=settings.batch_complete_max_items),
+    service: RouteService = Depends(get_route_service)
+):
+    return service.complete_routes(items)
+
+
+@router.get("/completions/{token}", response_model=RouteCompletionStatus)
+def get_completion_status(token: str):
+    # Sólo consulta la cola de completados en proceso: no abre sesión de base de datos
+    return RouteService.get_completion_status(token)
+
+
+@router.patch(
+    "/{route_id}/complete",
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": RouteCompletionStatus, "description": "Completado encolado (COMPLETION_WRITE_BEHIND)"}}
+)
 def complete_route(
     route_id: int,
     payload: RouteComplete,
+    response: Response,
+    version: Optional[int] = Query(None, ge=1, description="Versión esperada de la ruta; si otra petición la modificó se responde 409"),
     service: RouteService = Depends(get_route_service)
 ):
-    return service.complete_route(route_id, payload)
+    # Con versión esperada el conflicto debe responderse ya, así que ese caso sigue siendo síncrono
+    if settings.completion_write_behind and version is None:
+        queued = service.queue_completion(route_id, payload)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{router.prefix}/completions/{queued.token}"
+        return queued
+    return service.complete_route(route_id, payload, expected_version=version)
 
@@ -0,0 +1,288 @@
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Type
+
+from sqlalchemy import inspect
+
+from app.configuration.configuration import settings
+from app.core.metrics import Metric, registry
+
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
+
+def cache_backend() -> str:
+    # En automático basta con definir REDIS_URL (o CACHE_REDIS_URL) para compartir el caché entre workers
+    if settings.cache_backend != "auto":
+        return settings.cache_backend
+    return "redis" if settings.cache_redis_url else "memory"
+
+
+class CacheBackend(ABC):
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, values: Dict[Hashable, Any], ttl: Optional[float] = None) -> None:
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    # Variantes para el event loop: los backends en proceso no hacen I/O y delegan en las síncronas
+    async def get_async(self, key: Hashable) -> Optional[Any]:
+        return self.get(key)
+
+    async def get_many_async(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        return self.get_many(keys)
+
+    async def set_async(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    async def set_many_async(self, values: Dict[Hashable, Any], ttl: Optional[float] = None) -> None:
+        self.set_many(values, ttl)
+
+    async def delete_async(self, *keys: Hashable) -> None:
+        self.delete(*keys)
+
+    def _record(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class LRUCache(CacheBackend):
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        super().__init__(name, ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+                self.evictions += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+
+    def __init__(self, name: str, ttl: float, client, async_client):
+        super().__init__(name, ttl)
+        self.client = client
+        self.async_client = async_client
+
+    @classmethod
+    def from_url(cls, name: str, ttl: float, url: str) -> "RedisCache":
+        import redis
+        import redis.asyncio
+
+        # El cliente bloqueante sirve al threadpool del modo sync; en el event loop se usa redis.asyncio
+        return cls(name, ttl, redis.Redis.from_url(url), redis.asyncio.Redis.from_url(url))
+
+    def _key(self, key: Hashable) -> str:
+        return f"integriapp:{self.name}:{key}"
+
+    def _milliseconds(self, ttl: Optional[float]) -> int:
+        return max(int((self.ttl if ttl is None else ttl) * 1000), 1)
+
+    def _found(self, keys: List[Hashable], raws: List[Optional[bytes]]) -> Dict[Hashable, Any]:
+        found = {key: pickle.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+        self._record(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self._record(misses=1)
+            return None
+        self._record(hits=1)
+        return pickle.loads(raw)
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return self._found(keys, self.client.mget([self._key(key) for key in keys]))
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(self._key(key), pickle.dumps(value), px=self._milliseconds(ttl))
+
+    def delete(self, *keys: Hashable) -> None:
+        if keys:
+            self.client.delete(*(self._key(key) for key in keys))
+
+    async def get_async(self, key: Hashable) -> Optional[Any]:
+        raw = await self.async_client.get(self._key(key))
+        if raw is None:
+            self._record(misses=1)
+            return None
+        self._record(hits=1)
+        return pickle.loads(raw)
+
+    async def get_many_async(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return self._found(keys, await self.async_client.mget([self._key(key) for key in keys]))
+
+    async def set_async(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        await self.async_client.set(self._key(key), pickle.dumps(value), px=self._milliseconds(ttl))
+
+    async def set_many_async(self, values: Dict[Hashable, Any], ttl: Optional[float] = None) -> None:
+        if not values:
+            return
+        async with self.async_client.pipeline(transaction=False) as pipeline:
+            for key, value in values.items():
+                pipeline.set(self._key(key), pickle.dumps(value), px=self._milliseconds(ttl))
+            await pipeline.execute()
+
+    async def delete_async(self, *keys: Hashable) -> None:
+        if keys:
+            await self.async_client.delete(*(self._key(key) for key in keys))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self._key("*")))
+        if keys:
+            self.client.delete(*keys)
+
+
+class NullCache(CacheBackend):
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        self._record(misses=1)
+        return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    def delete(self, *keys: Hashable) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+_caches: Dict[str, CacheBackend] = {}
+
+
+def build_cache(name: str, ttl: Optional[float] = None, max_entries: Optional[int] = None) -> CacheBackend:
+    ttl = settings.cache_ttl_seconds if ttl is None else ttl
+    backend = cache_backend()
+    if backend == "redis":
+        cache = RedisCache.from_url(name, ttl, settings.cache_redis_url or DEFAULT_REDIS_URL)
+    elif backend == "none":
+        cache = NullCache(name, ttl)
+    else:
+        cache = LRUCache(name, ttl, max_entries or settings.cache_max_entries)
+    _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def snapshot(instance) -> Dict[str, Any]:
+    return {
+        attribute.key: getattr(instance, attribute.key)
+        for attribute in inspect(instance).mapper.column_attrs
+    }
+
+
+def restore(model: Type, data: Dict[str, Any]):
+    return model(**data)
+
+
+@registry.register
+def collect_cache_metrics() -> List[Metric]:
+    hits = Metric("cache_hits_total", "counter", "Lookups served from the entity cache")
+    misses = Metric("cache_misses_total", "counter", "Lookups that fell through to the database")
+    evictions = Metric("cache_evictions_total", "counter", "Entries dropped by size bound or TTL")
+    size = Metric("cache_entries", "gauge", "Entries currently cached")
+
+    for name, cache in _caches.items():
+        labels = {"cache": name}
+        hits.add(cache.hits, labels)
+        misses.add(cache.misses, labels)
+        evictions.add(cache.evictions, labels)
+        size.add(len(cache), labels)
+
+    return [hits, misses, evictions, size]
+
+
+vehicle_cache = build_cache("vehicles")
+route_cache = build_cache("routes")
@@ -0,0 +1,99 @@
+import json
+from typing import Any, Hashable, List, Literal, NamedTuple, Optional
+
+from fastapi import Response
+from sqlalchemy import func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration.configuration import settings
+from app.core.cache import build_cache
+from app.core.sql import dialect_name
+
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_MODE_HEADER = "X-Total-Count-Mode"
+
+CountMode = Literal["exact", "estimated", "none"]
+
+
+class TotalCount(NamedTuple):
+    total: Optional[int]
+    mode: Optional[str]
+
+
+RELTUPLES = text("SELECT CAST(reltuples AS BIGINT) FROM pg_class WHERE oid = to_regclass(:table)")
+
+count_cache = build_cache("counts", ttl=settings.count_cache_ttl_seconds, max_entries=settings.count_cache_max_entries)
+
+
+def count_key(table: str, *filters: Any) -> Hashable:
+    return ":".join([table, *(getattr(value, "value", str(value)) for value in filters)])
+
+
+def count_statement(model, conditions: List[Any]):
+    return select(func.count()).select_from(model).where(*conditions)
+
+
+def plan_rows(raw: Any) -> int:
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_rows(db: Session, model, conditions: List[Any]) -> int:
+    connection = db.connection()
+    if not conditions:
+        # Sin filtros basta la estadística de la tabla; -1 significa que nunca se analizó
+        reltuples = connection.execute(RELTUPLES, {"table": model.__tablename__}).scalar()
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    # Los filtros son enteros, booleanos y enums: se pueden incrustar para pedir el plan sin parámetros
+    statement = select(literal_column("1")).select_from(model).where(*conditions)
+    sql = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    return plan_rows(connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar())
+
+
+def count_rows(
+    db: Session,
+    model,
+    mode: CountMode,
+    conditions: List[Any],
+    key: Hashable,
+) -> TotalCount:
+    if mode == "none":
+        return TotalCount(None, None)
+
+    # SQLite no expone estadísticas del planner: ahí "estimated" degrada a un conteo exacto cacheado
+    if mode == "estimated" and dialect_name(db) == "postgresql":
+        return TotalCount(estimate_rows(db, model, conditions), "estimated")
+
+    total = count_cache.get(key)
+    if total is None:
+        total = db.scalar(count_statement(model, conditions))
+        count_cache.set(key, total)
+    return TotalCount(total, "exact")
+
+
+async def count_rows_async(
+    db: AsyncSession,
+    model,
+    mode: CountMode,
+    conditions: List[Any],
+    key: Hashable,
+) -> TotalCount:
+    # El caché se consulta fuera de run_sync: con Redis la llamada no debe bloquear el event loop
+    if mode == "none" or (mode == "estimated" and dialect_name(db) == "postgresql"):
+        return await db.run_sync(count_rows, model, mode, conditions, key)
+
+    total = await count_cache.get_async(key)
+    if total is None:
+        total = await db.scalar(count_statement(model, conditions))
+        await count_cache.set_async(key, total)
+    return TotalCount(total, "exact")
+
+
+def set_total_count(response: Response, count: TotalCount) -> None:
+    if count.total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(count.total)
+        response.headers[TOTAL_COUNT_MODE_HEADER] = count.mode
@@ -1,21 +1,221 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.configuration.configuration import settings
+from app.core.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    budget_pool_size,
+    register_engine,
+    worker_count,
+)
+from app.core.instrumentation import instrument_engine
+from app.core.replicas import (
+    REPLICA_SESSION_KEY,
+    ReplicaSet,
+    mark_write,
+    parse_replica_urls,
+    recent_write,
+    register_replicas,
+)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    return settings.async_database_url or to_async_url(settings.database_url)
+
+
+def get_replica_urls(asynchronous: bool = False) -> list:
+    urls = parse_replica_urls(settings.database_replica_urls)
+    if not asynchronous:
+        return urls
+    return parse_replica_urls(settings.async_database_replica_urls) or [to_async_url(url) for url in urls]
+
+
+def reserved_connections() -> int:
+    # Conexiones por worker fuera del pool principal: el LISTEN de eventos y, en modo async, el engine síncrono
+    backend = make_url(settings.database_url).get_backend_name()
+    listener = settings.events_transport == "postgres" or (
+        settings.events_transport == "auto" and backend == "postgresql"
+    )
+    return int(listener) + int(settings.database_mode == "async")
+
+
+def get_pool_sizes(primary: bool = True) -> tuple:
+    if not settings.db_connection_budget:
+        return settings.db_pool_size, settings.db_max_overflow
+    if not primary:
+        return 1, 0
+    return budget_pool_size(
+        settings.db_connection_budget,
+        worker_count(),
+        reserved_connections(),
+        settings.db_pool_size
+    )
+
+
+def get_pool_options(primary: bool = True) -> dict:
+    pool_size, max_overflow = get_pool_sizes(primary)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
 
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.debug
+    poolclass=InstrumentedQueuePool,
+    echo=settings.debug,
+    **get_pool_options(primary=settings.database_mode == "sync")
 )
+register_engine("primary", engine)
+instrument_engine(engine)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.database_mode == "async":
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        poolclass=InstrumentedAsyncQueuePool,
+        echo=settings.debug,
+        **get_pool_options()
+    )
+    register_engine("primary_async", async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Las réplicas sólo existen en el modo activo; cada una tiene su propio pool dimensionado como el principal
+replica_engines = []
+
+if settings.database_mode == "async":
+    for url in get_replica_urls(asynchronous=True):
+        replica_engines.append(create_async_engine(
+            url,
+            poolclass=InstrumentedAsyncQueuePool,
+            echo=settings.debug,
+            **get_pool_options()
+        ))
+else:
+    for url in get_replica_urls():
+        replica_engines.append(create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            echo=settings.debug,
+            **get_pool_options()
+        ))
+
+for index, replica_engine in enumerate(replica_engines):
+    sync_replica = getattr(replica_engine, "sync_engine", replica_engine)
+    register_engine(f"replica_{index}", sync_replica)
+    instrument_engine(sync_replica)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replicas = ReplicaSet(replica_engines, settings.db_replica_retry_seconds)
+register_replicas(settings.database_mode, replicas)
 
 Base = declarative_base()
 
+
+def dispose_after_fork() -> None:
+    # Con preload el engine se creó en el proceso maestro: cada worker descarta ese pool y abre el suyo
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+    for replica_engine in replica_engines:
+        getattr(replica_engine, "sync_engine", replica_engine).dispose(close=False)
+
+
+def open_read_session(primary: bool = False):
+    # Probar la conexión al abrir la sesión permite pasar a la siguiente réplica antes de la primera query
+    if not primary:
+        for index in replicas.candidates():
+            db = SessionLocal(bind=replica_engines[index], info={REPLICA_SESSION_KEY: True})
+            try:
+                db.connection()
+            except (DBAPIError, OSError) as error:
+                db.close()
+                replicas.mark_down(index, error)
+                continue
+            replicas.record_read("replica")
+            return db
+    if replica_engines:
+        replicas.record_read("primary")
+    return SessionLocal()
+
+
+async def open_async_read_session(primary: bool = False):
+    if not primary:
+        for index in replicas.candidates():
+            db = AsyncSessionLocal(bind=replica_engines[index], info={REPLICA_SESSION_KEY: True})
+            try:
+                await db.connection()
+            except (DBAPIError, OSError) as error:
+                await db.close()
+                replicas.mark_down(index, error)
+                continue
+            replicas.record_read("replica")
+            return db
+    if replica_engines:
+        replicas.record_read("primary")
+    return AsyncSessionLocal()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_write_db(request: Request):
+    mark_write(request)
+    yield from get_db()
+
+
+def get_read_db(request: Request):
+    db = open_read_session(primary=recent_write(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_write_db(request: Request):
+    mark_write(request)
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    async with await open_async_read_session(primary=recent_write(request)) as db:
+        yield db
@@ -0,0 +1,72 @@
+import hashlib
+from typing import Any, Iterable, List, Sequence
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from app.configuration.configuration import settings
+from app.core.cache import snapshot
+
+
+ETAG_HEADER = "ETag"
+
+ROUTE_VERSION_FIELDS = ("id", "version", "updated_at", "created_at")
+VEHICLE_VERSION_FIELDS = ("id", "version", "updated_at", "created_at")
+PERFORMANCE_VERSION_FIELDS = ("route_id", "created_at")
+
+EXPANSION_VERSION_FIELDS = {
+    "vehicle": VEHICLE_VERSION_FIELDS,
+    "performance": PERFORMANCE_VERSION_FIELDS,
+}
+
+
+def compute_etag(versions: Iterable[Sequence[Any]], *extra: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((settings.app_version, extra)).encode("utf-8"))
+    for version in versions:
+        digest.update(repr(tuple(version)).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def row_versions(items: Iterable[Any], fields: Sequence[str]) -> List[tuple]:
+    return [tuple(getattr(item, field) for field in fields) for item in items]
+
+
+def expanded_versions(items: Iterable[Any], fields: Sequence[str], expand: Sequence[str]) -> List[tuple]:
+    # Lo embebido también versiona la respuesta: editar el vehículo cambia el ETag de sus rutas
+    versions = []
+    for item in items:
+        version = [getattr(item, field) for field in fields]
+        for name in expand:
+            related = getattr(item, name)
+            version.append(None if related is None else row_versions([related], EXPANSION_VERSION_FIELDS[name])[0])
+        versions.append(tuple(version))
+    return versions
+
+
+def entity_etag(kind: str, instance: Any) -> str:
+    values = instance.model_dump() if isinstance(instance, BaseModel) else snapshot(instance)
+    return compute_etag([tuple(sorted(values.items()))], kind)
+
+
+def has_conditional_header(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
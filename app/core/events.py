@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Sequence, Set, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration.configuration import settings
+from app.core import dabatase
+from app.core.metrics import Metric, registry
+from app.enum.RouteStatus import RouteStatus
+
+
+logger = logging.getLogger("integriapp.events")
+
+ROUTE_EVENTS_CHANNEL = "route_events"
+
+ROUTE_CREATED = "route.created"
+ROUTE_STATUS_CHANGED = "route.status_changed"
+ROUTE_COMPLETED = "route.completed"
+LAGGED = "lagged"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+NOTIFY = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS TEXT[])) AS payload")
+
+
+class RouteEvent(NamedTuple):
+    type: str
+    route_id: int
+    vehicle_id: int
+    status: str
+    occurred_at: str
+    version: Optional[int] = None
+
+    def payload(self) -> dict:
+        return self._asdict()
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "RouteEvent":
+        return cls(**json.loads(raw))
+
+
+class Lagged(NamedTuple):
+    dropped: int
+    type: str = LAGGED
+
+    def payload(self) -> dict:
+        return {"type": self.type, "dropped": self.dropped}
+
+
+Event = Union[RouteEvent, Lagged]
+
+
+def route_event(
+    event_type: str,
+    route_id: int,
+    vehicle_id: int,
+    status: RouteStatus,
+    version: Optional[int] = None,
+    occurred_at: Optional[datetime] = None,
+) -> RouteEvent:
+    return RouteEvent(
+        type=event_type,
+        route_id=route_id,
+        vehicle_id=vehicle_id,
+        status=status.value,
+        occurred_at=(occurred_at or datetime.now()).isoformat(),
+        version=version,
+    )
+
+
+class Subscription:
+
+    def __init__(self, queue_size: int, vehicle_id: Optional[int], statuses: Optional[Iterable[RouteStatus]]):
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(queue_size)
+        self.vehicle_id = vehicle_id
+        self.statuses = {status.value for status in statuses} if statuses else None
+        self.dropped = 0
+
+    def matches(self, event: RouteEvent) -> bool:
+        if self.vehicle_id is not None and event.vehicle_id != self.vehicle_id:
+            return False
+        return self.statuses is None or event.status in self.statuses
+
+    def offer(self, event: RouteEvent) -> int:
+        try:
+            self.queue.put_nowait(event)
+            return 0
+        except asyncio.QueueFull:
+            pass
+
+        # Consumidor lento: en lugar de frenar a quien publica se vacía su cola y se le avisa que resincronice con GET
+        dropped, notified = 1, 0
+        while not self.queue.empty():
+            pending = self.queue.get_nowait()
+            if isinstance(pending, Lagged):
+                notified += pending.dropped
+            else:
+                dropped += 1
+        self.dropped += dropped
+        self.queue.put_nowait(Lagged(dropped + notified))
+        return dropped
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.published = 0
+        self.dropped = 0
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        vehicle_id: Optional[int] = None,
+        statuses: Optional[Iterable[RouteStatus]] = None,
+        queue_size: Optional[int] = None,
+    ) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(queue_size or settings.events_queue_size, vehicle_id, statuses)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def dispatch(self, event: RouteEvent) -> None:
+        self.published += 1
+        for subscription in list(self._subscriptions):
+            if subscription.matches(event):
+                self.dropped += subscription.offer(event)
+
+    def publish(self, event: RouteEvent) -> None:
+        loop = self._loop
+        if loop is None or not self._subscriptions:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        # Los servicios síncronos publican desde el threadpool: las colas sólo se tocan en el hilo del loop
+        if running is loop:
+            self.dispatch(event)
+            return
+        try:
+            loop.call_soon_threadsafe(self.dispatch, event)
+        except RuntimeError:
+            self._loop = None
+
+
+def events_transport() -> str:
+    if settings.events_transport != "auto":
+        return settings.events_transport
+    return "postgres" if dabatase.engine.dialect.name == "postgresql" else "memory"
+
+
+def notify_parameters(events: Sequence[RouteEvent]) -> dict:
+    return {"channel": ROUTE_EVENTS_CHANNEL, "payloads": [event.to_json() for event in events]}
+
+
+def notify_events(db: Session, events: Sequence[RouteEvent]) -> None:
+    # pg_notify es transaccional: va antes del commit de la escritura y Postgres lo entrega a todos los workers al confirmar
+    if events and events_transport() == "postgres":
+        db.execute(NOTIFY, notify_parameters(events))
+
+
+async def notify_events_async(db: AsyncSession, events: Sequence[RouteEvent]) -> None:
+    if events and events_transport() == "postgres":
+        await db.execute(NOTIFY, notify_parameters(events))
+
+
+def publish_events(events: Sequence[RouteEvent]) -> None:
+    # Sin Postgres los eventos se publican en memoria, después del commit
+    if events_transport() == "postgres":
+        return
+    for event in events:
+        route_events.publish(event)
+
+
+class PostgresListener:
+
+    def __init__(self, broker: EventBroker, channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.received = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"listen-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = dabatase.engine.raw_connection()
+                # La conexión queda en modo LISTEN: no debe volver al pool
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                self._listen(connection)
+            except Exception as error:
+                logger.warning("Listener de %s desconectado: %r", self.channel, error)
+                self._stop.wait(1.0)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+    def _listen(self, connection) -> None:
+        while not self._stop.is_set():
+            if select.select([connection], [], [], 1.0) == ([], [], []):
+                continue
+            connection.poll()
+            while connection.notifies:
+                notification = connection.notifies.pop(0)
+                self.received += 1
+                try:
+                    self.broker.publish(RouteEvent.from_json(notification.payload))
+                except (ValueError, TypeError) as error:
+                    logger.warning("Evento inválido en %s: %r", self.channel, error)
+
+
+def format_sse(event: Event) -> str:
+    return f"event: {event.type}\ndata: {json.dumps(event.payload(), separators=(',', ':'))}\n\n"
+
+
+async def sse_stream(
+    vehicle_id: Optional[int],
+    statuses: Optional[List[RouteStatus]],
+) -> AsyncIterator[str]:
+    subscription = route_events.subscribe(vehicle_id, statuses)
+    deadline = time.monotonic() + settings.events_stream_max_seconds
+    try:
+        # El cliente EventSource reconecta solo: cortar cada stream acota el apagado del servidor
+        yield f"retry: {int(settings.events_retry_ms)}\n\n"
+        while time.monotonic() < deadline:
+            event = await subscription.get(settings.events_heartbeat_seconds)
+            yield ": ping\n\n" if event is None else format_sse(event)
+    finally:
+        route_events.unsubscribe(subscription)
+
+
+async def websocket_stream(
+    websocket: WebSocket,
+    vehicle_id: Optional[int],
+    statuses: Optional[List[RouteStatus]],
+) -> None:
+    await websocket.accept()
+    subscription = route_events.subscribe(vehicle_id, statuses)
+    try:
+        while True:
+            event = await subscription.get(settings.events_heartbeat_seconds)
+            await websocket.send_json({"type": "ping"} if event is None else event.payload())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        route_events.unsubscribe(subscription)
+
+
+@registry.register
+def collect_event_metrics() -> List[Metric]:
+    subscribers = Metric("route_events_subscribers", "gauge", "Open route event streams")
+    subscribers.add(len(route_events))
+    published = Metric("route_events_published_total", "counter", "Route events fanned out by this process")
+    published.add(route_events.published)
+    dropped = Metric("route_events_dropped_total", "counter", "Route events dropped from full subscriber queues")
+    dropped.add(route_events.dropped)
+    return [subscribers, published, dropped]
+
+
+route_events = EventBroker("routes")
+route_listener = PostgresListener(route_events, ROUTE_EVENTS_CHANNEL)
@@ -0,0 +1,19 @@
+import enum
+from typing import FrozenSet, Optional, Type, TypeVar
+
+from fastapi import HTTPException, status
+
+
+ExpansionT = TypeVar("ExpansionT", bound=enum.Enum)
+
+
+def parse_expand(raw: Optional[str], allowed: Type[ExpansionT]) -> FrozenSet[ExpansionT]:
+    names = {name.strip() for name in (raw or "").split(",") if name.strip()}
+    values = {member.value: member for member in allowed}
+    unknown = sorted(names - values.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Relación desconocida en expand: {', '.join(unknown)}; permitidas: {', '.join(values)}"
+        )
+    return frozenset(values[name] for name in names)
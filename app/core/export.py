@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterable, Sequence
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def encode_header(columns: Sequence[str], data_format: str) -> bytes:
+    if data_format != "csv":
+        return b""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(columns)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_rows(columns: Sequence[str], rows: Iterable[Sequence], data_format: str) -> bytes:
+    if data_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in rows
+        )
+        return buffer.getvalue().encode("utf-8")
+
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_json_default)
+    return "".join(
+        encoder.encode(dict(zip(columns, row))) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def content_disposition(name: str, data_format: str) -> str:
+    return f'attachment; filename="{name}.{data_format}"'
@@ -0,0 +1,117 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+
+Row = Tuple[int, Optional[dict], Optional[str]]
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/x-jsonlines",
+}
+
+
+def resolve_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    if requested:
+        return requested
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Formato no soportado: usa text/csv o application/x-ndjson"
+    )
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for block in stream:
+        pending += decoder.decode(block)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_ndjson_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    row_number = 0
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield row_number, None, f"JSON inválido: {exc.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield row_number, record, None
+
+
+async def iter_csv_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    header: Optional[List[str]] = None
+    record_lines: List[str] = []
+    row_number = 0
+
+    async for line in iter_lines(stream):
+        record_lines.append(line)
+        text = "".join(record_lines)
+        if text.count('"') % 2:
+            continue
+        record_lines = []
+        if not text.strip():
+            continue
+
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as exc:
+            row_number += 1
+            yield row_number, None, f"CSV inválido: {exc}"
+            continue
+
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, f"Se esperaban {len(header)} columnas, se recibieron {len(values)}"
+            continue
+        yield row_number, {
+            column: value.strip() or None
+            for column, value in zip(header, values)
+        }, None
+
+    if record_lines:
+        yield row_number + 1, None, "CSV inválido: comillas sin cerrar"
+
+
+async def iter_row_chunks(
+    stream: AsyncIterator[bytes],
+    data_format: str,
+    chunk_size: int,
+) -> AsyncIterator[List[Row]]:
+    rows = iter_csv_rows(stream) if data_format == "csv" else iter_ndjson_rows(stream)
+    chunk: List[Row] = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,186 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.configuration.configuration import settings
+from app.core.metrics import Histogram, Metric, registry
+
+
+logger = logging.getLogger("integriapp.sql")
+
+SERVER_TIMING_HEADER = "Server-Timing"
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|(?<!:):\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_SINGLE_PLACEHOLDER = re.compile(_PLACEHOLDER)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class RequestStats:
+
+    __slots__ = ("scope", "queries", "db_seconds", "serialize_seconds")
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "-")
+        return f"{self.scope.get('method', '-')} {path}"
+
+    def server_timing(self, total_seconds: float) -> str:
+        app_seconds = max(total_seconds - self.db_seconds - self.serialize_seconds, 0.0)
+        return ", ".join([
+            f"db;dur={self.db_seconds * 1000:.2f}",
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}",
+            f"app;dur={app_seconds * 1000:.2f}",
+        ])
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class SQLMetrics:
+
+    def __init__(self):
+        self.queries_per_request = Histogram(buckets=(1, 2, 3, 5, 10, 20, 50, 100, 250))
+        self.slow_queries = 0
+        self._lock = threading.Lock()
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries += 1
+
+
+sql_metrics = SQLMetrics()
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - start
+
+
+def normalize_sql(statement: str) -> str:
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+    statement = _SINGLE_PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _record_statement(conn) -> Optional[float]:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return None
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    return elapsed
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = _record_statement(conn)
+    if elapsed is not None and elapsed * 1000 >= settings.slow_query_threshold_ms:
+        stats = _current.get()
+        sql_metrics.record_slow_query()
+        logger.warning(
+            "slow query %.1f ms [%s]: %s",
+            elapsed * 1000,
+            stats.route if stats is not None else "-",
+            normalize_sql(statement),
+        )
+
+
+def _handle_error(exception_context) -> None:
+    if exception_context.connection is not None:
+        _record_statement(exception_context.connection)
+
+
+def instrument_engine(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class TimedJSONResponse(JSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        with measure_serialization():
+            return super().render(content)
+
+
+def is_streaming(scope: Scope) -> bool:
+    response_class = getattr(scope.get("route"), "response_class", None)
+    return isinstance(response_class, type) and issubclass(response_class, StreamingResponse)
+
+
+class RequestTimingMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            # Las respuestas en streaming envían las cabeceras antes de generar el cuerpo,
+            # así que el conteo siempre sería 0: se omiten en lugar de reportar un valor falso.
+            if message["type"] == "http.response.start" and not is_streaming(scope):
+                headers = MutableHeaders(scope=message)
+                headers.append(SERVER_TIMING_HEADER, stats.server_timing(time.perf_counter() - started))
+                headers.append(QUERY_COUNT_HEADER, str(stats.queries))
+                sql_metrics.queries_per_request.observe(stats.queries)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+@registry.register
+def collect_sql_metrics() -> List[Metric]:
+    slow = Metric("db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_THRESHOLD_MS")
+    slow.add(sql_metrics.slow_queries)
+    per_request = Metric("http_request_db_queries", "histogram", "SQL statements issued per HTTP request")
+    sql_metrics.queries_per_request.to_metric(per_request)
+    return [slow, per_request]
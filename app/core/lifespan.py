@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration.configuration import settings
+from app.core import dabatase
+from app.core.events import events_transport, route_listener
+from app.core.metrics import Metric, registry
+from app.core.partitions import partition_maintenance
+from app.core.schema import schema_fingerprint, stored_version
+from app.core.writebehind import completion_queue
+from app.enum.RouteStatus import RouteStatus
+from app.repository.AsyncPerformanceRepository import AsyncPerformanceRepository
+from app.repository.AsyncRouteRepository import AsyncRouteRepository
+from app.repository.AsyncVehicleRepository import AsyncVehicleRepository
+from app.repository.PerformanceRepository import PerformanceRepository
+from app.repository.RouteRepository import RouteRepository
+from app.repository.VehicleRepository import VehicleRepository
+from app.service.AsyncRouteService import flush_completions as flush_completions_async
+from app.service.RouteService import flush_completions as flush_completions_sync
+
+
+logger = logging.getLogger("integriapp.startup")
+
+
+class SchemaMismatchError(RuntimeError):
+    pass
+
+
+class StartupStats:
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.schema_ok = False
+        self.warm_connections = 0
+
+
+startup_stats = StartupStats()
+
+maintenance_task: Optional[asyncio.Task] = None
+
+
+def check_schema(connection: Connection) -> None:
+    expected = schema_fingerprint()
+    try:
+        found = stored_version(connection)
+    except DBAPIError:
+        connection.rollback()
+        found = None
+
+    startup_stats.schema_ok = found == expected
+    if startup_stats.schema_ok:
+        return
+
+    message = (
+        f"Versión de esquema {found or 'ausente'} distinta de la esperada {expected}; "
+        "ejecuta python -m app.cli migrate"
+    )
+    if settings.schema_check == "strict":
+        raise SchemaMismatchError(message)
+    logger.warning(message)
+
+
+def warm_statements(db: Session) -> None:
+    # Ids inexistentes: basta con ejecutar para que el engine guarde el SQL compilado
+    vehicles = VehicleRepository(db)
+    vehicles.get_by_id(0)
+    vehicles.get_all(limit=1)
+    vehicles.get_versions(limit=1)
+
+    routes = RouteRepository(db)
+    routes.get_by_id(0)
+    routes.get_all(limit=1)
+    routes.get_versions(limit=1)
+    routes.get_all(limit=1, status=RouteStatus.ASSIGNED, vehicle_id=0)
+
+    performances = PerformanceRepository(db)
+    performances.get_by_route_id(0)
+    performances.get_all(limit=1)
+    performances.get_versions(limit=1)
+
+
+async def warm_statements_async(db: AsyncSession) -> None:
+    vehicles = AsyncVehicleRepository(db)
+    await vehicles.get_by_id(0)
+    await vehicles.get_all(limit=1)
+    await vehicles.get_versions(limit=1)
+
+    routes = AsyncRouteRepository(db)
+    await routes.get_by_id(0)
+    await routes.get_all(limit=1)
+    await routes.get_versions(limit=1)
+    await routes.get_all(limit=1, status=RouteStatus.ASSIGNED, vehicle_id=0)
+
+    performances = AsyncPerformanceRepository(db)
+    await performances.get_by_route_id(0)
+    await performances.get_all(limit=1)
+    await performances.get_versions(limit=1)
+
+
+async def flush_completions(items):
+    if settings.database_mode == "async":
+        return await flush_completions_async(items)
+    return await asyncio.to_thread(flush_completions_sync, items)
+
+
+def warmup_size() -> int:
+    return max(min(settings.db_pool_warmup, settings.db_pool_size), 0)
+
+
+def should_warm_statements() -> bool:
+    return settings.warmup_statements and (startup_stats.schema_ok or settings.schema_check == "off")
+
+
+def prepare_sync() -> None:
+    engine = dabatase.engine
+    connections: List[Connection] = []
+    try:
+        for _ in range(max(warmup_size(), 1)):
+            connections.append(engine.connect())
+        if settings.schema_check != "off":
+            check_schema(connections[0])
+        startup_stats.warm_connections = len(connections)
+    finally:
+        for connection in connections:
+            connection.close()
+
+    if should_warm_statements():
+        with dabatase.SessionLocal() as db:
+            warm_statements(db)
+
+
+async def prepare_async() -> None:
+    engine = dabatase.async_engine
+    async with AsyncExitStack() as stack:
+        connections = [await stack.enter_async_context(engine.connect()) for _ in range(max(warmup_size(), 1))]
+        if settings.schema_check != "off":
+            await connections[0].run_sync(check_schema)
+        startup_stats.warm_connections = len(connections)
+
+    if should_warm_statements():
+        async with dabatase.AsyncSessionLocal() as db:
+            await warm_statements_async(db)
+
+
+async def startup() -> None:
+    global maintenance_task
+    started = time.perf_counter()
+    try:
+        if settings.database_mode == "async":
+            await asyncio.wait_for(prepare_async(), settings.startup_timeout_seconds)
+        else:
+            await asyncio.wait_for(asyncio.to_thread(prepare_sync), settings.startup_timeout_seconds)
+    except (asyncio.TimeoutError, SQLAlchemyError, OSError) as error:
+        if settings.schema_check == "strict":
+            raise
+        # Una base lenta o caída no bloquea el arranque; las requests fallarán hasta que responda
+        logger.warning("Arranque sin verificar la base de datos: %r", error)
+    finally:
+        startup_stats.seconds = time.perf_counter() - started
+    if events_transport() == "postgres":
+        route_listener.start()
+    if settings.performance_partitioning and dabatase.engine.dialect.name == "postgresql":
+        maintenance_task = asyncio.create_task(partition_maintenance())
+    if settings.completion_write_behind:
+        await completion_queue.start(flush_completions)
+    logger.info(
+        "Arranque listo en %.1f ms (%d conexiones precalentadas)",
+        startup_stats.seconds * 1000,
+        startup_stats.warm_connections,
+    )
+
+
+async def shutdown() -> None:
+    if maintenance_task is not None:
+        maintenance_task.cancel()
+    # Drenar antes de cerrar el listener y los engines: el flusher publica eventos y usa el pool
+    await completion_queue.stop(flush_completions)
+    await asyncio.to_thread(route_listener.stop)
+    if dabatase.async_engine is not None:
+        await dabatase.async_engine.dispose()
+    for replica_engine in dabatase.replica_engines:
+        if settings.database_mode == "async":
+            await replica_engine.dispose()
+        else:
+            replica_engine.dispose()
+    dabatase.engine.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    yield
+    await shutdown()
+
+
+@registry.register
+def collect_startup_metrics() -> List[Metric]:
+    seconds = Metric("app_startup_seconds", "gauge", "Time spent in the startup schema check and warmup")
+    seconds.add(round(startup_stats.seconds, 6))
+    schema = Metric("app_schema_version_ok", "gauge", "1 when the stored schema version matches the models")
+    schema.add(int(startup_stats.schema_ok))
+    return [seconds, schema]
@@ -0,0 +1,116 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metric:
+
+    def __init__(self, name: str, kind: str, help_text: str, samples: Optional[List[Sample]] = None):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.samples = samples or []
+
+    def add(self, value: float, labels: Optional[Labels] = None, suffix: str = "") -> "Metric":
+        self.samples.append((suffix, labels or {}, value))
+        return self
+
+
+class Histogram:
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            if value > self._max:
+                self._max = value
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[index] += 1
+                    break
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    def to_metric(self, metric: Metric, labels: Optional[Labels] = None) -> Metric:
+        labels = labels or {}
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            metric.add(cumulative, {**labels, "le": repr(bound)}, "_bucket")
+        metric.add(count, {**labels, "le": "+Inf"}, "_bucket")
+        metric.add(total, labels, "_sum")
+        metric.add(count, labels, "_count")
+        return metric
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, collector: Callable[[], Iterable[Metric]]) -> Callable[[], Iterable[Metric]]:
+        self._collectors.append(collector)
+        return collector
+
+    def collect(self) -> List[Metric]:
+        metrics = []
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return metrics
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples:
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
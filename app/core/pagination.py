@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_value(kind: type, value: Any) -> Any:
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    # Tipo exacto: json.loads devuelve bool o float para `true`/`1.5`, y bool es subclase de int
+    if type(value) is not kind:
+        raise TypeError(value)
+    return value
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError(cursor)
+        return tuple(_decode_value(kind, value) for kind, value in zip(types, payload))
+    except (ValueError, TypeError, UnicodeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def next_cursor(items: Sequence[Any], limit: int, *fields: str) -> Optional[str]:
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(*(getattr(last, field) for field in fields))
+
+
+def set_next_cursor(response: Response, items: List[Any], limit: int, *fields: str) -> None:
+    cursor = next_cursor(items, limit, *fields)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
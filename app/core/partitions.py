@@ -0,0 +1,257 @@
+import asyncio
+import gzip
+import logging
+import os
+from datetime import UTC, date, datetime
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import column, delete, func, insert, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.configuration.configuration import settings
+from app.core import dabatase
+from app.core.export import encode_rows
+from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+
+
+logger = logging.getLogger("integriapp.partitions")
+
+PARENT = Performance.__tablename__
+DEFAULT_PARTITION = f"{PARENT}_default"
+LEGACY_TABLE = f"{PARENT}_unpartitioned"
+
+ARCHIVE_COLUMNS = ("route_id", "distance_km", "fuel_consumed", "duration", "notes", "created_at")
+
+RELKIND = text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)")
+PARTITIONS = text(
+    "SELECT child.relname FROM pg_inherits"
+    " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+    " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+    " WHERE parent.relname = :parent"
+    " ORDER BY child.relname"
+)
+PRIMARY_KEY_NAME = text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'p'")
+LOCK = text("SELECT pg_advisory_xact_lock(hashtext(:name))")
+
+Exporter = Callable[[str, Iterable[Sequence]], None]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bound(month: date) -> datetime:
+    # Límites en UTC explícito: no dependen del TimeZone de la sesión que crea la partición
+    return datetime(month.year, month.month, 1, tzinfo=UTC)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    prefix = f"{PARENT}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], "%Y_%m").date()
+    except ValueError:
+        return None
+
+
+def partitioning_enabled(connection: Connection) -> bool:
+    return settings.performance_partitioning and connection.dialect.name == "postgresql"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.execute(RELKIND, {"name": PARENT}).scalar() == "p"
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    return list(connection.execute(PARTITIONS, {"parent": PARENT}).scalars())
+
+
+def table_exists(connection: Connection, name: str) -> bool:
+    return connection.execute(RELKIND, {"name": name}).scalar() is not None
+
+
+def source_table(name: str):
+    return table(name, *(column(name, Performance.__table__.c[name].type) for name in ARCHIVE_COLUMNS))
+
+
+def months_with_rows(connection: Connection, name: str) -> List[date]:
+    month = func.date_trunc("month", func.timezone("UTC", source_table(name).c.created_at))
+    rows = connection.execute(select(month.label("month")).select_from(source_table(name)).distinct())
+    return [value.date() if isinstance(value, datetime) else value for value in rows.scalars()]
+
+
+def ensure_default_partition(connection: Connection) -> None:
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+
+def create_partition(connection: Connection, month: date) -> bool:
+    name = partition_name(month)
+    if table_exists(connection, name):
+        return False
+
+    start, end = month_bound(month), month_bound(add_months(month, 1))
+    bounds = {"start": start, "end": end}
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    # Filas de ese mes que cayeron en la partición default: ATTACH falla si quedan ahí
+    connection.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"),
+        bounds
+    )
+    connection.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"),
+        bounds
+    )
+    connection.execute(text(
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return True
+
+
+def ensure_partitions(connection: Connection, ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    if not partitioning_enabled(connection):
+        return []
+    if not is_partitioned(connection):
+        logger.warning("%s no está particionada: ejecuta python -m app.cli partition-performances", PARENT)
+        return []
+
+    # Varios workers pueden ejecutar el mantenimiento a la vez
+    connection.execute(LOCK, {"name": PARENT})
+    ensure_default_partition(connection)
+    current = month_start(today or datetime.now(UTC).date())
+    ahead = settings.performance_partitions_ahead if ahead is None else ahead
+    months = {add_months(current, offset) for offset in range(ahead + 1)}
+    months.update(months_with_rows(connection, DEFAULT_PARTITION))
+    return [partition_name(month) for month in sorted(months) if create_partition(connection, month)]
+
+
+def run_partition_maintenance() -> List[str]:
+    with dabatase.engine.begin() as connection:
+        return ensure_partitions(connection)
+
+
+async def partition_maintenance() -> None:
+    # Crear el mes siguiente con anticipación evita que sus filas caigan en la partición default
+    while True:
+        try:
+            created = await asyncio.to_thread(run_partition_maintenance)
+            if created:
+                logger.info("Particiones creadas: %s", ", ".join(created))
+        except SQLAlchemyError as error:
+            logger.warning("No se pudieron crear las particiones de %s: %r", PARENT, error)
+        await asyncio.sleep(settings.performance_partition_check_hours * 3600)
+
+
+def partition_existing_table(connection: Connection, today: Optional[date] = None) -> int:
+    if not partitioning_enabled(connection):
+        raise RuntimeError("Activa PERFORMANCE_PARTITIONING y usa PostgreSQL para particionar performances")
+    if is_partitioned(connection):
+        return 0
+
+    connection.execute(LOCK, {"name": PARENT})
+    primary_key = connection.execute(PRIMARY_KEY_NAME, {"name": PARENT}).scalar()
+    connection.execute(text(f"ALTER TABLE {PARENT} RENAME TO {LEGACY_TABLE}"))
+    # Los nombres de índices y de la PK son globales al esquema: se liberan para la tabla nueva
+    if primary_key:
+        connection.execute(text(f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {primary_key} TO {LEGACY_TABLE}_pkey"))
+    for index in Performance.__table__.indexes:
+        connection.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_legacy"))
+
+    Performance.__table__.create(connection)
+    ensure_default_partition(connection)
+    current = month_start(today or datetime.now(UTC).date())
+    months = {add_months(current, offset) for offset in range(settings.performance_partitions_ahead + 1)}
+    months.update(months_with_rows(connection, LEGACY_TABLE))
+    for month in sorted(months):
+        create_partition(connection, month)
+
+    columns = ", ".join(column.name for column in Performance.__table__.columns)
+    moved = connection.execute(text(f"INSERT INTO {PARENT} ({columns}) SELECT {columns} FROM {LEGACY_TABLE}")).rowcount
+    connection.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    return moved
+
+
+def retention_cutoff(keep_months: int, today: Optional[date] = None) -> date:
+    return add_months(month_start(today or datetime.now(UTC).date()), -keep_months)
+
+
+def export_file(directory: str) -> Exporter:
+    def write(name: str, rows: Iterable[Sequence]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with gzip.open(os.path.join(directory, f"{name}.ndjson.gz"), "wb") as handle:
+            for batch in rows:
+                handle.write(encode_rows(ARCHIVE_COLUMNS, batch, "ndjson"))
+
+    return write
+
+
+def archive_rows(
+    connection: Connection,
+    name: str,
+    cutoff: Optional[date],
+    archive: bool,
+    exporter: Optional[Exporter],
+    purge: bool = True,
+) -> int:
+    source = source_table(name)
+    condition = [source.c.created_at < month_bound(cutoff)] if cutoff is not None else []
+    rows = select(*source.c).where(*condition)
+
+    if exporter is not None:
+        label = name if cutoff is None else f"{name}_before_{cutoff:%Y_%m}"
+        result = connection.execution_options(yield_per=settings.export_batch_size).execute(
+            rows.order_by(source.c.created_at)
+        )
+        exporter(label, result.partitions())
+
+    copied = None
+    if archive:
+        copied = connection.execute(insert(PerformanceArchive).from_select(list(ARCHIVE_COLUMNS), rows)).rowcount
+    if purge:
+        return connection.execute(delete(source).where(*condition)).rowcount
+    if copied is not None:
+        return copied
+    return connection.execute(select(func.count()).select_from(source).where(*condition)).scalar()
+
+
+def apply_retention(
+    connection: Connection,
+    keep_months: int,
+    archive: bool = True,
+    exporter: Optional[Exporter] = None,
+    today: Optional[date] = None,
+) -> List[Tuple[str, int]]:
+    cutoff = retention_cutoff(keep_months, today)
+    moved = []
+
+    if is_partitioned(connection):
+        connection.execute(LOCK, {"name": PARENT})
+        for name in list_partitions(connection):
+            month = partition_month(name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            # Un mes completo fuera de la ventana sale de la tabla caliente con DETACH + DROP, sin DELETE fila a fila
+            rows = archive_rows(connection, name, None, archive, exporter, purge=False)
+            connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            connection.execute(text(f"DROP TABLE {name}"))
+            moved.append((name, rows))
+        residual = DEFAULT_PARTITION
+    else:
+        residual = PARENT
+
+    rows = archive_rows(connection, residual, cutoff, archive, exporter)
+    if rows:
+        moved.append((residual, rows))
+    return moved
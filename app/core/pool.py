@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.configuration.configuration import settings
+from app.core.cache import cache_backend
+from app.core.metrics import Histogram, Metric, registry
+
+
+class PoolMetrics:
+
+    def __init__(self):
+        self.checkout_wait = Histogram()
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+class InstrumentedPoolMixin:
+
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, float]:
+        wait = self.metrics.checkout_wait
+        in_use = self.checkedout()
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "in_use": in_use,
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": wait.count,
+            "timeouts": self.metrics.timeouts,
+            "wait_seconds_total": round(wait.sum, 6),
+            "wait_seconds_max": round(wait.max, 6),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def process_local_state() -> bool:
+    # El caché en memoria y los estados del write-behind viven en cada proceso: los demás workers no ven sus cambios
+    backend = cache_backend()
+    if backend == "redis":
+        return False
+    return backend == "memory" or settings.completion_write_behind
+
+
+def worker_count() -> int:
+    if settings.web_workers:
+        return settings.web_workers
+    # Sin Redis el número de CPUs dejaría workers con cachés divergentes: en automático se queda en uno
+    return 1 if process_local_state() else os.cpu_count() or 1
+
+
+def budget_pool_size(budget: int, workers: int, reserved: int, pool_size: int) -> Tuple[int, int]:
+    # Cada worker recibe una parte fija del presupuesto; lo que no es pool persistente queda como overflow
+    share = budget // workers - reserved
+    if share < 1:
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={budget} no alcanza para {workers} workers "
+            f"con {reserved} conexiones reservadas por worker"
+        )
+    size = min(pool_size, share)
+    return size, share - size
+
+
+_engines: Dict[str, object] = {}
+
+
+def register_engine(name: str, engine) -> None:
+    _engines[name] = engine
+
+
+def pool_stats() -> Dict[str, Dict[str, float]]:
+    return {
+        name: engine.pool.stats()
+        for name, engine in _engines.items()
+        if isinstance(engine.pool, InstrumentedPoolMixin)
+    }
+
+
+@registry.register
+def collect_pool_metrics() -> List[Metric]:
+    size = Metric("db_pool_size", "gauge", "Configured number of persistent connections")
+    max_overflow = Metric("db_pool_max_overflow", "gauge", "Configured overflow connections")
+    in_use = Metric("db_pool_connections_in_use", "gauge", "Connections currently checked out")
+    idle = Metric("db_pool_connections_idle", "gauge", "Connections idle in the pool")
+    overflow = Metric("db_pool_overflow", "gauge", "Overflow connections currently open")
+    timeouts = Metric("db_pool_checkout_timeouts_total", "counter", "Checkouts that hit pool_timeout")
+    wait = Metric("db_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a connection")
+
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedPoolMixin):
+            continue
+        labels = {"pool": name}
+        size.add(pool.size(), labels)
+        max_overflow.add(pool._max_overflow, labels)
+        in_use.add(pool.checkedout(), labels)
+        idle.add(pool.checkedin(), labels)
+        overflow.add(max(pool.overflow(), 0), labels)
+        timeouts.add(pool.metrics.timeouts, labels)
+        pool.metrics.checkout_wait.to_metric(wait, labels)
+
+    return [size, max_overflow, in_use, idle, overflow, timeouts, wait]
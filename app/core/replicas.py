@@ -0,0 +1,136 @@
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Dict, List
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Metric, registry
+
+
+logger = logging.getLogger("integriapp.replicas")
+
+PRIMARY_UNTIL_COOKIE = "integriapp_primary_until"
+REPLICA_SESSION_KEY = "replica"
+WRITE_STATE_KEY = "primary_write"
+
+
+def parse_replica_urls(raw: str) -> List[str]:
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+def from_replica(db) -> bool:
+    return bool(db.info.get(REPLICA_SESSION_KEY, False))
+
+
+class ReplicaSet:
+
+    def __init__(self, engines: List, retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self.reads = {"primary": 0, "replica": 0}
+        self.failovers = 0
+        self._down_until = [0.0] * len(engines)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[int]:
+        # Round-robin a partir del turno siguiente; una réplica caída no vuelve a probarse hasta que vence su espera
+        if not self.engines:
+            return []
+        start = next(self._turn)
+        now = time.monotonic()
+        total = len(self.engines)
+        order = ((start + offset) % total for offset in range(total))
+        return [index for index in order if self._down_until[index] <= now]
+
+    def is_up(self, index: int) -> bool:
+        return self._down_until[index] <= time.monotonic()
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+            self.failovers += 1
+        logger.warning("Réplica %d no disponible, reintento en %.0f s: %s", index, self.retry_seconds, error)
+
+    def record_read(self, target: str) -> None:
+        with self._lock:
+            self.reads[target] += 1
+
+    def status(self) -> List[Dict[str, object]]:
+        return [
+            {"replica": index, "up": self.is_up(index)}
+            for index in range(len(self.engines))
+        ]
+
+
+def recent_write(connection: HTTPConnection) -> bool:
+    raw = connection.cookies.get(PRIMARY_UNTIL_COOKIE)
+    try:
+        return float(raw) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+def mark_write(connection: HTTPConnection) -> None:
+    setattr(connection.state, WRITE_STATE_KEY, True)
+
+
+def primary_until_cookie(window_seconds: float) -> str:
+    until = time.time() + window_seconds
+    return (
+        f"{PRIMARY_UNTIL_COOKIE}={until:.3f}; Max-Age={math.ceil(window_seconds)}; "
+        "Path=/; HttpOnly; SameSite=Lax"
+    )
+
+
+class ReadYourWritesMiddleware:
+
+    def __init__(self, app: ASGIApp, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.window_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            # Sólo las requests que abrieron una sesión de escritura y terminaron bien fijan al cliente al primario
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                if scope.get("state", {}).get(WRITE_STATE_KEY):
+                    MutableHeaders(scope=message).append("set-cookie", primary_until_cookie(self.window_seconds))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+_replica_sets: Dict[str, ReplicaSet] = {}
+
+
+def register_replicas(name: str, replica_set: ReplicaSet) -> None:
+    _replica_sets[name] = replica_set
+
+
+def replica_status() -> Dict[str, List[Dict[str, object]]]:
+    return {name: replica_set.status() for name, replica_set in _replica_sets.items() if replica_set.engines}
+
+
+@registry.register
+def collect_replica_metrics() -> List[Metric]:
+    up = Metric("db_replica_up", "gauge", "1 while the replica is eligible for reads")
+    reads = Metric("db_read_sessions_total", "counter", "Read sessions opened per target")
+    failovers = Metric("db_replica_failovers_total", "counter", "Reads moved off a replica after a connection error")
+
+    for name, replica_set in _replica_sets.items():
+        for index in range(len(replica_set.engines)):
+            up.add(int(replica_set.is_up(index)), {"set": name, "replica": str(index)})
+        for target, total in replica_set.reads.items():
+            reads.add(total, {"set": name, "target": target})
+        failovers.add(replica_set.failovers, {"set": name})
+
+    return [up, reads, failovers]
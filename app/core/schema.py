@@ -0,0 +1,114 @@
+import hashlib
+from functools import lru_cache
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+from app.core.dabatase import Base
+
+
+# Índices de columna sueltos que quedaron cubiertos por los compuestos/parciales del modelo
+OBSOLETE_INDEXES = (
+    "ix_vehicles_id",
+    "ix_vehicles_active_id",
+    "ix_vehicles_brand",
+    "ix_vehicles_model",
+    "ix_routes_id",
+    "ix_routes_vehicle_id",
+    "ix_routes_origin",
+    "ix_routes_destination",
+)
+
+
+# Extensiones que requieren los índices declarados, por dialecto
+EXTENSIONS = {
+    "postgresql": ("pg_trgm",),
+}
+
+
+def load_models() -> None:
+    from app.model import (  # noqa: F401
+        Performance, PerformanceArchive, Route, SchemaVersion, Vehicle, VehicleDailyEfficiency
+    )
+
+
+@lru_cache(maxsize=1)
+def schema_fingerprint() -> str:
+    load_models()
+    digest = hashlib.blake2b(digest_size=8)
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}".encode())
+        for index in sorted(table.indexes, key=lambda item: item.name):
+            options = sorted((key, str(value)) for key, value in index.dialect_kwargs.items())
+            expressions = [str(expression) for expression in index.expressions]
+            digest.update(f"{index.name}:{expressions}:{index.unique}:{options}".encode())
+    return digest.hexdigest()
+
+
+def stored_version(connection: Connection) -> Optional[str]:
+    from app.model.SchemaVersion import SchemaVersion
+
+    return connection.execute(select(SchemaVersion.version).limit(1)).scalar()
+
+
+def stamp(connection: Connection) -> str:
+    from app.model.SchemaVersion import SchemaVersion
+
+    version = schema_fingerprint()
+    connection.execute(delete(SchemaVersion))
+    connection.execute(insert(SchemaVersion).values(version=version))
+    return version
+
+
+def create_extensions(connection: Connection) -> None:
+    for name in EXTENSIONS.get(connection.dialect.name, ()):
+        connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+
+
+def sync_indexes(connection: Connection, drop_obsolete: bool = True) -> List[str]:
+    load_models()
+    create_extensions(connection)
+    if drop_obsolete:
+        for name in OBSOLETE_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    names = []
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda item: item.name):
+            index.create(connection, checkfirst=True)
+            names.append(f"{table.name}: {index.name}")
+    return names
+
+
+def add_missing_columns(connection: Connection) -> List[str]:
+    # Sólo agrega columnas nuevas (con default o nullable); cambios de tipo o bajas siguen siendo manuales
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            definition = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def migrate(connection: Connection) -> str:
+    from app.core.partitions import ensure_partitions
+
+    load_models()
+    create_extensions(connection)
+    Base.metadata.create_all(bind=connection)
+    add_missing_columns(connection)
+    sync_indexes(connection)
+    ensure_partitions(connection)
+    return stamp(connection)
@@ -0,0 +1,198 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.metrics import Metric, registry
+
+
+SEARCH_TRUNCATED_HEADER = "X-Search-Truncated"
+
+# Consultas más cortas que un trigrama no tienen n-gramas: se resuelven por prefijo en SQL
+NGRAM_SIZE = 3
+
+# Orden de relevancia compartido por el índice en memoria y el SQL de PostgreSQL
+RANK_EXACT_PLATE = 0
+RANK_PLATE_PREFIX = 1
+RANK_FIELD_PREFIX = 2
+RANK_SUBSTRING = 3
+
+
+class SearchDocument(NamedTuple):
+    plate_number: str
+    brand: str
+    model: str
+    is_active: bool
+
+
+def normalize(text: Optional[str]) -> str:
+    return (text or "").strip().lower()
+
+
+def like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def match_rank(query: str, document: SearchDocument) -> Optional[int]:
+    if document.plate_number == query:
+        return RANK_EXACT_PLATE
+    if document.plate_number.startswith(query):
+        return RANK_PLATE_PREFIX
+    if document.brand.startswith(query) or document.model.startswith(query):
+        return RANK_FIELD_PREFIX
+    if query in document.plate_number or query in document.brand or query in document.model:
+        return RANK_SUBSTRING
+    return None
+
+
+class NGramIndex:
+
+    def __init__(self, name: str, n: int = NGRAM_SIZE):
+        self.name = name
+        self.n = n
+        self.loaded = False
+        self.generation: Optional[tuple] = None
+        self.checked_at = 0.0
+        self.reloads = 0
+        self._documents: Dict[int, SearchDocument] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._pending: Optional[List[Tuple[str, int, Any]]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def grams(self, text: str) -> Set[str]:
+        return {text[start:start + self.n] for start in range(len(text) - self.n + 1)}
+
+    def _document_grams(self, document: SearchDocument) -> Set[str]:
+        return self.grams(document.plate_number) | self.grams(document.brand) | self.grams(document.model)
+
+    def _remove(self, vehicle_id: int) -> None:
+        document = self._documents.pop(vehicle_id, None)
+        if document is None:
+            return
+        for gram in self._document_grams(document):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(vehicle_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def _upsert(self, vehicle_id: int, document: SearchDocument) -> None:
+        self._remove(vehicle_id)
+        self._documents[vehicle_id] = document
+        for gram in self._document_grams(document):
+            self._postings[gram].add(vehicle_id)
+
+    def check_due(self, interval: float) -> bool:
+        return not self.loaded or time.monotonic() - self.checked_at >= interval
+
+    def is_current(self, generation: tuple) -> bool:
+        # Otros procesos (CLI, bench.seed, otros workers) escriben sin pasar por este índice: la generación lo delata
+        if not self.loaded or generation != self.generation:
+            return False
+        self.checked_at = time.monotonic()
+        return True
+
+    def begin_load(self) -> bool:
+        with self._lock:
+            if self._pending is not None:
+                return False
+            self._pending = []
+            return True
+
+    def finish_load(self, rows: Iterable[Any], generation: tuple) -> None:
+        with self._lock:
+            if self.loaded:
+                self.reloads += 1
+            self._documents = {}
+            self._postings = defaultdict(set)
+            for row in rows:
+                self._upsert(row.id, to_document(row))
+            # Escrituras confirmadas mientras se leía la tabla
+            for action, vehicle_id, document in self._pending or ():
+                if action == "upsert":
+                    self._upsert(vehicle_id, document)
+                else:
+                    self._remove(vehicle_id)
+            self._pending = None
+            self.generation = generation
+            self.checked_at = time.monotonic()
+            self.loaded = True
+
+    def abort_load(self) -> None:
+        with self._lock:
+            self._pending = None
+
+    def upsert(self, vehicle: Any) -> None:
+        with self._lock:
+            document = to_document(vehicle)
+            if self._pending is not None:
+                self._pending.append(("upsert", vehicle.id, document))
+            if self.loaded:
+                self._upsert(vehicle.id, document)
+
+    def remove(self, vehicle_id: int) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("remove", vehicle_id, None))
+            if self.loaded:
+                self._remove(vehicle_id)
+
+    def search(
+        self,
+        query: str,
+        skip: int,
+        limit: int,
+        active_only: bool,
+        max_candidates: int,
+    ) -> Tuple[List[int], bool]:
+        query = normalize(query)
+        with self._lock:
+            postings = sorted(
+                (self._postings.get(gram, set()) for gram in self.grams(query)),
+                key=len
+            )
+            if not postings:
+                return [], False
+
+            # Se recorre la lista más corta y se descarta contra las demás, sin materializar intersecciones
+            rest = postings[1:]
+            ranked = []
+            for vehicle_id in postings[0]:
+                if any(vehicle_id not in posting for posting in rest):
+                    continue
+                document = self._documents[vehicle_id]
+                if active_only and not document.is_active:
+                    continue
+                rank = match_rank(query, document)
+                if rank is None:
+                    continue
+                ranked.append((rank, vehicle_id))
+
+        # Se puntúan todas las coincidencias y se recorta después: una placa exacta nunca queda fuera del tope
+        best = heapq.nsmallest(max_candidates, ranked)
+        return [vehicle_id for _, vehicle_id in best[skip:skip + limit]], len(ranked) > max_candidates
+
+
+def to_document(vehicle: Any) -> SearchDocument:
+    return SearchDocument(
+        plate_number=normalize(vehicle.plate_number),
+        brand=normalize(vehicle.brand),
+        model=normalize(vehicle.model),
+        is_active=bool(vehicle.is_active),
+    )
+
+
+@registry.register
+def collect_search_metrics() -> List[Metric]:
+    documents = Metric("search_index_documents", "gauge", "Vehicles held by the in-process n-gram index")
+    documents.add(len(vehicle_search_index), {"index": vehicle_search_index.name})
+    reloads = Metric("search_index_reloads_total", "counter", "Index rebuilds after the vehicles table changed elsewhere")
+    reloads.add(vehicle_search_index.reloads, {"index": vehicle_search_index.name})
+    return [documents, reloads]
+
+
+vehicle_search_index = NGramIndex("vehicles")
@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.instrumentation import measure_serialization
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[ModelT]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def validate_list(model: Type[ModelT], items: Iterable[Any]) -> List[ModelT]:
+    with measure_serialization():
+        return list_adapter(model).validate_python(list(items), from_attributes=True)
+
+
+class EncodedJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content
+
+
+def list_response(model: Type[ModelT], items: List[ModelT]) -> EncodedJSONResponse:
+    with measure_serialization():
+        body = list_adapter(model).dump_json(items)
+    return EncodedJSONResponse(body)
+
+
+def model_response(instance: BaseModel) -> EncodedJSONResponse:
+    with measure_serialization():
+        body = instance.model_dump_json().encode("utf-8")
+    return EncodedJSONResponse(body)
@@ -0,0 +1,35 @@
+from typing import Any, List, Sequence
+
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+RETURNING_OPTIONS = {"populate_existing": True, "synchronize_session": False}
+
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_name(db) -> str:
+    return db.get_bind().dialect.name
+
+
+def dialect_insert(db, entity):
+    name = dialect_name(db)
+    if name not in DIALECT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT no soportado para el dialecto {name}")
+    return DIALECT_INSERTS[name](entity)
+
+
+def ids_condition(db, column, ids: List[int]):
+    # Un único parámetro array: el SQL no cambia con la cantidad de ids y el plan se reutiliza
+    if dialect_name(db) == "postgresql":
+        return column == any_(bindparam("ids", ids, type_=postgresql.ARRAY(column.type)))
+    return column.in_(ids)
+
+
+def order_by_ids(rows: Sequence[Any], ids: List[int]) -> List[Any]:
+    by_id = {row.id: row for row in rows}
+    return [by_id[row_id] for row_id in ids if row_id in by_id]
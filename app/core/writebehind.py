@@ -0,0 +1,385 @@
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+
+from app.configuration.configuration import settings
+from app.core.cache import CacheBackend, LRUCache, build_cache, cache_backend
+from app.core.metrics import Histogram, Metric, registry
+from app.schema.RouteComplete import RouteCompleteBatchResponse, RouteCompleteItem
+
+
+logger = logging.getLogger("integriapp.writebehind")
+
+JOURNAL_PATTERN = "completions-*.ndjson"
+JOURNAL_COMPACT_BYTES = 8 * 1024 * 1024
+MAX_FLUSH_ATTEMPTS = 3
+MAX_RETRY_SECONDS = 30.0
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, OSError)
+
+Entry = Tuple[str, RouteCompleteItem]
+Flusher = Callable[[List[RouteCompleteItem]], Awaitable[RouteCompleteBatchResponse]]
+
+
+def build_status_store() -> CacheBackend:
+    # Sin estado el token no sirve de nada: con CACHE_BACKEND=none se guarda igualmente en memoria del proceso
+    ttl = settings.write_behind_status_ttl_seconds
+    if cache_backend() == "none":
+        return LRUCache("completions", ttl, settings.write_behind_queue_size * 2)
+    return build_cache("completions", ttl=ttl, max_entries=settings.write_behind_queue_size * 2)
+
+
+def read_pending(path: str) -> List[Entry]:
+    pending: Dict[str, RouteCompleteItem] = {}
+    with open(path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Última línea a medio escribir si el proceso murió durante el append
+                continue
+            if "ack" in record:
+                for token in record["ack"]:
+                    pending.pop(token, None)
+            else:
+                pending[record["token"]] = RouteCompleteItem.model_validate(record["item"])
+    return list(pending.items())
+
+
+class CompletionJournal:
+
+    def __init__(self, directory: str, fsync: bool):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"completions-{os.getpid()}.ndjson")
+        self.fsync = fsync
+        self._file = open(self.path, "a+", encoding="utf-8")
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def recover(self) -> List[Entry]:
+        # Un journal cuyo lock se puede tomar pertenece a un proceso que ya no existe; el propio puede venir de un PID reutilizado
+        pending = read_pending(self.path)
+        for path in sorted(glob.glob(os.path.join(self.directory, JOURNAL_PATTERN))):
+            if path == self.path:
+                continue
+            with open(path, "a+", encoding="utf-8") as orphan:
+                try:
+                    fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                pending.extend(read_pending(path))
+                os.remove(path)
+        self.rewrite(pending)
+        return pending
+
+    def append(self, token: str, item: RouteCompleteItem) -> None:
+        self._write({"token": token, "item": item.model_dump()})
+
+    def ack(self, tokens: List[str]) -> None:
+        self._write({"ack": tokens})
+
+    def size(self) -> int:
+        return self._file.tell()
+
+    def rewrite(self, pending: List[Entry]) -> None:
+        self._file.seek(0)
+        self._file.truncate()
+        for token, item in pending:
+            self._file.write(json.dumps({"token": token, "item": item.model_dump()}, separators=(",", ":")) + "\n")
+        self._sync()
+
+    def close(self, remove: bool) -> None:
+        if remove:
+            os.remove(self.path)
+        self._file.close()
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+
+class FlushMetrics:
+
+    def __init__(self):
+        self.flushes = 0
+        self.records = 0
+        self.failures = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flush_seconds = Histogram()
+        self.batch_sizes = Histogram((1, 10, 50, 100, 250, 500, 1000, 2500, 5000))
+
+
+class CompletionQueue:
+
+    def __init__(self):
+        self.max_size = settings.write_behind_queue_size
+        self.batch_size = min(settings.write_behind_batch_size, settings.batch_complete_max_items)
+        self.flush_seconds = settings.write_behind_flush_ms / 1000
+        self.statuses: Optional[CacheBackend] = None
+        self.metrics = FlushMetrics()
+        self._pending: Deque[Entry] = deque()
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._journal: Optional[CompletionJournal] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def start(self, flush: Flusher) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._stopping = False
+        if self.statuses is None:
+            self.statuses = build_status_store()
+        if settings.write_behind_journal_dir:
+            self._journal = CompletionJournal(settings.write_behind_journal_dir, settings.write_behind_journal_fsync)
+            recovered = self._journal.recover()
+            self._pending.extend(recovered)
+            await self.statuses.set_many_async({
+                token: {"token": token, "route_id": item.route_id, "status": "queued"}
+                for token, item in recovered
+            })
+            if recovered:
+                logger.warning("Recuperados %d completados pendientes del journal", len(recovered))
+        self._task = asyncio.create_task(self._run(flush))
+
+    def enqueue(self, item: RouteCompleteItem) -> dict:
+        token = uuid.uuid4().hex
+        queued = {"token": token, "route_id": item.route_id, "status": "queued"}
+        with self._lock:
+            self._check_capacity()
+            # El estado se fija antes de encolar para que el flusher no lo pise con "queued" después de escribirlo
+            self.statuses.set(token, queued)
+            full = self._append(token, item)
+
+        if full:
+            self._notify()
+        return queued
+
+    async def enqueue_async(self, item: RouteCompleteItem) -> dict:
+        # En el event loop el estado se escribe sin bloquear; el flusher no ve el token hasta que se encola
+        token = uuid.uuid4().hex
+        queued = {"token": token, "route_id": item.route_id, "status": "queued"}
+        self._check_capacity()
+        await self.statuses.set_async(token, queued)
+        with self._lock:
+            self._check_capacity()
+            full = self._append(token, item)
+
+        if full:
+            self._notify()
+        return queued
+
+    def status(self, token: str) -> Optional[dict]:
+        if self.statuses is None:
+            return None
+        return self.statuses.get(token)
+
+    async def status_async(self, token: str) -> Optional[dict]:
+        if self.statuses is None:
+            return None
+        return await self.statuses.get_async(token)
+
+    async def flush(self, flush: Flusher) -> bool:
+        with self._lock:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return True
+
+        started = time.perf_counter()
+        try:
+            failed, error = await self._write(batch, flush)
+        finally:
+            self.metrics.flush_seconds.observe(time.perf_counter() - started)
+
+        if not failed:
+            return True
+        self.metrics.failures += 1
+        await self._retry(failed, error)
+        return False
+
+    async def stop(self, flush: Flusher) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._stop.set()
+        self._notify()
+        await self._task
+        self._task = None
+
+        # Drenado: lo que no se pueda escribir ahora queda en el journal para el siguiente arranque
+        while self._pending and await self.flush(flush):
+            pass
+        if self._pending:
+            logger.error("Apagado con %d completados sin escribir", len(self._pending))
+        if self._journal is not None:
+            self._journal.close(remove=not self._pending)
+            self._journal = None
+
+    async def _run(self, flush: Flusher) -> None:
+        failures = 0
+        while not self._stopping:
+            if failures:
+                # Con la base caída se espera con backoff; los encolados no adelantan el reintento
+                await self._wait(self._stop, min(self.flush_seconds * 2 ** failures, MAX_RETRY_SECONDS))
+            else:
+                await self._wait(self._wake, self.flush_seconds)
+            self._wake.clear()
+            if self._stopping:
+                return
+            if await self.flush(flush):
+                failures = 0
+                if len(self._pending) >= self.batch_size:
+                    self._wake.set()
+            else:
+                failures += 1
+
+    async def _wait(self, event: asyncio.Event, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _check_capacity(self) -> None:
+        if len(self._pending) >= self.max_size:
+            self.metrics.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Cola de completados llena; reintenta más tarde",
+                headers={"Retry-After": str(max(int(self.flush_seconds), 1))}
+            )
+
+    def _append(self, token: str, item: RouteCompleteItem) -> bool:
+        if self._journal is not None:
+            self._journal.append(token, item)
+        self._pending.append((token, item))
+        return len(self._pending) >= self.batch_size
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        # En modo sync el encolado ocurre en el threadpool: el evento sólo se toca en el hilo del loop
+        if running is loop:
+            self._wake.set()
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            self._loop = None
+
+    async def _write(self, batch: List[Entry], flush: Flusher) -> Tuple[List[Entry], Optional[Exception]]:
+        # Un error no transitorio parte el lote en mitades hasta aislar el elemento que lo provoca; el resto se escribe
+        try:
+            response = await flush([item for _, item in batch])
+        except Exception as error:
+            if isinstance(error, TRANSIENT_ERRORS) or len(batch) == 1:
+                return batch, error
+            middle = len(batch) // 2
+            failed, first_error = await self._write(batch[:middle], flush)
+            if isinstance(first_error, TRANSIENT_ERRORS):
+                return failed + batch[middle:], first_error
+            rest, rest_error = await self._write(batch[middle:], flush)
+            return failed + rest, rest_error or first_error
+
+        self.metrics.flushes += 1
+        self.metrics.records += len(batch)
+        self.metrics.batch_sizes.observe(len(batch))
+        await self.statuses.set_many_async({
+            token: {"token": token, "route_id": result.route_id, "status": result.status}
+            for (token, _), result in zip(batch, response.results)
+        })
+        self._acknowledge(batch)
+        return [], None
+
+    async def _retry(self, batch: List[Entry], error: Exception) -> None:
+        # Los errores de conexión se reintentan sin límite (el journal los conserva); el resto sólo MAX_FLUSH_ATTEMPTS veces
+        transient = isinstance(error, TRANSIENT_ERRORS)
+        retry, failed = [], []
+        for token, item in batch:
+            attempts = self._attempts.get(token, 0) + (0 if transient else 1)
+            if attempts < MAX_FLUSH_ATTEMPTS:
+                self._attempts[token] = attempts
+                retry.append((token, item))
+            else:
+                failed.append((token, item))
+
+        with self._lock:
+            self._pending.extendleft(reversed(retry))
+        if failed:
+            self.metrics.dropped += len(failed)
+            await self.statuses.set_many_async({
+                token: {"token": token, "route_id": item.route_id, "status": "failed"}
+                for token, item in failed
+            })
+            self._acknowledge(failed)
+        logger.warning(
+            "Escritura de %d completados fallida (%d se reintentarán, %d descartados): %r",
+            len(batch), len(retry), len(failed), error
+        )
+
+    def _acknowledge(self, batch: List[Entry]) -> None:
+        tokens = [token for token, _ in batch]
+        for token in tokens:
+            self._attempts.pop(token, None)
+        if self._journal is None:
+            return
+        with self._lock:
+            if not self._pending:
+                self._journal.rewrite([])
+            elif self._journal.size() > JOURNAL_COMPACT_BYTES:
+                self._journal.rewrite(list(self._pending))
+            else:
+                self._journal.ack(tokens)
+
+
+completion_queue = CompletionQueue()
+
+
+@registry.register
+def collect_write_behind_metrics() -> List[Metric]:
+    metrics = completion_queue.metrics
+    depth = Metric("write_behind_queue_depth", "gauge", "Completions waiting to be written")
+    depth.add(len(completion_queue))
+    flushes = Metric("write_behind_flushes_total", "counter", "Batches written by the flusher")
+    flushes.add(metrics.flushes)
+    records = Metric("write_behind_records_total", "counter", "Completions written by the flusher")
+    records.add(metrics.records)
+    failures = Metric("write_behind_flush_failures_total", "counter", "Batches that failed and were retried")
+    failures.add(metrics.failures)
+    dropped = Metric("write_behind_dropped_total", "counter", "Completions marked failed after repeated errors")
+    dropped.add(metrics.dropped)
+    rejected = Metric("write_behind_rejected_total", "counter", "Completions refused because the queue was full")
+    rejected.add(metrics.rejected)
+    seconds = Metric("write_behind_flush_seconds", "histogram", "Time spent writing one batch")
+    metrics.flush_seconds.to_metric(seconds)
+    sizes = Metric("write_behind_batch_size", "histogram", "Completions per written batch")
+    metrics.batch_sizes.to_metric(sizes)
+    return [depth, flushes, records, failures, dropped, rejected, seconds, sizes]
@@ -0,0 +1,6 @@
+import enum
+
+
+class RouteExpansion(enum.Enum):
+    VEHICLE = "vehicle"
+    PERFORMANCE = "performance"
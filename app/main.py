@@ -1,11 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.configuration.configuration import settings
-from app.core.dabatase import engine, Base
-from app.controller import VehicleController, RouteController, PerformanceController
-
-
-Base.metadata.create_all(bind=engine)
+from app.core.metrics import registry
+from app.core.pool import pool_stats
+from app.core.cache import cache_stats
+from app.core.dabatase import replica_engines
+from app.core.replicas import ReadYourWritesMiddleware, replica_status
+from app.core.instrumentation import RequestTimingMiddleware, TimedJSONResponse
+from app.core.lifespan import lifespan
+from app.controller import (
+    VehicleController,
+    RouteController,
+    PerformanceController,
+    AnalyticsController,
+    AsyncVehicleController,
+    AsyncRouteController,
+    AsyncPerformanceController,
+    AsyncAnalyticsController,
+)
 
 app = FastAPI(
     title=settings.app_name,
@@ -13,7 +26,9 @@ app = FastAPI(
     debug=settings.debug,
     description="API REST con FastAPI y PostgreSQL",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -22,15 +37,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing", "X-Query-Count", "X-Search-Truncated", "X-Total-Count", "X-Total-Count-Mode"],
 )
 
-app.include_router(VehicleController.router)
-app.include_router(RouteController.router)
-app.include_router(PerformanceController.router)
+if settings.request_timing_enabled:
+    app.add_middleware(RequestTimingMiddleware)
+
+if replica_engines:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.read_your_writes_seconds)
+
+if settings.database_mode == "async":
+    app.include_router(AsyncVehicleController.router)
+    app.include_router(AsyncRouteController.router)
+    app.include_router(AsyncPerformanceController.router)
+    app.include_router(AsyncAnalyticsController.router)
+else:
+    app.include_router(VehicleController.router)
+    app.include_router(RouteController.router)
+    app.include_router(PerformanceController.router)
+    app.include_router(AnalyticsController.router)
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    pools = pool_stats()
+    return {
+        "status": "healthy",
+        "database": {
+            "mode": settings.database_mode,
+            "pools": pools,
+            "replicas": replica_status(),
+            "saturated": any(
+                pool["in_use"] >= pool["size"] + pool["max_overflow"]
+                for pool in pools.values()
+            ),
+        },
+        "cache": cache_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, UTC
 
+from app.configuration.configuration import settings
 from app.core.dabatase import Base
 
 
+# Con particionado por rango PostgreSQL exige que la llave de partición forme parte de la PK
+PARTITIONED = settings.performance_partitioning
+
+
 class Performance(Base):
     __tablename__ = "performances"
 
@@ -20,7 +25,13 @@ class Performance(Base):
     created_at = Column(
         DateTime(timezone=True),
         default=lambda: datetime.now(UTC),
-        nullable=False
+        nullable=False,
+        primary_key=PARTITIONED
+    )
+
+    __table_args__ = (
+        Index("ix_performances_created_at_route_id", created_at.desc(), route_id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"} if PARTITIONED else {},
     )
 
     route = relationship("Route", back_populates="performance", uselist=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.dabatase import Base
+
+
+class PerformanceArchive(Base):
+    __tablename__ = "performances_archive"
+
+    route_id = Column(
+        Integer,
+        ForeignKey("routes.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    distance_km = Column(Float, nullable=False)
+    fuel_consumed = Column(Float, nullable=False)
+    duration = Column(Integer, nullable=False)
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.dabatase import Base
@@ -8,10 +8,10 @@ from app.enum.RouteStatus import RouteStatus
 class Route(Base):
     __tablename__ = "routes"
 
-    id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False, index=True)
-    origin = Column(String, nullable=False, index=True)
-    destination = Column(String, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    origin = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
     status = Column(
         Enum(RouteStatus, name="status"),
         nullable=False,
@@ -22,6 +22,13 @@ class Route(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        Index("ix_routes_vehicle_status_id", vehicle_id, status, id),
+        Index("ix_routes_vehicle_id_id", vehicle_id, id),
+        Index("ix_routes_status_id", status, id),
+    )
 
     performance = relationship(
         "Performance",
@@ -29,3 +36,10 @@ class Route(Base):
         uselist=False,
         cascade="all, delete-orphan"
     )
+    archived_performance = relationship("PerformanceArchive", uselist=False, viewonly=True)
+    vehicle = relationship("Vehicle", viewonly=True)
+
+    @property
+    def performance_record(self):
+        # Fuera de la ventana de retención el rendimiento vive en performances_archive
+        return self.performance if self.performance is not None else self.archived_performance
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.dabatase import Base
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(String, primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
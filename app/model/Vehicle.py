@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.dabatase import Base
 
@@ -6,15 +6,48 @@ from app.core.dabatase import Base
 class Vehicle(Base):
     __tablename__ = "vehicles"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=True, index=True)
     plate_number = Column(String, unique=True, index=True, nullable=False)
-    brand = Column(String, index=True, nullable=False)
-    model = Column(String, index=True, nullable=False)
+    brand = Column(String, nullable=False)
+    model = Column(String, nullable=False)
     year = Column(Integer, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # Cubre la lista de activos y sus versiones para el ETag sin tocar la tabla
+        Index(
+            "ix_vehicles_active_id_version",
+            id,
+            version,
+            updated_at,
+            created_at,
+            postgresql_where=is_active == True,
+            sqlite_where=is_active == True,
+        ),
+        # Búsqueda por subcadena (ILIKE '%q%') con pg_trgm; en otros motores se usa el índice en memoria
+        Index(
+            "ix_vehicles_plate_number_trgm",
+            plate_number,
+            postgresql_using="gin",
+            postgresql_ops={"plate_number": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_vehicles_brand_trgm",
+            brand,
+            postgresql_using="gin",
+            postgresql_ops={"brand": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_vehicles_model_trgm",
+            model,
+            postgresql_using="gin",
+            postgresql_ops={"model": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     def __repr__(self):
         return f"<Vehicle(id={self.id}, plate_number='{self.plate_number}', brand='{self.brand}', model='{self.model}')>"
\ No newline at end of file
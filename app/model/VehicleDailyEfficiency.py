@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from app.core.dabatase import Base
+
+
+class VehicleDailyEfficiency(Base):
+    __tablename__ = "vehicle_daily_efficiency"
+
+    vehicle_id = Column(
+        Integer,
+        ForeignKey("vehicles.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    route_count = Column(Integer, nullable=False, default=0)
+    distance_km = Column(Float, nullable=False, default=0)
+    fuel_consumed = Column(Float, nullable=False, default=0)
+    duration_minutes = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_vehicle_daily_efficiency_day", day),
+    )
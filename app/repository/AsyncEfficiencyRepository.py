@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from app.repository.EfficiencyRepository import increment_statement, series_statement
+
+
+class AsyncEfficiencyRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def increment(self, increments: List[dict]) -> None:
+        if increments:
+            await self.db.execute(increment_statement(self.db, increments))
+
+    async def get_series(
+        self,
+        vehicle_id: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[tuple]:
+        result = await self.db.execute(series_statement(vehicle_id, start, end))
+        return list(result.all())
@@ -0,0 +1,94 @@
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+
+from app.core.counting import CountMode, TotalCount, count_key, count_rows_async
+from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+from app.repository.PerformanceRepository import EXPORT_COLUMNS, VERSION_COLUMNS
+
+
+class AsyncPerformanceRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_route_id(self, route_id: int) -> Optional[Union[Performance, PerformanceArchive]]:
+        result = await self.db.execute(
+            select(Performance).where(Performance.route_id == route_id)
+        )
+        performance = result.scalars().first()
+        if performance is not None:
+            return performance
+        return await self.db.get(PerformanceArchive, route_id)
+
+    def _list_statement(
+        self,
+        columns: tuple,
+        skip: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+    ):
+        query = select(*columns)
+
+        if after is not None:
+            query = query.where(
+                tuple_(Performance.created_at, Performance.route_id) < after
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        return (
+            query
+            .order_by(Performance.created_at.desc(), Performance.route_id.desc())
+            .limit(limit)
+        )
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Performance]:
+        result = await self.db.execute(self._list_statement((Performance,), skip, limit, after))
+        return list(result.scalars().all())
+
+    async def get_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[tuple]:
+        result = await self.db.execute(self._list_statement(VERSION_COLUMNS, skip, limit, after))
+        return [tuple(row) for row in result.all()]
+
+    async def count(self, mode: CountMode) -> TotalCount:
+        return await count_rows_async(self.db, Performance, mode, [], count_key("performances"))
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[Sequence[tuple]]:
+        result = await self.db.stream(
+            select(*EXPORT_COLUMNS)
+            .order_by(Performance.created_at, Performance.route_id)
+            .execution_options(yield_per=batch_size)
+        )
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def create(self, performance: Performance) -> Performance:
+        self.db.add(performance)
+        await self.db.commit()
+        return performance
+
+    async def bulk_insert(self, performances: List[dict]) -> None:
+        if performances:
+            await self.db.execute(insert(Performance).values(performances))
+
+    async def delete(self, route_id: int) -> bool:
+        statement = delete(Performance).where(Performance.route_id == route_id).returning(Performance.route_id)
+        deleted = (await self.db.execute(statement)).scalar_one_or_none()
+        await self.db.commit()
+        return deleted is not None
@@ -0,0 +1,175 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import FrozenSet, Optional, List, Set, Dict
+from datetime import datetime
+
+from app.core.cache import route_cache, snapshot, restore
+from app.core.replicas import from_replica
+from app.core.counting import CountMode, TotalCount, count_key, count_rows_async
+from app.model.Route import Route
+from app.core.sql import RETURNING_OPTIONS, ids_condition, order_by_ids
+from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+from app.repository.EfficiencyRepository import increment_statement, removal_increments, route_rollup_statement
+from app.repository.RouteRepository import (
+    VERSION_COLUMNS,
+    expansion_options,
+    list_filters,
+    transition_conditions,
+    update_values,
+)
+from app.schema.Route import RouteCreate, RouteUpdate
+from app.enum.RouteExpansion import RouteExpansion
+from app.enum.RouteStatus import RouteStatus
+
+
+class AsyncRouteRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, route_id: int, expand: FrozenSet[RouteExpansion] = frozenset()) -> Optional[Route]:
+        result = await self.db.execute(
+            select(Route).options(*expansion_options(expand)).where(Route.id == route_id)
+        )
+        return result.scalars().first()
+
+    async def find_by_id(self, route_id: int) -> Optional[Route]:
+        cached = await route_cache.get_async(route_id)
+        if cached is not None:
+            return restore(Route, cached)
+
+        route = await self.get_by_id(route_id)
+        if route is not None and not from_replica(self.db):
+            await route_cache.set_async(route_id, snapshot(route))
+        return route
+
+    async def find_by_ids(self, route_ids: List[int]) -> List[Route]:
+        cached = await route_cache.get_many_async(route_ids)
+        routes = [restore(Route, data) for data in cached.values()]
+        missing = [route_id for route_id in route_ids if route_id not in cached]
+        if missing:
+            result = await self.db.execute(select(Route).where(ids_condition(self.db, Route.id, missing)))
+            loaded = result.scalars().all()
+            if not from_replica(self.db):
+                await route_cache.set_many_async({route.id: snapshot(route) for route in loaded})
+            routes.extend(loaded)
+        return order_by_ids(routes, route_ids)
+
+    async def invalidate(self, *route_ids: int) -> None:
+        await route_cache.delete_async(*route_ids)
+
+    async def remember(self, route: Route) -> None:
+        await route_cache.set_async(route.id, snapshot(route))
+
+    def _list_statement(
+            self,
+            columns: tuple,
+            skip: int,
+            limit: int,
+            status: Optional[RouteStatus],
+            vehicle_id: Optional[int],
+            after_id: Optional[int],
+    ):
+        query = select(*columns).where(*list_filters(status, vehicle_id))
+
+        if after_id is not None:
+            query = query.where(Route.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+
+        return query.order_by(Route.id).limit(limit)
+
+    async def get_all(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            status: Optional[RouteStatus] = None,
+            vehicle_id: Optional[int] = None,
+            after_id: Optional[int] = None,
+            expand: FrozenSet[RouteExpansion] = frozenset(),
+    ) -> List[Route]:
+        statement = self._list_statement((Route,), skip, limit, status, vehicle_id, after_id)
+        statement = statement.options(*expansion_options(expand))
+        result = await self.db.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            status: Optional[RouteStatus] = None,
+            vehicle_id: Optional[int] = None,
+            after_id: Optional[int] = None,
+    ) -> List[tuple]:
+        statement = self._list_statement(VERSION_COLUMNS, skip, limit, status, vehicle_id, after_id)
+        result = await self.db.execute(statement)
+        return [tuple(row) for row in result.all()]
+
+    async def count(
+            self,
+            mode: CountMode,
+            status: Optional[RouteStatus] = None,
+            vehicle_id: Optional[int] = None,
+    ) -> TotalCount:
+        key = count_key("routes", status, vehicle_id)
+        return await count_rows_async(self.db, Route, mode, list_filters(status, vehicle_id), key)
+
+    async def create(self, route_data: RouteCreate) -> Route:
+        statement = insert(Route).values(**route_data.model_dump()).returning(Route)
+        return (await self.db.scalars(statement)).one()
+
+    async def update(self, route_id: int, route_data: RouteUpdate, changed_at: datetime) -> Optional[Route]:
+        values = update_values(route_data, changed_at)
+        if not values:
+            route = await self.get_by_id(route_id)
+            if route is not None and route_data.version not in (None, route.version):
+                return None
+            return route
+
+        statement = (
+            update(Route)
+            .where(*transition_conditions([route_id], route_data.status, route_data.version))
+            .values(**values)
+            .returning(Route)
+            .execution_options(**RETURNING_OPTIONS)
+        )
+        return (await self.db.scalars(statement)).one_or_none()
+
+    async def get_existing_ids(self, route_ids: List[int]) -> Set[int]:
+        if not route_ids:
+            return set()
+        result = await self.db.execute(select(Route.id).where(Route.id.in_(route_ids)))
+        return set(result.scalars().all())
+
+    async def mark_completed(
+            self,
+            route_ids: List[int],
+            completed_at: datetime,
+            expected_version: Optional[int] = None,
+    ) -> Dict[int, int]:
+        if not route_ids:
+            return {}
+
+        statement = (
+            update(Route)
+            .where(*transition_conditions(route_ids, RouteStatus.COMPLETED, expected_version))
+            .values(status=RouteStatus.COMPLETED, completed_at=completed_at, version=Route.version + 1)
+            .returning(Route.id, Route.vehicle_id)
+            .execution_options(synchronize_session=False)
+        )
+        return dict((await self.db.execute(statement)).tuples().all())
+
+    async def delete(self, route_id: int) -> bool:
+        # Una ruta completada se descuenta del rollup en la misma transacción que borra su rendimiento
+        removed = (await self.db.execute(route_rollup_statement(route_id))).all()
+        if removed:
+            await self.db.execute(increment_statement(self.db, removal_increments(removed)))
+        await self.db.execute(delete(Performance).where(Performance.route_id == route_id))
+        await self.db.execute(delete(PerformanceArchive).where(PerformanceArchive.route_id == route_id))
+        deleted = (await self.db.execute(
+            delete(Route).where(Route.id == route_id).returning(Route.id)
+        )).scalar_one_or_none()
+        await self.db.commit()
+        await self.invalidate(route_id)
+        return deleted is not None
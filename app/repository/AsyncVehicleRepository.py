@@ -0,0 +1,202 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Set, Tuple
+from app.configuration.configuration import settings
+from app.core.cache import vehicle_cache, snapshot, restore
+from app.core.replicas import from_replica
+from app.core.counting import CountMode, TotalCount, count_key, count_rows_async
+from app.core.search import vehicle_search_index
+from app.core.sql import RETURNING_OPTIONS, dialect_insert, dialect_name, ids_condition, order_by_ids
+from app.model.Vehicle import Vehicle
+from app.repository.VehicleRepository import (
+    SEARCH_COLUMNS,
+    SEARCH_GENERATION,
+    VERSION_COLUMNS,
+    list_filters,
+    search_backend,
+    search_results,
+    search_statement,
+)
+from app.schema.Vehicle import VehicleCreate, VehicleUpdate
+
+
+class AsyncVehicleRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
+        result = await self.db.execute(select(Vehicle).where(Vehicle.id == vehicle_id))
+        return result.scalars().first()
+
+    async def find_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
+        cached = await vehicle_cache.get_async(vehicle_id)
+        if cached is not None:
+            return restore(Vehicle, cached)
+
+        vehicle = await self.get_by_id(vehicle_id)
+        if vehicle is not None and not from_replica(self.db):
+            await vehicle_cache.set_async(vehicle_id, snapshot(vehicle))
+        return vehicle
+
+    async def find_by_ids(self, vehicle_ids: List[int]) -> List[Vehicle]:
+        cached = await vehicle_cache.get_many_async(vehicle_ids)
+        vehicles = [restore(Vehicle, data) for data in cached.values()]
+        missing = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in cached]
+        if missing:
+            result = await self.db.execute(select(Vehicle).where(ids_condition(self.db, Vehicle.id, missing)))
+            loaded = result.scalars().all()
+            if not from_replica(self.db):
+                await vehicle_cache.set_many_async({vehicle.id: snapshot(vehicle) for vehicle in loaded})
+            vehicles.extend(loaded)
+        return order_by_ids(vehicles, vehicle_ids)
+
+    async def get_by_plate_number(self, plate_number: str) -> Optional[Vehicle]:
+        result = await self.db.execute(select(Vehicle).where(Vehicle.plate_number == plate_number))
+        return result.scalars().first()
+
+    def _list_statement(
+            self,
+            columns: tuple,
+            skip: int,
+            limit: int,
+            active_only: bool,
+            after_id: Optional[int],
+    ):
+        query = select(*columns).where(*list_filters(active_only))
+
+        if after_id is not None:
+            query = query.where(Vehicle.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+
+        return query.order_by(Vehicle.id).limit(limit)
+
+    async def get_all(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            after_id: Optional[int] = None,
+    ) -> List[Vehicle]:
+        statement = self._list_statement((Vehicle,), skip, limit, active_only, after_id)
+        result = await self.db.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            after_id: Optional[int] = None,
+    ) -> List[tuple]:
+        statement = self._list_statement(VERSION_COLUMNS, skip, limit, active_only, after_id)
+        result = await self.db.execute(statement)
+        return [tuple(row) for row in result.all()]
+
+    async def search(
+            self,
+            query: str,
+            skip: int = 0,
+            limit: int = 20,
+            active_only: bool = False,
+            max_candidates: int = 1000,
+    ) -> Tuple[List[Vehicle], bool]:
+        if search_backend(self.db, query) == "memory" and await self._ensure_search_index():
+            vehicle_ids, truncated = vehicle_search_index.search(query, skip, limit, active_only, max_candidates)
+            if not vehicle_ids:
+                return [], truncated
+            vehicles = (await self.db.scalars(select(Vehicle).where(Vehicle.id.in_(vehicle_ids)))).all()
+            return order_by_ids(vehicles, vehicle_ids), truncated
+
+        statement = search_statement(query, skip, limit, active_only, max_candidates, dialect_name(self.db) == "postgresql")
+        rows = (await self.db.execute(statement)).all()
+        return search_results(rows, max_candidates)
+
+    async def _ensure_search_index(self) -> bool:
+        if not vehicle_search_index.check_due(settings.search_index_check_seconds):
+            return True
+        generation = tuple((await self.db.execute(SEARCH_GENERATION)).one())
+        if vehicle_search_index.is_current(generation):
+            return True
+        if not vehicle_search_index.begin_load():
+            return vehicle_search_index.loaded
+        try:
+            rows = (await self.db.execute(select(*SEARCH_COLUMNS))).all()
+        except BaseException:
+            vehicle_search_index.abort_load()
+            raise
+        vehicle_search_index.finish_load(rows, generation)
+        return True
+
+    async def create(self, vehicle_data: VehicleCreate) -> Vehicle:
+        statement = insert(Vehicle).values(**vehicle_data.model_dump()).returning(Vehicle)
+        try:
+            db_vehicle = (await self.db.scalars(statement)).one()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+        await vehicle_cache.set_async(db_vehicle.id, snapshot(db_vehicle))
+        vehicle_search_index.upsert(db_vehicle)
+        return db_vehicle
+
+    async def bulk_create(self, vehicles: List[VehicleCreate]) -> Set[str]:
+        if not vehicles:
+            return set()
+
+        statement = (
+            dialect_insert(self.db, Vehicle)
+            .values([vehicle.model_dump() for vehicle in vehicles])
+            .on_conflict_do_nothing(index_elements=[Vehicle.plate_number])
+            .returning(*SEARCH_COLUMNS)
+        )
+        rows = (await self.db.execute(statement)).all()
+        await self.db.commit()
+        for row in rows:
+            vehicle_search_index.upsert(row)
+        return {row.plate_number for row in rows}
+
+    async def update(self, vehicle_id: int, vehicle_data: VehicleUpdate) -> Optional[Vehicle]:
+        values = vehicle_data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_by_id(vehicle_id)
+        return await self._update(vehicle_id, values)
+
+    async def _update(self, vehicle_id: int, values: dict) -> Optional[Vehicle]:
+        statement = (
+            update(Vehicle)
+            .where(Vehicle.id == vehicle_id)
+            .values(**values, version=Vehicle.version + 1)
+            .returning(Vehicle)
+            .execution_options(**RETURNING_OPTIONS)
+        )
+        try:
+            db_vehicle = (await self.db.scalars(statement)).one_or_none()
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+        await vehicle_cache.delete_async(vehicle_id)
+        if db_vehicle is not None:
+            vehicle_search_index.upsert(db_vehicle)
+        return db_vehicle
+
+    async def delete(self, vehicle_id: int) -> bool:
+        statement = delete(Vehicle).where(Vehicle.id == vehicle_id).returning(Vehicle.id)
+        deleted = (await self.db.execute(statement)).scalar_one_or_none()
+        await self.db.commit()
+        await vehicle_cache.delete_async(vehicle_id)
+        vehicle_search_index.remove(vehicle_id)
+        return deleted is not None
+
+    async def soft_delete(self, vehicle_id: int) -> Optional[Vehicle]:
+        return await self._update(vehicle_id, {"is_active": False})
+
+    async def exists_by_plate_number(self, plate_number: str) -> bool:
+        return await self.get_by_plate_number(plate_number) is not None
+
+    async def count(self, mode: CountMode, active_only: bool = False) -> TotalCount:
+        key = count_key("vehicles", active_only)
+        return await count_rows_async(self.db, Vehicle, mode, list_filters(active_only), key)
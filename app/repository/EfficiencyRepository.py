@@ -0,0 +1,149 @@
+from sqlalchemy import Date, delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from app.core.sql import dialect_insert
+from app.enum.RouteStatus import RouteStatus
+from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+from app.model.Route import Route
+from app.model.VehicleDailyEfficiency import VehicleDailyEfficiency
+
+
+ROLLUP_COLUMNS = ("route_count", "distance_km", "fuel_consumed", "duration_minutes")
+
+SERIES_COLUMNS = (
+    VehicleDailyEfficiency.day,
+    func.sum(VehicleDailyEfficiency.route_count),
+    func.sum(VehicleDailyEfficiency.distance_km),
+    func.sum(VehicleDailyEfficiency.fuel_consumed),
+    func.sum(VehicleDailyEfficiency.duration_minutes),
+)
+
+
+def increment_statement(db, increments: List[dict]):
+    statement = dialect_insert(db, VehicleDailyEfficiency).values(increments)
+    return statement.on_conflict_do_update(
+        index_elements=[VehicleDailyEfficiency.vehicle_id, VehicleDailyEfficiency.day],
+        set_={
+            **{
+                column: getattr(VehicleDailyEfficiency, column) + getattr(statement.excluded, column)
+                for column in ROLLUP_COLUMNS
+            },
+            "updated_at": func.now(),
+        }
+    )
+
+
+def series_statement(vehicle_id: Optional[int], start: Optional[date], end: Optional[date]):
+    query = select(*SERIES_COLUMNS)
+
+    if vehicle_id is not None:
+        query = query.where(VehicleDailyEfficiency.vehicle_id == vehicle_id)
+    if start is not None:
+        query = query.where(VehicleDailyEfficiency.day >= start)
+    if end is not None:
+        query = query.where(VehicleDailyEfficiency.day <= end)
+
+    return query.group_by(VehicleDailyEfficiency.day).order_by(VehicleDailyEfficiency.day)
+
+
+def performance_source():
+    # Los meses ya archivados siguen contando: reconstruir no debe borrarlos del rollup
+    columns = ("route_id", "distance_km", "fuel_consumed", "duration")
+    return union_all(
+        select(*(getattr(Performance, column) for column in columns)),
+        select(*(getattr(PerformanceArchive, column) for column in columns)),
+    ).subquery("performances")
+
+
+def rebuild_statements(start: Optional[date], end: Optional[date]):
+    day = func.date(Route.completed_at, type_=Date)
+    performances = performance_source()
+    source = (
+        select(
+            Route.vehicle_id,
+            day,
+            func.count(performances.c.route_id),
+            func.sum(performances.c.distance_km),
+            func.sum(performances.c.fuel_consumed),
+            func.sum(performances.c.duration),
+        )
+        .join(performances, performances.c.route_id == Route.id)
+        .where(Route.status == RouteStatus.COMPLETED, Route.completed_at.is_not(None))
+        .group_by(Route.vehicle_id, day)
+    )
+    clear = delete(VehicleDailyEfficiency)
+
+    if start is not None:
+        source = source.where(day >= start)
+        clear = clear.where(VehicleDailyEfficiency.day >= start)
+    if end is not None:
+        source = source.where(day <= end)
+        clear = clear.where(VehicleDailyEfficiency.day <= end)
+
+    fill = insert(VehicleDailyEfficiency).from_select(
+        ["vehicle_id", "day", *ROLLUP_COLUMNS],
+        source
+    )
+    return clear, fill
+
+
+def route_rollup_statement(route_id: int):
+    # Los mismos valores con los que rebuild_statements cuenta la ruta en el rollup
+    performances = performance_source()
+    return (
+        select(
+            Route.vehicle_id,
+            func.date(Route.completed_at, type_=Date),
+            performances.c.distance_km,
+            performances.c.fuel_consumed,
+            performances.c.duration,
+        )
+        .join(performances, performances.c.route_id == Route.id)
+        .where(Route.id == route_id, Route.status == RouteStatus.COMPLETED, Route.completed_at.is_not(None))
+    )
+
+
+def removal_increments(rows: List[tuple]) -> List[dict]:
+    return [
+        {
+            "vehicle_id": vehicle_id,
+            "day": day,
+            "route_count": -1,
+            "distance_km": -distance_km,
+            "fuel_consumed": -fuel_consumed,
+            "duration_minutes": -duration,
+        }
+        for vehicle_id, day, distance_km, fuel_consumed, duration in rows
+    ]
+
+
+class EfficiencyRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def increment(self, increments: List[dict]) -> None:
+        if increments:
+            self.db.execute(increment_statement(self.db, increments))
+
+    def get_series(
+        self,
+        vehicle_id: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[tuple]:
+        return list(self.db.execute(series_statement(vehicle_id, start, end)).all())
+
+    def rebuild(self, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        clear, fill = rebuild_statements(start, end)
+        try:
+            self.db.execute(clear)
+            inserted = self.db.execute(fill).rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return inserted
@@ -1,7 +1,23 @@
+from sqlalchemy import delete, insert, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
 
+from app.core.counting import CountMode, TotalCount, count_key, count_rows
 from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+
+
+EXPORT_COLUMNS = (
+    Performance.route_id,
+    Performance.distance_km,
+    Performance.fuel_consumed,
+    Performance.duration,
+    Performance.notes,
+    Performance.created_at,
+)
+
+VERSION_COLUMNS = (Performance.route_id, Performance.created_at)
 
 
 class PerformanceRepository:
@@ -9,39 +25,82 @@ class PerformanceRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_by_route_id(self, route_id: int) -> Optional[Performance]:
-        return (
+    def get_by_route_id(self, route_id: int) -> Optional[Union[Performance, PerformanceArchive]]:
+        performance = (
             self.db
             .query(Performance)
             .filter(Performance.route_id == route_id)
             .first()
         )
+        if performance is not None:
+            return performance
+        # Fuera de la ventana de retención el rendimiento vive en performances_archive
+        return self.db.get(PerformanceArchive, route_id)
+
+    def _list_query(
+        self,
+        columns: tuple,
+        skip: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+    ):
+        query = self.db.query(*columns)
+
+        if after is not None:
+            query = query.filter(
+                tuple_(Performance.created_at, Performance.route_id) < after
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        return (
+            query
+            .order_by(Performance.created_at.desc(), Performance.route_id.desc())
+            .limit(limit)
+        )
 
     def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
     ) -> List[Performance]:
-        return (
-            self.db
-            .query(Performance)
-            .order_by(Performance.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._list_query((Performance,), skip, limit, after).all()
+
+    def get_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[tuple]:
+        return [tuple(row) for row in self._list_query(VERSION_COLUMNS, skip, limit, after).all()]
+
+    def count(self, mode: CountMode) -> TotalCount:
+        return count_rows(self.db, Performance, mode, [], count_key("performances"))
+
+    def stream_all(self, batch_size: int = 1000) -> Iterator[Sequence[tuple]]:
+        result = self.db.execute(
+            select(*EXPORT_COLUMNS)
+            .order_by(Performance.created_at, Performance.route_id)
+            .execution_options(yield_per=batch_size)
         )
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
 
     def create(self, performance: Performance) -> Performance:
         self.db.add(performance)
         self.db.commit()
-        self.db.refresh(performance)
         return performance
 
-    def delete(self, route_id: int) -> bool:
-        performance = self.get_by_route_id(route_id)
-        if not performance:
-            return False
+    def bulk_insert(self, performances: List[dict]) -> None:
+        if performances:
+            self.db.execute(insert(Performance).values(performances))
 
-        self.db.delete(performance)
+    def delete(self, route_id: int) -> bool:
+        statement = delete(Performance).where(Performance.route_id == route_id).returning(Performance.route_id)
+        deleted = (self.db.execute(statement)).scalar_one_or_none()
         self.db.commit()
-        return True
+        return deleted is not None
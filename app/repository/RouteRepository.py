@@ -1,18 +1,134 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
-
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from typing import FrozenSet, Optional, List, Set, Dict
+from datetime import datetime
+
+from app.core.cache import route_cache, snapshot, restore
+from app.core.replicas import from_replica
+from app.core.counting import CountMode, TotalCount, count_key, count_rows
+from app.core.sql import RETURNING_OPTIONS, ids_condition, order_by_ids
+from app.model.Performance import Performance
+from app.model.PerformanceArchive import PerformanceArchive
+from app.repository.EfficiencyRepository import increment_statement, removal_increments, route_rollup_statement
 from app.model.Route import Route
 from app.schema.Route import RouteCreate, RouteUpdate
+from app.enum.RouteExpansion import RouteExpansion
 from app.enum.RouteStatus import RouteStatus
 
 
+VERSION_COLUMNS = (Route.id, Route.version, Route.updated_at, Route.created_at)
+
+
+# Estados de origen desde los que se puede pasar a cada estado (ASSIGNED → IN_PROGRESS → COMPLETED)
+ALLOWED_TRANSITIONS = {
+    RouteStatus.ASSIGNED: (),
+    RouteStatus.IN_PROGRESS: (RouteStatus.ASSIGNED,),
+    RouteStatus.COMPLETED: (RouteStatus.ASSIGNED, RouteStatus.IN_PROGRESS),
+}
+
+
+# Una consulta IN por relación, sin importar el tamaño de la página
+EXPANSION_RELATIONSHIPS = {
+    RouteExpansion.VEHICLE: ("vehicle",),
+    RouteExpansion.PERFORMANCE: ("performance", "archived_performance"),
+}
+
+
+def expansion_options(expand: FrozenSet[RouteExpansion]) -> list:
+    # Las opciones se arman al consultar: crearlas al importar configura los mappers antes de cargar todos los modelos
+    return [
+        selectinload(getattr(Route, name))
+        for expansion in sorted(expand, key=lambda item: item.value)
+        for name in EXPANSION_RELATIONSHIPS[expansion]
+    ]
+
+
+def list_filters(status: Optional[RouteStatus], vehicle_id: Optional[int]) -> list:
+    conditions = []
+    if status:
+        conditions.append(Route.status == status)
+    if vehicle_id is not None:
+        conditions.append(Route.vehicle_id == vehicle_id)
+    return conditions
+
+
+def update_values(route_data: RouteUpdate, changed_at: datetime) -> dict:
+    values = route_data.model_dump(exclude_unset=True, exclude={"version"})
+    if route_data.status == RouteStatus.IN_PROGRESS:
+        values["started_at"] = func.coalesce(Route.started_at, changed_at)
+    if route_data.status == RouteStatus.COMPLETED:
+        values["completed_at"] = changed_at
+    if values:
+        values["version"] = Route.version + 1
+    return values
+
+
+def transition_conditions(
+    route_ids: List[int],
+    target: Optional[RouteStatus],
+    expected_version: Optional[int] = None,
+) -> list:
+    # El estado esperado va en el WHERE: si otra petición ganó la carrera el UPDATE no afecta filas
+    conditions = [Route.id.in_(route_ids)]
+    if target is not None:
+        conditions.append(Route.status.in_(ALLOWED_TRANSITIONS[target]))
+    if expected_version is not None:
+        conditions.append(Route.version == expected_version)
+    return conditions
+
+
 class RouteRepository:
 
     def __init__(self, db: Session):
         self.db = db
 
-    def get_by_id(self, route_id: int) -> Optional[Route]:
-        return self.db.query(Route).filter(Route.id == route_id).first()
+    def get_by_id(self, route_id: int, expand: FrozenSet[RouteExpansion] = frozenset()) -> Optional[Route]:
+        return self.db.query(Route).options(*expansion_options(expand)).filter(Route.id == route_id).first()
+
+    def find_by_id(self, route_id: int) -> Optional[Route]:
+        cached = route_cache.get(route_id)
+        if cached is not None:
+            return restore(Route, cached)
+
+        route = self.get_by_id(route_id)
+        if route is not None and not from_replica(self.db):
+            route_cache.set(route_id, snapshot(route))
+        return route
+
+    def find_by_ids(self, route_ids: List[int]) -> List[Route]:
+        cached = route_cache.get_many(route_ids)
+        routes = [restore(Route, data) for data in cached.values()]
+        missing = [route_id for route_id in route_ids if route_id not in cached]
+        if missing:
+            loaded = self.db.scalars(select(Route).where(ids_condition(self.db, Route.id, missing))).all()
+            if not from_replica(self.db):
+                route_cache.set_many({route.id: snapshot(route) for route in loaded})
+            routes.extend(loaded)
+        return order_by_ids(routes, route_ids)
+
+    def invalidate(self, *route_ids: int) -> None:
+        route_cache.delete(*route_ids)
+
+    def remember(self, route: Route) -> None:
+        route_cache.set(route.id, snapshot(route))
+
+    def _list_query(
+            self,
+            columns: tuple,
+            skip: int,
+            limit: int,
+            status: Optional[RouteStatus],
+            vehicle_id: Optional[int],
+            after_id: Optional[int],
+    ):
+        query = self.db.query(*columns).filter(*list_filters(status, vehicle_id))
+
+        if after_id is not None:
+            query = query.filter(Route.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+
+        return query.order_by(Route.id).limit(limit)
 
     def get_all(
             self,
@@ -20,43 +136,86 @@ class RouteRepository:
             limit: int = 100,
             status: Optional[RouteStatus] = None,
             vehicle_id: Optional[int] = None,
+            after_id: Optional[int] = None,
+            expand: FrozenSet[RouteExpansion] = frozenset(),
     ) -> List[Route]:
-        query = self.db.query(Route)
+        query = self._list_query((Route,), skip, limit, status, vehicle_id, after_id)
+        return query.options(*expansion_options(expand)).all()
 
-        if status:
-            query = query.filter(Route.status == status)
-
-        if vehicle_id is not None:
-            query = query.filter(Route.vehicle_id == vehicle_id)
+    def get_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            status: Optional[RouteStatus] = None,
+            vehicle_id: Optional[int] = None,
+            after_id: Optional[int] = None,
+    ) -> List[tuple]:
+        query = self._list_query(VERSION_COLUMNS, skip, limit, status, vehicle_id, after_id)
+        return [tuple(row) for row in query.all()]
 
-        return query.offset(skip).limit(limit).all()
+    def count(
+            self,
+            mode: CountMode,
+            status: Optional[RouteStatus] = None,
+            vehicle_id: Optional[int] = None,
+    ) -> TotalCount:
+        key = count_key("routes", status, vehicle_id)
+        return count_rows(self.db, Route, mode, list_filters(status, vehicle_id), key)
 
     def create(self, route_data: RouteCreate) -> Route:
-        db_route = Route(
-            vehicle_id=route_data.vehicle_id,
-            origin=route_data.origin,
-            destination=route_data.destination,
+        statement = insert(Route).values(**route_data.model_dump()).returning(Route)
+        return (self.db.scalars(statement)).one()
+
+    def update(self, route_id: int, route_data: RouteUpdate, changed_at: datetime) -> Optional[Route]:
+        values = update_values(route_data, changed_at)
+        if not values:
+            route = self.get_by_id(route_id)
+            if route is not None and route_data.version not in (None, route.version):
+                return None
+            return route
+
+        statement = (
+            update(Route)
+            .where(*transition_conditions([route_id], route_data.status, route_data.version))
+            .values(**values)
+            .returning(Route)
+            .execution_options(**RETURNING_OPTIONS)
         )
+        return (self.db.scalars(statement)).one_or_none()
 
-        self.db.add(db_route)
-        self.db.commit()
-        self.db.refresh(db_route)
-        return db_route
+    def get_existing_ids(self, route_ids: List[int]) -> Set[int]:
+        if not route_ids:
+            return set()
+        return set(self.db.execute(select(Route.id).where(Route.id.in_(route_ids))).scalars().all())
 
-    def update(self, route: Route, route_data: RouteUpdate) -> Route:
-        for field, value in route_data.model_dump(exclude_unset=True).items():
-            setattr(route, field, value)
-
-        self.db.commit()
-        self.db.refresh(route)
-        return route
+    def mark_completed(
+            self,
+            route_ids: List[int],
+            completed_at: datetime,
+            expected_version: Optional[int] = None,
+    ) -> Dict[int, int]:
+        if not route_ids:
+            return {}
+
+        statement = (
+            update(Route)
+            .where(*transition_conditions(route_ids, RouteStatus.COMPLETED, expected_version))
+            .values(status=RouteStatus.COMPLETED, completed_at=completed_at, version=Route.version + 1)
+            .returning(Route.id, Route.vehicle_id)
+            .execution_options(synchronize_session=False)
+        )
+        return dict(self.db.execute(statement).tuples().all())
 
     def delete(self, route_id: int) -> bool:
-        db_route = self.get_by_id(route_id)
-        if not db_route:
-            return False
-
-        self.db.delete(db_route)
+        # Una ruta completada se descuenta del rollup en la misma transacción que borra su rendimiento
+        removed = (self.db.execute(route_rollup_statement(route_id))).all()
+        if removed:
+            self.db.execute(increment_statement(self.db, removal_increments(removed)))
+        self.db.execute(delete(Performance).where(Performance.route_id == route_id))
+        self.db.execute(delete(PerformanceArchive).where(PerformanceArchive.route_id == route_id))
+        deleted = (self.db.execute(
+            delete(Route).where(Route.id == route_id).returning(Route.id)
+        )).scalar_one_or_none()
         self.db.commit()
-        return True
-
+        self.invalidate(route_id)
+        return deleted is not None
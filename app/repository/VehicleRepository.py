@@ -1,9 +1,92 @@
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Sequence, Set, Tuple
+from app.configuration.configuration import settings
+from app.core.cache import vehicle_cache, snapshot, restore
+from app.core.replicas import from_replica
+from app.core.counting import CountMode, TotalCount, count_key, count_rows
+from app.core.search import (
+    NGRAM_SIZE,
+    RANK_EXACT_PLATE,
+    RANK_FIELD_PREFIX,
+    RANK_PLATE_PREFIX,
+    RANK_SUBSTRING,
+    like_escape,
+    normalize,
+    vehicle_search_index,
+)
+from app.core.sql import RETURNING_OPTIONS, dialect_insert, dialect_name, ids_condition, order_by_ids
 from app.model.Vehicle import Vehicle
 from app.schema.Vehicle import VehicleCreate, VehicleUpdate
 
 
+VERSION_COLUMNS = (Vehicle.id, Vehicle.version, Vehicle.updated_at, Vehicle.created_at)
+SEARCH_COLUMNS = (Vehicle.id, Vehicle.plate_number, Vehicle.brand, Vehicle.model, Vehicle.is_active)
+# Cambia con cada alta, baja o edición (version sube en cada UPDATE), también las hechas por otros procesos
+SEARCH_GENERATION = select(func.count(), func.max(Vehicle.id), func.coalesce(func.sum(Vehicle.version), 0))
+
+
+def list_filters(active_only: bool) -> list:
+    return [Vehicle.is_active == True] if active_only else []
+
+
+def search_backend(db, query: str) -> str:
+    if len(normalize(query)) < NGRAM_SIZE:
+        return "database"
+    if settings.search_backend != "auto":
+        return settings.search_backend
+    return "database" if dialect_name(db) == "postgresql" else "memory"
+
+
+def search_statement(query: str, skip: int, limit: int, active_only: bool, max_candidates: int, trigram: bool):
+    query = normalize(query)
+    contains = f"%{like_escape(query)}%"
+    prefix = f"{like_escape(query)}%"
+
+    rank = case(
+        (func.lower(Vehicle.plate_number) == query, RANK_EXACT_PLATE),
+        (Vehicle.plate_number.ilike(prefix, escape="\\"), RANK_PLATE_PREFIX),
+        (
+            or_(Vehicle.brand.ilike(prefix, escape="\\"), Vehicle.model.ilike(prefix, escape="\\")),
+            RANK_FIELD_PREFIX
+        ),
+        else_=RANK_SUBSTRING,
+    )
+    # Con 1 o 2 caracteres no hay trigramas que indexar: sólo se buscan prefijos
+    pattern = contains if len(query) >= NGRAM_SIZE else prefix
+    order = [rank]
+    if trigram:
+        order.append(func.greatest(
+            func.similarity(Vehicle.plate_number, query),
+            func.similarity(Vehicle.brand, query),
+            func.similarity(Vehicle.model, query),
+        ).desc())
+    order.append(Vehicle.id)
+
+    # Los candidatos salen de los índices trigram y se ordenan antes del tope, así una placa exacta nunca queda fuera
+    candidates = select(Vehicle.id, func.row_number().over(order_by=order).label("position")).where(or_(
+        Vehicle.plate_number.ilike(pattern, escape="\\"),
+        Vehicle.brand.ilike(pattern, escape="\\"),
+        Vehicle.model.ilike(pattern, escape="\\"),
+    ))
+    if active_only:
+        candidates = candidates.where(Vehicle.is_active == True)
+    candidates = candidates.order_by(*order).limit(max_candidates + 1).subquery()
+
+    return (
+        select(Vehicle, func.count().over().label("candidates"))
+        .join(candidates, candidates.c.id == Vehicle.id)
+        .order_by(candidates.c.position)
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def search_results(rows: Sequence[tuple], max_candidates: int) -> Tuple[List[Vehicle], bool]:
+    return [row[0] for row in rows], bool(rows) and rows[0][1] > max_candidates
+
+
 class VehicleRepository:
 
     def __init__(self, db: Session):
@@ -12,16 +95,101 @@ class VehicleRepository:
     def get_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
         return self.db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
 
+    def find_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
+        cached = vehicle_cache.get(vehicle_id)
+        if cached is not None:
+            return restore(Vehicle, cached)
+
+        vehicle = self.get_by_id(vehicle_id)
+        if vehicle is not None and not from_replica(self.db):
+            vehicle_cache.set(vehicle_id, snapshot(vehicle))
+        return vehicle
+
+    def find_by_ids(self, vehicle_ids: List[int]) -> List[Vehicle]:
+        cached = vehicle_cache.get_many(vehicle_ids)
+        vehicles = [restore(Vehicle, data) for data in cached.values()]
+        missing = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in cached]
+        if missing:
+            loaded = self.db.scalars(select(Vehicle).where(ids_condition(self.db, Vehicle.id, missing))).all()
+            if not from_replica(self.db):
+                vehicle_cache.set_many({vehicle.id: snapshot(vehicle) for vehicle in loaded})
+            vehicles.extend(loaded)
+        return order_by_ids(vehicles, vehicle_ids)
+
     def get_by_plate_number(self, plate_number: str) -> Optional[Vehicle]:
         return self.db.query(Vehicle).filter(Vehicle.plate_number == plate_number).first()
 
-    def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = False) -> List[Vehicle]:
-        query = self.db.query(Vehicle)
+    def _list_query(
+            self,
+            columns: tuple,
+            skip: int,
+            limit: int,
+            active_only: bool,
+            after_id: Optional[int],
+    ):
+        query = self.db.query(*columns).filter(*list_filters(active_only))
+
+        if after_id is not None:
+            query = query.filter(Vehicle.id > after_id)
+        elif skip:
+            query = query.offset(skip)
+
+        return query.order_by(Vehicle.id).limit(limit)
 
-        if active_only:
-            query = query.filter(Vehicle.is_active == True)
+    def get_all(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            after_id: Optional[int] = None,
+    ) -> List[Vehicle]:
+        return self._list_query((Vehicle,), skip, limit, active_only, after_id).all()
 
-        return query.offset(skip).limit(limit).all()
+    def get_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            after_id: Optional[int] = None,
+    ) -> List[tuple]:
+        query = self._list_query(VERSION_COLUMNS, skip, limit, active_only, after_id)
+        return [tuple(row) for row in query.all()]
+
+    def search(
+            self,
+            query: str,
+            skip: int = 0,
+            limit: int = 20,
+            active_only: bool = False,
+            max_candidates: int = 1000,
+    ) -> Tuple[List[Vehicle], bool]:
+        if search_backend(self.db, query) == "memory" and self._ensure_search_index():
+            vehicle_ids, truncated = vehicle_search_index.search(query, skip, limit, active_only, max_candidates)
+            if not vehicle_ids:
+                return [], truncated
+            vehicles = self.db.scalars(select(Vehicle).where(Vehicle.id.in_(vehicle_ids))).all()
+            return order_by_ids(vehicles, vehicle_ids), truncated
+
+        statement = search_statement(query, skip, limit, active_only, max_candidates, dialect_name(self.db) == "postgresql")
+        rows = self.db.execute(statement).all()
+        return search_results(rows, max_candidates)
+
+    def _ensure_search_index(self) -> bool:
+        if not vehicle_search_index.check_due(settings.search_index_check_seconds):
+            return True
+        generation = tuple(self.db.execute(SEARCH_GENERATION).one())
+        if vehicle_search_index.is_current(generation):
+            return True
+        if not vehicle_search_index.begin_load():
+            # Otro request está cargando el índice: mientras tanto responde el anterior o, en la primera carga, el SQL
+            return vehicle_search_index.loaded
+        try:
+            rows = self.db.execute(select(*SEARCH_COLUMNS)).all()
+        except BaseException:
+            vehicle_search_index.abort_load()
+            raise
+        vehicle_search_index.finish_load(rows, generation)
+        return True
 
     def get_by_brand(self, brand: str, skip: int = 0, limit: int = 100) -> List[Vehicle]:
         return (
@@ -42,57 +210,71 @@ class VehicleRepository:
         )
 
     def create(self, vehicle_data: VehicleCreate) -> Vehicle:
-        db_vehicle = Vehicle(
-            user_id=vehicle_data.user_id,
-            plate_number=vehicle_data.plate_number,
-            brand=vehicle_data.brand,
-            model=vehicle_data.model,
-            year=vehicle_data.year
+        statement = insert(Vehicle).values(**vehicle_data.model_dump()).returning(Vehicle)
+        try:
+            db_vehicle = (self.db.scalars(statement)).one()
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+        vehicle_cache.set(db_vehicle.id, snapshot(db_vehicle))
+        vehicle_search_index.upsert(db_vehicle)
+        return db_vehicle
+
+    def bulk_create(self, vehicles: List[VehicleCreate]) -> Set[str]:
+        if not vehicles:
+            return set()
+
+        statement = (
+            dialect_insert(self.db, Vehicle)
+            .values([vehicle.model_dump() for vehicle in vehicles])
+            .on_conflict_do_nothing(index_elements=[Vehicle.plate_number])
+            .returning(*SEARCH_COLUMNS)
         )
-        self.db.add(db_vehicle)
+        rows = self.db.execute(statement).all()
         self.db.commit()
-        self.db.refresh(db_vehicle)
-        return db_vehicle
+        for row in rows:
+            vehicle_search_index.upsert(row)
+        return {row.plate_number for row in rows}
 
     def update(self, vehicle_id: int, vehicle_data: VehicleUpdate) -> Optional[Vehicle]:
-        db_vehicle = self.get_by_id(vehicle_id)
-        if not db_vehicle:
-            return None
-
-        update_data = vehicle_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_vehicle, field, value)
+        values = vehicle_data.model_dump(exclude_unset=True)
+        if not values:
+            return self.get_by_id(vehicle_id)
+        return self._update(vehicle_id, values)
 
-        self.db.commit()
-        self.db.refresh(db_vehicle)
+    def _update(self, vehicle_id: int, values: dict) -> Optional[Vehicle]:
+        statement = (
+            update(Vehicle)
+            .where(Vehicle.id == vehicle_id)
+            .values(**values, version=Vehicle.version + 1)
+            .returning(Vehicle)
+            .execution_options(**RETURNING_OPTIONS)
+        )
+        try:
+            db_vehicle = (self.db.scalars(statement)).one_or_none()
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+        vehicle_cache.delete(vehicle_id)
+        if db_vehicle is not None:
+            vehicle_search_index.upsert(db_vehicle)
         return db_vehicle
 
     def delete(self, vehicle_id: int) -> bool:
-        db_vehicle = self.get_by_id(vehicle_id)
-        if not db_vehicle:
-            return False
-
-        self.db.delete(db_vehicle)
+        statement = delete(Vehicle).where(Vehicle.id == vehicle_id).returning(Vehicle.id)
+        deleted = (self.db.execute(statement)).scalar_one_or_none()
         self.db.commit()
-        return True
+        vehicle_cache.delete(vehicle_id)
+        vehicle_search_index.remove(vehicle_id)
+        return deleted is not None
 
     def soft_delete(self, vehicle_id: int) -> Optional[Vehicle]:
-        db_vehicle = self.get_by_id(vehicle_id)
-        if not db_vehicle:
-            return None
-
-        db_vehicle.is_active = False
-        self.db.commit()
-        self.db.refresh(db_vehicle)
-        return db_vehicle
+        return self._update(vehicle_id, {"is_active": False})
 
     def exists_by_plate_number(self, plate_number: str) -> bool:
         return self.db.query(Vehicle).filter(Vehicle.plate_number == plate_number).first() is not None
 
-    def count(self, active_only: bool = False) -> int:
-        query = self.db.query(Vehicle)
-
-        if active_only:
-            query = query.filter(Vehicle.is_active == True)
-
-        return query.count()
\ No newline at end of file
+    def count(self, mode: CountMode, active_only: bool = False) -> TotalCount:
+        return count_rows(self.db, Vehicle, mode, list_filters(active_only), count_key("vehicles", active_only))
\ No newline at end of file
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import List, Literal, Optional
+
+
+EfficiencyBucketSize = Literal["day", "week", "month"]
+
+
+class EfficiencyBucket(BaseModel):
+    period_start: Optional[date] = Field(None, description="Inicio del periodo (vacío en los totales)")
+    route_count: int = Field(0, description="Rutas completadas")
+    distance_km: float = Field(0, description="Distancia total en km")
+    fuel_consumed: float = Field(0, description="Combustible total en litros")
+    duration_minutes: int = Field(0, description="Duración total en minutos")
+    km_per_liter: Optional[float] = Field(None, description="Rendimiento en km/L")
+    liters_per_100km: Optional[float] = Field(None, description="Consumo en L/100km")
+    avg_speed_kmh: Optional[float] = Field(None, description="Velocidad promedio en km/h")
+
+
+class EfficiencyResponse(BaseModel):
+    vehicle_id: Optional[int] = Field(None, description="Vehículo consultado (vacío para toda la flota)")
+    bucket: EfficiencyBucketSize
+    start: Optional[date] = None
+    end: Optional[date] = None
+    totals: EfficiencyBucket
+    buckets: List[EfficiencyBucket]
@@ -1,8 +1,11 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import FrozenSet, List, Optional, Type
 
+from app.enum.RouteExpansion import RouteExpansion
 from app.enum.RouteStatus import RouteStatus
+from app.schema.Performance import PerformanceResponse
+from app.schema.Vehicle import VehicleResponse
 
 class RouteBase(BaseModel):
     vehicle_id: int = Field(..., description="ID del vehículo asignado")
@@ -17,6 +20,11 @@ class RouteUpdate(BaseModel):
         None,
         description="Estado actual de la ruta"
     )
+    version: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Versión esperada de la ruta; si otra petición la modificó se responde 409"
+    )
 
 
 class RouteResponse(RouteBase):
@@ -27,5 +35,39 @@ class RouteResponse(RouteBase):
     completed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class RouteBatchResponse(BaseModel):
+    items: List[RouteResponse] = Field(..., description="Rutas encontradas, en el orden pedido")
+    missing: List[int] = Field(..., description="IDs pedidos que no existen")
+
+
+class RouteWithVehicle(RouteResponse):
+    vehicle: Optional[VehicleResponse] = None
+
+
+class RouteWithPerformance(RouteResponse):
+    performance: Optional[PerformanceResponse] = Field(
+        None,
+        validation_alias=AliasChoices("performance_record", "performance")
+    )
+
+
+class RouteExpandedResponse(RouteWithVehicle, RouteWithPerformance):
+    pass
+
+
+EXPANDED_RESPONSES = {
+    frozenset(): RouteResponse,
+    frozenset({RouteExpansion.VEHICLE}): RouteWithVehicle,
+    frozenset({RouteExpansion.PERFORMANCE}): RouteWithPerformance,
+    frozenset({RouteExpansion.VEHICLE, RouteExpansion.PERFORMANCE}): RouteExpandedResponse,
+}
+
+
+def route_response_model(expand: FrozenSet[RouteExpansion]) -> Type[RouteResponse]:
+    # Cada combinación sólo lee las relaciones que se cargaron: leer otra dispararía una consulta por ruta
+    return EXPANDED_RESPONSES[expand]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 class RouteComplete(BaseModel):
@@ -7,3 +7,23 @@ class RouteComplete(BaseModel):
     fuel_consumed: float = Field(..., ge=0, description="Combustible consumido en litros")
     duration_minutes: int = Field(..., gt=0, description="Duración total en minutos")
     notes: Optional[str] = Field(None, description="Notas del desempeño")
+
+
+class RouteCompleteItem(RouteComplete):
+    route_id: int = Field(..., description="ID de la ruta a completar")
+
+
+class RouteCompleteResult(BaseModel):
+    route_id: int
+    status: Literal["completed", "not_found", "already_completed", "duplicate"]
+
+
+class RouteCompleteBatchResponse(BaseModel):
+    completed: int = Field(..., description="Rutas completadas en esta petición")
+    results: List[RouteCompleteResult] = Field(..., description="Resultado por elemento, en el orden recibido")
+
+
+class RouteCompletionStatus(BaseModel):
+    token: str = Field(..., description="Token para consultar el estado del completado diferido")
+    route_id: int
+    status: Literal["queued", "completed", "not_found", "already_completed", "duplicate", "failed"]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class VehicleBase(BaseModel):
@@ -29,5 +29,11 @@ class VehicleResponse(VehicleBase):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class VehicleBatchResponse(BaseModel):
+    items: List[VehicleResponse] = Field(..., description="Vehículos encontrados, en el orden pedido")
+    missing: List[int] = Field(..., description="IDs pedidos que no existen")
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class VehicleBulkImportError(BaseModel):
+    row: int = Field(..., description="Número de fila de datos (1 = primera fila)")
+    plate_number: Optional[str] = Field(None, description="Placa de la fila, si pudo leerse")
+    errors: List[str] = Field(..., description="Motivos por los que la fila fue rechazada")
+
+
+class VehicleBulkImportResponse(BaseModel):
+    total_rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[VehicleBulkImportError] = Field(default_factory=list)
+    errors_truncated: bool = False
+
+    def merge(self, other: "VehicleBulkImportResponse", max_errors: int) -> None:
+        self.total_rows += other.total_rows
+        self.inserted += other.inserted
+        self.failed += other.failed
+
+        available = max_errors - len(self.errors)
+        self.errors.extend(other.errors[:max(available, 0)])
+        if len(other.errors) > available:
+            self.errors_truncated = True
@@ -0,0 +1,100 @@
+import logging
+import sys
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from app.configuration.configuration import settings
+from app.core.cache import cache_backend
+from app.core.pool import process_local_state, worker_count
+
+
+logger = logging.getLogger("integriapp.server")
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": settings.web_loop, "http": settings.web_http}
+
+
+def post_fork(server, worker) -> None:
+    from app.core import dabatase
+
+    dabatase.dispose_after_fork()
+
+
+def server_options() -> dict:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(),
+        "worker_class": "app.server.Worker",
+        "preload_app": settings.web_preload,
+        "max_requests": settings.web_max_requests,
+        "max_requests_jitter": settings.web_max_requests_jitter,
+        "timeout": settings.web_timeout,
+        "graceful_timeout": settings.web_graceful_timeout,
+        "post_fork": post_fork,
+        "accesslog": "-" if settings.debug else None,
+    }
+
+
+def check_workers() -> None:
+    workers = worker_count()
+    if workers > 1 and process_local_state():
+        raise ValueError(
+            f"WEB_WORKERS={workers} requiere Redis (REDIS_URL o CACHE_BACKEND=redis): con el caché {cache_backend()} "
+            "cada worker guarda el caché y los estados del write-behind en su propia memoria"
+        )
+
+
+def connection_plan() -> str:
+    # Importar dabatase crea los engines: con un presupuesto insuficiente falla aquí y no en cada worker
+    from app.core.dabatase import get_pool_sizes, replica_engines, reserved_connections
+
+    workers = worker_count()
+    pool_size, max_overflow = get_pool_sizes()
+    reserved = reserved_connections()
+    plan = (
+        f"{workers} workers x ({pool_size} pool + {max_overflow} overflow + {reserved} reservadas)"
+        f" = {workers * (pool_size + max_overflow + reserved)} conexiones"
+    )
+    if replica_engines:
+        # Cada réplica es otro servidor: su pool cuenta contra su propio max_connections, no contra el presupuesto
+        plan += (
+            f"; {len(replica_engines)} réplicas de lectura con hasta"
+            f" {workers * (pool_size + max_overflow)} conexiones cada una"
+        )
+    return plan
+
+
+class Server(BaseApplication):
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main() -> int:
+    logging.basicConfig()
+    logger.setLevel(logging.INFO)
+    try:
+        check_workers()
+        plan = connection_plan()
+    except ValueError as error:
+        logger.error("%s", error)
+        return 1
+    logger.info("Base de datos: %s", plan)
+    Server(server_options()).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from datetime import date, datetime, timedelta
+
+from app.repository.EfficiencyRepository import EfficiencyRepository
+from app.repository.VehicleRepository import VehicleRepository
+from app.schema.Efficiency import EfficiencyBucket, EfficiencyBucketSize, EfficiencyResponse
+
+
+def efficiency_increments(entries: Iterable[Tuple[int, date, float, float, int]]) -> List[dict]:
+    increments: Dict[Tuple[int, date], dict] = {}
+    for vehicle_id, day, distance_km, fuel_consumed, duration in entries:
+        increment = increments.setdefault((vehicle_id, day), {
+            "vehicle_id": vehicle_id,
+            "day": day,
+            "route_count": 0,
+            "distance_km": 0.0,
+            "fuel_consumed": 0.0,
+            "duration_minutes": 0,
+        })
+        increment["route_count"] += 1
+        increment["distance_km"] += distance_km
+        increment["fuel_consumed"] += fuel_consumed
+        increment["duration_minutes"] += duration
+    return list(increments.values())
+
+
+def bucket_start(day: date, bucket: EfficiencyBucketSize) -> date:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    elif isinstance(day, datetime):
+        day = day.date()
+
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _finish(bucket: EfficiencyBucket) -> EfficiencyBucket:
+    if bucket.fuel_consumed > 0:
+        bucket.km_per_liter = round(bucket.distance_km / bucket.fuel_consumed, 4)
+    if bucket.distance_km > 0:
+        bucket.liters_per_100km = round(bucket.fuel_consumed / bucket.distance_km * 100, 4)
+    if bucket.duration_minutes > 0:
+        bucket.avg_speed_kmh = round(bucket.distance_km / (bucket.duration_minutes / 60), 4)
+    return bucket
+
+
+def build_efficiency_response(
+    rows: List[tuple],
+    bucket: EfficiencyBucketSize,
+    vehicle_id: Optional[int],
+    start: Optional[date],
+    end: Optional[date],
+) -> EfficiencyResponse:
+    totals = EfficiencyBucket()
+    buckets: Dict[date, EfficiencyBucket] = {}
+
+    for day, route_count, distance_km, fuel_consumed, duration_minutes in rows:
+        period = bucket_start(day, bucket)
+        current = buckets.setdefault(period, EfficiencyBucket(period_start=period))
+        for target in (current, totals):
+            target.route_count += route_count or 0
+            target.distance_km += distance_km or 0
+            target.fuel_consumed += fuel_consumed or 0
+            target.duration_minutes += duration_minutes or 0
+
+    return EfficiencyResponse(
+        vehicle_id=vehicle_id,
+        bucket=bucket,
+        start=start,
+        end=end,
+        totals=_finish(totals),
+        buckets=[_finish(item) for item in buckets.values()]
+    )
+
+
+def validate_range(start: Optional[date], end: Optional[date]) -> None:
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial no puede ser mayor que la final"
+        )
+
+
+class AnalyticsService:
+
+    def __init__(self, db: Session):
+        self.repository = EfficiencyRepository(db)
+        self.vehicle_repository = VehicleRepository(db)
+
+    def get_vehicle_efficiency(
+        self,
+        vehicle_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        bucket: EfficiencyBucketSize = "day",
+    ) -> EfficiencyResponse:
+        validate_range(start, end)
+        if not self.vehicle_repository.find_by_id(vehicle_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehículo con ID {vehicle_id} no encontrado"
+            )
+
+        rows = self.repository.get_series(vehicle_id=vehicle_id, start=start, end=end)
+        return build_efficiency_response(rows, bucket, vehicle_id, start, end)
+
+    def get_fleet_efficiency(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        bucket: EfficiencyBucketSize = "day",
+    ) -> EfficiencyResponse:
+        validate_range(start, end)
+        rows = self.repository.get_series(start=start, end=end)
+        return build_efficiency_response(rows, bucket, None, start, end)
+
+    def rebuild_efficiency(self, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        validate_range(start, end)
+        return self.repository.rebuild(start=start, end=end)
@@ -0,0 +1,43 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from datetime import date
+
+from app.repository.AsyncEfficiencyRepository import AsyncEfficiencyRepository
+from app.repository.AsyncVehicleRepository import AsyncVehicleRepository
+from app.schema.Efficiency import EfficiencyBucketSize, EfficiencyResponse
+from app.service.AnalyticsService import build_efficiency_response, validate_range
+
+
+class AsyncAnalyticsService:
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncEfficiencyRepository(db)
+        self.vehicle_repository = AsyncVehicleRepository(db)
+
+    async def get_vehicle_efficiency(
+        self,
+        vehicle_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        bucket: EfficiencyBucketSize = "day",
+    ) -> EfficiencyResponse:
+        validate_range(start, end)
+        if not await self.vehicle_repository.find_by_id(vehicle_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehículo con ID {vehicle_id} no encontrado"
+            )
+
+        rows = await self.repository.get_series(vehicle_id=vehicle_id, start=start, end=end)
+        return build_efficiency_response(rows, bucket, vehicle_id, start, end)
+
+    async def get_fleet_efficiency(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        bucket: EfficiencyBucketSize = "day",
+    ) -> EfficiencyResponse:
+        validate_range(start, end)
+        rows = await self.repository.get_series(start=start, end=end)
+        return build_efficiency_response(rows, bucket, None, start, end)
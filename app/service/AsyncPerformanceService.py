@@ -0,0 +1,61 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from typing import AsyncIterator, List, Optional
+from datetime import datetime
+
+from app.core import dabatase
+from app.core.export import encode_header, encode_rows
+from app.repository.AsyncPerformanceRepository import AsyncPerformanceRepository
+from app.service.PerformanceService import EXPORT_FIELDS
+from app.schema.Performance import PerformanceResponse
+from app.core.pagination import decode_cursor
+from app.core.counting import CountMode, TotalCount
+from app.core.serialization import validate_list
+
+
+async def export_performances(data_format: str, batch_size: int, primary: bool = False) -> AsyncIterator[bytes]:
+    async with await dabatase.open_async_read_session(primary) as db:
+        async for chunk in AsyncPerformanceService(db).iter_export(data_format, batch_size):
+            yield chunk
+
+
+class AsyncPerformanceService:
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncPerformanceRepository(db)
+
+    async def get_all_performances(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[PerformanceResponse]:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        performances = await self.repository.get_all(skip=skip, limit=limit, after=after)
+        return validate_list(PerformanceResponse, performances)
+
+    async def get_performance_by_route_id(self, route_id: int) -> PerformanceResponse:
+        performance = await self.repository.get_by_route_id(route_id)
+        if not performance:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Rendimiento de la ruta {route_id} no encontrado"
+            )
+        return PerformanceResponse.model_validate(performance)
+
+    async def get_performance_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[tuple]:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        return await self.repository.get_versions(skip=skip, limit=limit, after=after)
+
+    async def count_performances(self, mode: CountMode) -> TotalCount:
+        return await self.repository.count(mode)
+
+    async def iter_export(self, data_format: str, batch_size: int) -> AsyncIterator[bytes]:
+        yield encode_header(EXPORT_FIELDS, data_format)
+        async for rows in self.repository.stream_all(batch_size):
+            yield encode_rows(EXPORT_FIELDS, rows, data_format)
@@ -0,0 +1,217 @@
+from typing import FrozenSet, List, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from datetime import datetime
+
+from app.repository.AsyncRouteRepository import AsyncRouteRepository
+from app.repository.AsyncPerformanceRepository import AsyncPerformanceRepository
+from app.repository.AsyncEfficiencyRepository import AsyncEfficiencyRepository
+from app.schema.Route import RouteBatchResponse, RouteCreate, RouteUpdate, RouteResponse, route_response_model
+from app.schema.RouteComplete import RouteComplete, RouteCompleteItem, RouteCompleteBatchResponse, RouteCompletionStatus
+from app.service.RouteService import (
+    unique_completion_items,
+    build_performance_rows,
+    build_efficiency_rows,
+    build_completion_response,
+    raise_transition_conflict,
+    same_status_update,
+    completion_events,
+    completion_status,
+)
+from app.enum.RouteExpansion import RouteExpansion
+from app.enum.RouteStatus import RouteStatus
+from app.repository.AsyncVehicleRepository import AsyncVehicleRepository
+from app.core.pagination import decode_cursor
+from app.core.events import ROUTE_CREATED, ROUTE_STATUS_CHANGED, notify_events_async, publish_events, route_event
+from app.core import dabatase
+from app.core.counting import CountMode, TotalCount
+from app.core.serialization import validate_list
+from app.core.writebehind import completion_queue
+
+
+async def flush_completions(items: List[RouteCompleteItem]) -> RouteCompleteBatchResponse:
+    async with dabatase.AsyncSessionLocal() as db:
+        return await AsyncRouteService(db).complete_routes(items)
+
+
+class AsyncRouteService:
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncRouteRepository(db)
+        self.vehicle_repository = AsyncVehicleRepository(db)
+        self.performance_repository = AsyncPerformanceRepository(db)
+        self.efficiency_repository = AsyncEfficiencyRepository(db)
+
+    async def get_route_by_id(
+        self,
+        route_id: int,
+        expand: FrozenSet[RouteExpansion] = frozenset(),
+    ) -> RouteResponse:
+        # La caché de entidades sólo guarda la fila de la ruta; con relaciones se lee de la base
+        if expand:
+            route = await self.repository.get_by_id(route_id, expand)
+        else:
+            route = await self.repository.find_by_id(route_id)
+        if not route:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Ruta con ID {route_id} no encontrada"
+            )
+        return route_response_model(expand).model_validate(route)
+
+    async def get_routes_by_ids(self, route_ids: List[int]) -> RouteBatchResponse:
+        route_ids = list(dict.fromkeys(route_ids))
+        routes = await self.repository.find_by_ids(route_ids)
+        found = {route.id for route in routes}
+        return RouteBatchResponse(
+            items=validate_list(RouteResponse, routes),
+            missing=[route_id for route_id in route_ids if route_id not in found]
+        )
+
+    async def get_all_routes(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        status: RouteStatus | None = None,
+        vehicle_id: int | None = None,
+        cursor: Optional[str] = None,
+        expand: FrozenSet[RouteExpansion] = frozenset(),
+    ) -> List[RouteResponse]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        routes = await self.repository.get_all(
+            skip=skip,
+            limit=limit,
+            status=status,
+            vehicle_id=vehicle_id,
+            after_id=after_id,
+            expand=expand
+        )
+        return validate_list(route_response_model(expand), routes)
+
+    async def get_route_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        status: RouteStatus | None = None,
+        vehicle_id: int | None = None,
+        cursor: Optional[str] = None,
+    ) -> List[tuple]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        return await self.repository.get_versions(
+            skip=skip,
+            limit=limit,
+            status=status,
+            vehicle_id=vehicle_id,
+            after_id=after_id
+        )
+
+    async def count_routes(
+        self,
+        mode: CountMode,
+        status: RouteStatus | None = None,
+        vehicle_id: int | None = None,
+    ) -> TotalCount:
+        return await self.repository.count(mode, status=status, vehicle_id=vehicle_id)
+
+    async def create_route(self, route_data: RouteCreate) -> RouteResponse:
+        if not await self.vehicle_repository.find_by_id(route_data.vehicle_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Vehículo con ID {route_data.vehicle_id} no existe"
+            )
+
+        route = await self.repository.create(route_data)
+        events = [route_event(ROUTE_CREATED, route.id, route.vehicle_id, route.status, route.version)]
+        await notify_events_async(self.repository.db, events)
+        await self.repository.db.commit()
+        await self.repository.remember(route)
+        publish_events(events)
+        return RouteResponse.model_validate(route)
+
+    async def update_route(self, route_id: int, route_data: RouteUpdate) -> RouteResponse:
+        route = await self.repository.update(route_id, route_data, datetime.now())
+
+        if not route:
+            await self.repository.db.rollback()
+            current = await self.repository.get_by_id(route_id)
+            unchanged = same_status_update(current, route_data)
+            if unchanged is None:
+                raise_transition_conflict(current, route_id, route_data.status, route_data.version)
+            return await self.update_route(route_id, unchanged)
+
+        events = []
+        if route_data.status is not None:
+            events.append(route_event(ROUTE_STATUS_CHANGED, route.id, route.vehicle_id, route.status, route.version))
+        await notify_events_async(self.repository.db, events)
+        await self.repository.db.commit()
+        await self.repository.invalidate(route_id)
+        publish_events(events)
+        return RouteResponse.model_validate(route)
+
+    async def complete_route(self, route_id: int, payload: RouteComplete, expected_version: Optional[int] = None):
+        unique = {route_id: RouteCompleteItem(route_id=route_id, **payload.model_dump())}
+
+        try:
+            completed_at = datetime.now()
+            completed = await self.repository.mark_completed([route_id], completed_at, expected_version)
+            if completed:
+                await self.performance_repository.bulk_insert(build_performance_rows(unique, completed))
+                await self.efficiency_repository.increment(build_efficiency_rows(unique, completed, completed_at))
+                events = completion_events(completed, completed_at)
+                await notify_events_async(self.repository.db, events)
+                await self.repository.db.commit()
+            else:
+                await self.repository.db.rollback()
+                current = await self.repository.get_by_id(route_id)
+        except Exception:
+            await self.repository.db.rollback()
+            raise
+
+        if not completed:
+            raise_transition_conflict(current, route_id, RouteStatus.COMPLETED, expected_version)
+
+        await self.repository.invalidate(route_id)
+        publish_events(events)
+        return {
+            "message": "Ruta completada y performance creado",
+            "route_id": route_id
+        }
+
+    async def complete_routes(self, items: List[RouteCompleteItem]) -> RouteCompleteBatchResponse:
+        unique = unique_completion_items(items)
+        route_ids = list(unique)
+
+        try:
+            completed_at = datetime.now()
+            completed = await self.repository.mark_completed(route_ids, completed_at)
+            await self.performance_repository.bulk_insert(build_performance_rows(unique, completed))
+            await self.efficiency_repository.increment(build_efficiency_rows(unique, completed, completed_at))
+            pending = [route_id for route_id in route_ids if route_id not in completed]
+            existing = await self.repository.get_existing_ids(pending)
+            events = completion_events(completed, completed_at)
+            await notify_events_async(self.repository.db, events)
+            await self.repository.db.commit()
+        except Exception:
+            await self.repository.db.rollback()
+            raise
+
+        await self.repository.invalidate(*completed)
+        publish_events(events)
+
+        return build_completion_response(items, unique, completed, existing)
+
+    async def queue_completion(self, route_id: int, payload: RouteComplete) -> RouteCompletionStatus:
+        item = RouteCompleteItem(route_id=route_id, **payload.model_dump())
+        return RouteCompletionStatus(**await completion_queue.enqueue_async(item))
+
+    @staticmethod
+    async def get_completion_status(token: str) -> RouteCompletionStatus:
+        return completion_status(await completion_queue.status_async(token), token)
+
+    async def delete_route(self, route_id: int) -> Dict[str, str]:
+        if not await self.repository.delete(route_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Ruta con ID {route_id} no encontrada"
+            )
+        return {"message": f"Ruta {route_id} eliminada correctamente"}
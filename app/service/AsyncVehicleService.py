@@ -0,0 +1,147 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+
+from app.configuration.configuration import settings
+from app.repository.AsyncVehicleRepository import AsyncVehicleRepository
+from app.schema.Vehicle import VehicleBatchResponse, VehicleCreate, VehicleUpdate, VehicleResponse
+from app.schema.VehicleBulkImport import VehicleBulkImportResponse
+from app.service.VehicleService import raise_duplicate_plate, validate_import_rows, build_import_report
+from app.core.ingest import Row
+from app.core.pagination import decode_cursor
+from app.core.counting import CountMode, TotalCount
+from app.core.serialization import validate_list
+
+
+class AsyncVehicleService:
+
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncVehicleRepository(db)
+
+    async def get_vehicle_by_id(self, vehicle_id: int) -> VehicleResponse:
+        vehicle = await self.repository.find_by_id(vehicle_id)
+        if not vehicle:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehículo con ID {vehicle_id} no encontrado"
+            )
+        return VehicleResponse.model_validate(vehicle)
+
+    async def get_vehicles_by_ids(self, vehicle_ids: List[int]) -> VehicleBatchResponse:
+        vehicle_ids = list(dict.fromkeys(vehicle_ids))
+        vehicles = await self.repository.find_by_ids(vehicle_ids)
+        found = {vehicle.id for vehicle in vehicles}
+        return VehicleBatchResponse(
+            items=validate_list(VehicleResponse, vehicles),
+            missing=[vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in found]
+        )
+
+    async def get_all_vehicles(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            cursor: Optional[str] = None
+    ) -> List[VehicleResponse]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        vehicles = await self.repository.get_all(
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            after_id=after_id
+        )
+        return validate_list(VehicleResponse, vehicles)
+
+    async def get_vehicle_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            cursor: Optional[str] = None
+    ) -> List[tuple]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        return await self.repository.get_versions(
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            after_id=after_id
+        )
+
+    async def count_vehicles(self, mode: CountMode, active_only: bool = False) -> TotalCount:
+        return await self.repository.count(mode, active_only=active_only)
+
+    async def search_vehicles(
+            self,
+            query: str,
+            skip: int = 0,
+            limit: int = 20,
+            active_only: bool = False
+    ) -> Tuple[List[VehicleResponse], bool]:
+        vehicles, truncated = await self.repository.search(
+            query,
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            max_candidates=settings.search_max_candidates
+        )
+        return validate_list(VehicleResponse, vehicles), truncated
+
+    async def create_vehicle(self, vehicle_data: VehicleCreate) -> VehicleResponse:
+        if not self._validate_plate_format(vehicle_data.plate_number):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formato de placa inválido"
+            )
+
+        try:
+            vehicle = await self.repository.create(vehicle_data)
+        except IntegrityError:
+            raise_duplicate_plate(vehicle_data.plate_number)
+        return VehicleResponse.model_validate(vehicle)
+
+    async def import_vehicles(self, rows: List[Row]) -> VehicleBulkImportResponse:
+        candidates, report = validate_import_rows(rows, self._validate_plate_format)
+        inserted = await self.repository.bulk_create([vehicle for _, vehicle in candidates.values()])
+        return build_import_report(candidates, inserted, report)
+
+    async def update_vehicle(self, vehicle_id: int, vehicle_data: VehicleUpdate) -> VehicleResponse:
+        if vehicle_data.plate_number and not self._validate_plate_format(vehicle_data.plate_number):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formato de placa inválido"
+            )
+
+        try:
+            vehicle = await self.repository.update(vehicle_id, vehicle_data)
+        except IntegrityError:
+            raise_duplicate_plate(vehicle_data.plate_number)
+
+        if not vehicle:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vehículo con ID {vehicle_id} no encontrado"
+            )
+        return VehicleResponse.model_validate(vehicle)
+
+    async def delete_vehicle(self, vehicle_id: int, soft: bool = True) -> Dict[str, str]:
+        if soft:
+            vehicle = await self.repository.soft_delete(vehicle_id)
+            if not vehicle:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Vehículo con ID {vehicle_id} no encontrado"
+                )
+            return {"message": f"Vehículo {vehicle_id} marcado como inactivo"}
+        else:
+            if not await self.repository.delete(vehicle_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Vehículo con ID {vehicle_id} no encontrado"
+                )
+            return {"message": f"Vehículo {vehicle_id} eliminado permanentemente"}
+
+    def _validate_plate_format(self, plate_number: str) -> bool:
+        import re
+        pattern = r'^[A-Z0-9-]{3,10}$'
+        return bool(re.match(pattern, plate_number.upper()))
@@ -1,7 +1,22 @@
-from typing import List
+from fastapi import HTTPException, status
+from typing import Iterator, List, Optional
+from datetime import datetime
 
-from app.repository.PerformanceRepository import PerformanceRepository
+from app.core.dabatase import open_read_session
+from app.core.export import encode_header, encode_rows
+from app.repository.PerformanceRepository import PerformanceRepository, EXPORT_COLUMNS
 from app.schema.Performance import PerformanceResponse
+from app.core.pagination import decode_cursor
+from app.core.counting import CountMode, TotalCount
+from app.core.serialization import validate_list
+
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def export_performances(data_format: str, batch_size: int, primary: bool = False) -> Iterator[bytes]:
+    with open_read_session(primary) as db:
+        yield from PerformanceService(db).iter_export(data_format, batch_size)
 
 
 class PerformanceService:
@@ -13,9 +28,34 @@ class PerformanceService:
         self,
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
     ) -> List[PerformanceResponse]:
-        performances = self.repository.get_all(skip=skip, limit=limit)
-        return [
-            PerformanceResponse.model_validate(performance)
-            for performance in performances
-        ]
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        performances = self.repository.get_all(skip=skip, limit=limit, after=after)
+        return validate_list(PerformanceResponse, performances)
+
+    def get_performance_by_route_id(self, route_id: int) -> PerformanceResponse:
+        performance = self.repository.get_by_route_id(route_id)
+        if not performance:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Rendimiento de la ruta {route_id} no encontrado"
+            )
+        return PerformanceResponse.model_validate(performance)
+
+    def get_performance_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[tuple]:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+        return self.repository.get_versions(skip=skip, limit=limit, after=after)
+
+    def count_performances(self, mode: CountMode) -> TotalCount:
+        return self.repository.count(mode)
+
+    def iter_export(self, data_format: str, batch_size: int) -> Iterator[bytes]:
+        yield encode_header(EXPORT_FIELDS, data_format)
+        for rows in self.repository.stream_all(batch_size):
+            yield encode_rows(EXPORT_FIELDS, rows, data_format)
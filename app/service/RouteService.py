@@ -1,14 +1,164 @@
-from typing import List, Dict
+from typing import FrozenSet, List, Dict, NoReturn, Optional, Set
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, UTC
 
 from app.repository.RouteRepository import RouteRepository
-from app.schema.Route import RouteCreate, RouteUpdate, RouteResponse
-from app.schema.RouteComplete import RouteComplete
-from app.model.Performance import Performance
+from app.repository.PerformanceRepository import PerformanceRepository
+from app.repository.EfficiencyRepository import EfficiencyRepository
+from app.model.Route import Route
+from app.service.AnalyticsService import efficiency_increments
+from app.schema.Route import RouteBatchResponse, RouteCreate, RouteUpdate, RouteResponse, route_response_model
+from app.schema.RouteComplete import (
+    RouteComplete,
+    RouteCompleteItem,
+    RouteCompleteResult,
+    RouteCompleteBatchResponse,
+    RouteCompletionStatus,
+)
+from app.enum.RouteExpansion import RouteExpansion
 from app.enum.RouteStatus import RouteStatus
 from app.repository.VehicleRepository import VehicleRepository
+from app.core.pagination import decode_cursor
+from app.core.events import (
+    ROUTE_COMPLETED,
+    ROUTE_CREATED,
+    ROUTE_STATUS_CHANGED,
+    RouteEvent,
+    notify_events,
+    publish_events,
+    route_event,
+)
+from app.core.counting import CountMode, TotalCount
+from app.core.dabatase import SessionLocal
+from app.core.serialization import validate_list
+from app.core.writebehind import completion_queue
+
+
+def unique_completion_items(items: List[RouteCompleteItem]) -> Dict[int, RouteCompleteItem]:
+    unique: Dict[int, RouteCompleteItem] = {}
+    for item in items:
+        unique.setdefault(item.route_id, item)
+    return unique
+
+
+def build_performance_rows(
+    unique: Dict[int, RouteCompleteItem],
+    completed: Dict[int, int],
+) -> List[dict]:
+    created_at = datetime.now(UTC)
+    return [
+        {
+            "route_id": route_id,
+            "distance_km": item.distance_km,
+            "fuel_consumed": item.fuel_consumed,
+            "duration": item.duration_minutes,
+            "notes": item.notes,
+            "created_at": created_at,
+        }
+        for route_id, item in unique.items()
+        if route_id in completed
+    ]
+
+
+def build_efficiency_rows(
+    unique: Dict[int, RouteCompleteItem],
+    completed: Dict[int, int],
+    completed_at: datetime,
+) -> List[dict]:
+    return efficiency_increments(
+        (
+            vehicle_id,
+            completed_at.date(),
+            unique[route_id].distance_km,
+            unique[route_id].fuel_consumed,
+            unique[route_id].duration_minutes,
+        )
+        for route_id, vehicle_id in completed.items()
+    )
+
+
+def build_completion_response(
+    items: List[RouteCompleteItem],
+    unique: Dict[int, RouteCompleteItem],
+    completed: Dict[int, int],
+    existing: Set[int],
+) -> RouteCompleteBatchResponse:
+    results = []
+    for item in items:
+        if unique[item.route_id] is not item:
+            result_status = "duplicate"
+        elif item.route_id in completed:
+            result_status = "completed"
+        elif item.route_id in existing:
+            result_status = "already_completed"
+        else:
+            result_status = "not_found"
+        results.append(RouteCompleteResult(route_id=item.route_id, status=result_status))
+
+    return RouteCompleteBatchResponse(completed=len(completed), results=results)
+
+
+def completion_events(completed: Dict[int, int], completed_at: datetime) -> List[RouteEvent]:
+    return [
+        route_event(ROUTE_COMPLETED, route_id, vehicle_id, RouteStatus.COMPLETED, occurred_at=completed_at)
+        for route_id, vehicle_id in completed.items()
+    ]
+
+
+def raise_transition_conflict(
+    route: Optional[Route],
+    route_id: int,
+    target: Optional[RouteStatus],
+    expected_version: Optional[int],
+) -> NoReturn:
+    if route is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ruta con ID {route_id} no encontrada"
+        )
+    if expected_version is not None and route.version != expected_version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La ruta {route_id} fue modificada por otra petición (versión actual {route.version})"
+        )
+    if target == RouteStatus.COMPLETED and route.status == RouteStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La ruta ya fue completada"
+        )
+    if target is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La ruta {route_id} fue modificada por otra petición"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Transición de estado inválida: {route.status.value} → {target.value}"
+    )
+
+
+def completion_status(found: Optional[dict], token: str) -> RouteCompletionStatus:
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Completado {token} no encontrado o expirado"
+        )
+    return RouteCompletionStatus(**found)
+
+
+def flush_completions(items: List[RouteCompleteItem]) -> RouteCompleteBatchResponse:
+    with SessionLocal() as db:
+        return RouteService(db).complete_routes(items)
+
+
+def same_status_update(route: Optional[Route], route_data: RouteUpdate) -> Optional[RouteUpdate]:
+    # Pedir el estado que la ruta ya tiene no es una transición: se aplica el resto del cambio sin tocar el estado
+    if route is None or route_data.status is None or route.status != route_data.status:
+        return None
+    if route.status == RouteStatus.COMPLETED or route_data.version not in (None, route.version):
+        return None
+    return RouteUpdate(**route_data.model_dump(exclude_unset=True, exclude={"status"}))
 
 
 class RouteService:
@@ -16,15 +166,34 @@ class RouteService:
     def __init__(self, db: Session):
         self.repository = RouteRepository(db)
         self.vehicle_repository = VehicleRepository(db)
+        self.performance_repository = PerformanceRepository(db)
+        self.efficiency_repository = EfficiencyRepository(db)
 
-    def get_route_by_id(self, route_id: int) -> RouteResponse:
-        route = self.repository.get_by_id(route_id)
+    def get_route_by_id(
+        self,
+        route_id: int,
+        expand: FrozenSet[RouteExpansion] = frozenset(),
+    ) -> RouteResponse:
+        # La caché de entidades sólo guarda la fila de la ruta; con relaciones se lee de la base
+        if expand:
+            route = self.repository.get_by_id(route_id, expand)
+        else:
+            route = self.repository.find_by_id(route_id)
         if not route:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Ruta con ID {route_id} no encontrada"
             )
-        return RouteResponse.model_validate(route)
+        return route_response_model(expand).model_validate(route)
+
+    def get_routes_by_ids(self, route_ids: List[int]) -> RouteBatchResponse:
+        route_ids = list(dict.fromkeys(route_ids))
+        routes = self.repository.find_by_ids(route_ids)
+        found = {route.id for route in routes}
+        return RouteBatchResponse(
+            items=validate_list(RouteResponse, routes),
+            missing=[route_id for route_id in route_ids if route_id not in found]
+        )
 
     def get_all_routes(
         self,
@@ -32,90 +201,141 @@ class RouteService:
         limit: int = 100,
         status: RouteStatus | None = None,
         vehicle_id: int | None = None,
+        cursor: Optional[str] = None,
+        expand: FrozenSet[RouteExpansion] = frozenset(),
     ) -> List[RouteResponse]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
         routes = self.repository.get_all(
             skip=skip,
             limit=limit,
             status=status,
-            vehicle_id=vehicle_id
+            vehicle_id=vehicle_id,
+            after_id=after_id,
+            expand=expand
         )
-        return [RouteResponse.model_validate(route) for route in routes]
+        return validate_list(route_response_model(expand), routes)
+
+    def get_route_versions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        status: RouteStatus | None = None,
+        vehicle_id: int | None = None,
+        cursor: Optional[str] = None,
+    ) -> List[tuple]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        return self.repository.get_versions(
+            skip=skip,
+            limit=limit,
+            status=status,
+            vehicle_id=vehicle_id,
+            after_id=after_id
+        )
+
+    def count_routes(
+        self,
+        mode: CountMode,
+        status: RouteStatus | None = None,
+        vehicle_id: int | None = None,
+    ) -> TotalCount:
+        return self.repository.count(mode, status=status, vehicle_id=vehicle_id)
 
     def create_route(self, route_data: RouteCreate) -> RouteResponse:
-        if not self.vehicle_repository.get_by_id(route_data.vehicle_id):
+        if not self.vehicle_repository.find_by_id(route_data.vehicle_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Vehículo con ID {route_data.vehicle_id} no existe"
             )
 
         route = self.repository.create(route_data)
+        events = [route_event(ROUTE_CREATED, route.id, route.vehicle_id, route.status, route.version)]
+        notify_events(self.repository.db, events)
+        self.repository.db.commit()
+        self.repository.remember(route)
+        publish_events(events)
         return RouteResponse.model_validate(route)
 
     def update_route(self, route_id: int, route_data: RouteUpdate) -> RouteResponse:
-        route = self.repository.get_by_id(route_id)
+        route = self.repository.update(route_id, route_data, datetime.now())
 
         if not route:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Ruta con ID {route_id} no encontrada"
-            )
+            self.repository.db.rollback()
+            # Sólo el camino perdedor paga la lectura que explica por qué no hubo UPDATE
+            current = self.repository.get_by_id(route_id)
+            unchanged = same_status_update(current, route_data)
+            if unchanged is None:
+                raise_transition_conflict(current, route_id, route_data.status, route_data.version)
+            return self.update_route(route_id, unchanged)
 
-        if (
-                route_data.status == RouteStatus.IN_PROGRESS
-                and route.started_at is None
-        ):
-            route.started_at = datetime.now()
+        events = []
+        if route_data.status is not None:
+            events.append(route_event(ROUTE_STATUS_CHANGED, route.id, route.vehicle_id, route.status, route.version))
+        notify_events(self.repository.db, events)
+        self.repository.db.commit()
+        self.repository.invalidate(route_id)
+        publish_events(events)
+        return RouteResponse.model_validate(route)
 
-        if route_data.status == RouteStatus.COMPLETED:
-            route.completed_at = datetime.now()
+    def complete_route(self, route_id: int, payload: RouteComplete, expected_version: Optional[int] = None):
+        unique = {route_id: RouteCompleteItem(route_id=route_id, **payload.model_dump())}
 
-        updated_route = self.repository.update(route, route_data)
+        try:
+            completed_at = datetime.now()
+            completed = self.repository.mark_completed([route_id], completed_at, expected_version)
+            if completed:
+                self.performance_repository.bulk_insert(build_performance_rows(unique, completed))
+                self.efficiency_repository.increment(build_efficiency_rows(unique, completed, completed_at))
+                events = completion_events(completed, completed_at)
+                notify_events(self.repository.db, events)
+                self.repository.db.commit()
+            else:
+                self.repository.db.rollback()
+                current = self.repository.get_by_id(route_id)
+        except Exception:
+            self.repository.db.rollback()
+            raise
 
-        return RouteResponse.model_validate(updated_route)
+        if not completed:
+            raise_transition_conflict(current, route_id, RouteStatus.COMPLETED, expected_version)
 
-    def complete_route(self, route_id: int, payload: RouteComplete):
-        route = self.repository.get_by_id(route_id)
+        self.repository.invalidate(route_id)
+        publish_events(events)
+        return {
+            "message": "Ruta completada y performance creado",
+            "route_id": route_id
+        }
 
-        if not route:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Ruta no encontrada"
-            )
-
-        if route.status == RouteStatus.COMPLETED:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La ruta ya fue completada"
-            )
+    def complete_routes(self, items: List[RouteCompleteItem]) -> RouteCompleteBatchResponse:
+        unique = unique_completion_items(items)
+        route_ids = list(unique)
 
         try:
-            route.status = RouteStatus.COMPLETED
-            route.completed_at = datetime.now()
-
-            performance = Performance(
-                route_id=route.id,
-                distance_km=payload.distance_km,
-                fuel_consumed=payload.fuel_consumed,
-                duration=payload.duration_minutes,
-                notes=payload.notes
-            )
-
-            self.repository.db.add(performance)
-
+            completed_at = datetime.now()
+            completed = self.repository.mark_completed(route_ids, completed_at)
+            self.performance_repository.bulk_insert(build_performance_rows(unique, completed))
+            self.efficiency_repository.increment(build_efficiency_rows(unique, completed, completed_at))
+            pending = [route_id for route_id in route_ids if route_id not in completed]
+            existing = self.repository.get_existing_ids(pending)
+            events = completion_events(completed, completed_at)
+            notify_events(self.repository.db, events)
             self.repository.db.commit()
-
-            self.repository.db.refresh(route)
-            self.repository.db.refresh(performance)
-
-            return {
-                "message": "Ruta completada y performance creado",
-                "route_id": route.id
-            }
-
         except Exception:
             self.repository.db.rollback()
             raise
 
+        self.repository.invalidate(*completed)
+        publish_events(events)
+
+        return build_completion_response(items, unique, completed, existing)
+
+    def queue_completion(self, route_id: int, payload: RouteComplete) -> RouteCompletionStatus:
+        item = RouteCompleteItem(route_id=route_id, **payload.model_dump())
+        return RouteCompletionStatus(**completion_queue.enqueue(item))
+
+    @staticmethod
+    def get_completion_status(token: str) -> RouteCompletionStatus:
+        return completion_status(completion_queue.status(token), token)
+
     def delete_route(self, route_id: int) -> Dict[str, str]:
         if not self.repository.delete(route_id):
             raise HTTPException(
@@ -1,9 +1,93 @@
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import Callable, List, Dict, NoReturn, Optional, Set, Tuple
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 
+from app.configuration.configuration import settings
 from app.repository.VehicleRepository import VehicleRepository
-from app.schema.Vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
+from app.schema.Vehicle import VehicleBatchResponse, VehicleCreate, VehicleUpdate, VehicleResponse
+from app.schema.VehicleBulkImport import VehicleBulkImportError, VehicleBulkImportResponse
+from app.core.ingest import Row
+from app.core.pagination import decode_cursor
+from app.core.counting import CountMode, TotalCount
+from app.core.serialization import validate_list
+
+
+ImportCandidates = Dict[str, Tuple[int, VehicleCreate]]
+
+
+def raise_duplicate_plate(plate_number: Optional[str]) -> NoReturn:
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Ya existe un vehículo con la placa {plate_number}"
+    )
+
+
+def validate_import_rows(
+    rows: List[Row],
+    validate_plate: Callable[[str], bool],
+) -> Tuple[ImportCandidates, VehicleBulkImportResponse]:
+    report = VehicleBulkImportResponse(total_rows=len(rows))
+    candidates: ImportCandidates = {}
+
+    for row_number, record, error in rows:
+        plate_number = record.get("plate_number") if record else None
+        if error:
+            report.errors.append(VehicleBulkImportError(row=row_number, errors=[error]))
+            continue
+
+        try:
+            vehicle = VehicleCreate.model_validate(record)
+        except ValidationError as exc:
+            report.errors.append(VehicleBulkImportError(
+                row=row_number,
+                plate_number=plate_number if isinstance(plate_number, str) else None,
+                errors=[
+                    f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+                    for item in exc.errors()
+                ]
+            ))
+            continue
+
+        if not validate_plate(vehicle.plate_number):
+            report.errors.append(VehicleBulkImportError(
+                row=row_number,
+                plate_number=vehicle.plate_number,
+                errors=["Formato de placa inválido"]
+            ))
+            continue
+
+        if vehicle.plate_number in candidates:
+            report.errors.append(VehicleBulkImportError(
+                row=row_number,
+                plate_number=vehicle.plate_number,
+                errors=[f"Placa duplicada en la fila {candidates[vehicle.plate_number][0]}"]
+            ))
+            continue
+
+        candidates[vehicle.plate_number] = (row_number, vehicle)
+
+    return candidates, report
+
+
+def build_import_report(
+    candidates: ImportCandidates,
+    inserted: Set[str],
+    report: VehicleBulkImportResponse,
+) -> VehicleBulkImportResponse:
+    for plate_number, (row_number, _) in candidates.items():
+        if plate_number not in inserted:
+            report.errors.append(VehicleBulkImportError(
+                row=row_number,
+                plate_number=plate_number,
+                errors=[f"Ya existe un vehículo con la placa {plate_number}"]
+            ))
+
+    report.errors.sort(key=lambda error: error.row)
+    report.inserted = len(inserted)
+    report.failed = len(report.errors)
+    return report
 
 
 class VehicleService:
@@ -12,7 +96,7 @@ class VehicleService:
         self.repository = VehicleRepository(db)
 
     def get_vehicle_by_id(self, vehicle_id: int) -> VehicleResponse:
-        vehicle = self.repository.get_by_id(vehicle_id)
+        vehicle = self.repository.find_by_id(vehicle_id)
         if not vehicle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -20,53 +104,100 @@ class VehicleService:
             )
         return VehicleResponse.model_validate(vehicle)
 
+    def get_vehicles_by_ids(self, vehicle_ids: List[int]) -> VehicleBatchResponse:
+        vehicle_ids = list(dict.fromkeys(vehicle_ids))
+        vehicles = self.repository.find_by_ids(vehicle_ids)
+        found = {vehicle.id for vehicle in vehicles}
+        return VehicleBatchResponse(
+            items=validate_list(VehicleResponse, vehicles),
+            missing=[vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in found]
+        )
+
     def get_all_vehicles(
             self,
             skip: int = 0,
             limit: int = 100,
-            active_only: bool = False
+            active_only: bool = False,
+            cursor: Optional[str] = None
     ) -> List[VehicleResponse]:
-        vehicles = self.repository.get_all(skip=skip, limit=limit, active_only=active_only)
-        return [VehicleResponse.model_validate(vehicle) for vehicle in vehicles]
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        vehicles = self.repository.get_all(
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            after_id=after_id
+        )
+        return validate_list(VehicleResponse, vehicles)
+
+    def get_vehicle_versions(
+            self,
+            skip: int = 0,
+            limit: int = 100,
+            active_only: bool = False,
+            cursor: Optional[str] = None
+    ) -> List[tuple]:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+        return self.repository.get_versions(
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            after_id=after_id
+        )
+
+    def count_vehicles(self, mode: CountMode, active_only: bool = False) -> TotalCount:
+        return self.repository.count(mode, active_only=active_only)
+
+    def search_vehicles(
+            self,
+            query: str,
+            skip: int = 0,
+            limit: int = 20,
+            active_only: bool = False
+    ) -> Tuple[List[VehicleResponse], bool]:
+        vehicles, truncated = self.repository.search(
+            query,
+            skip=skip,
+            limit=limit,
+            active_only=active_only,
+            max_candidates=settings.search_max_candidates
+        )
+        return validate_list(VehicleResponse, vehicles), truncated
 
     def create_vehicle(self, vehicle_data: VehicleCreate) -> VehicleResponse:
-        if self.repository.exists_by_plate_number(vehicle_data.plate_number):
+        if not self._validate_plate_format(vehicle_data.plate_number):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Ya existe un vehículo con la placa {vehicle_data.plate_number}"
+                detail="Formato de placa inválido"
             )
 
-        if not self._validate_plate_format(vehicle_data.plate_number):
+        try:
+            vehicle = self.repository.create(vehicle_data)
+        except IntegrityError:
+            raise_duplicate_plate(vehicle_data.plate_number)
+        return VehicleResponse.model_validate(vehicle)
+
+    def import_vehicles(self, rows: List[Row]) -> VehicleBulkImportResponse:
+        candidates, report = validate_import_rows(rows, self._validate_plate_format)
+        inserted = self.repository.bulk_create([vehicle for _, vehicle in candidates.values()])
+        return build_import_report(candidates, inserted, report)
+
+    def update_vehicle(self, vehicle_id: int, vehicle_data: VehicleUpdate) -> VehicleResponse:
+        if vehicle_data.plate_number and not self._validate_plate_format(vehicle_data.plate_number):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Formato de placa inválido"
             )
 
-        vehicle = self.repository.create(vehicle_data)
-        return VehicleResponse.model_validate(vehicle)
+        try:
+            vehicle = self.repository.update(vehicle_id, vehicle_data)
+        except IntegrityError:
+            raise_duplicate_plate(vehicle_data.plate_number)
 
-    def update_vehicle(self, vehicle_id: int, vehicle_data: VehicleUpdate) -> VehicleResponse:
-        if not self.repository.get_by_id(vehicle_id):
+        if not vehicle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Vehículo con ID {vehicle_id} no encontrado"
             )
-
-        if vehicle_data.plate_number:
-            existing_vehicle = self.repository.get_by_plate_number(vehicle_data.plate_number)
-            if existing_vehicle and existing_vehicle.id != vehicle_id:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Ya existe un vehículo con la placa {vehicle_data.plate_number}"
-                )
-
-            if not self._validate_plate_format(vehicle_data.plate_number):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Formato de placa inválido"
-                )
-
-        vehicle = self.repository.update(vehicle_id, vehicle_data)
         return VehicleResponse.model_validate(vehicle)
 
     def delete_vehicle(self, vehicle_id: int, soft: bool = True) -> Dict[str, str]:
@@ -0,0 +1,66 @@
+"""Compare two bench.load reports endpoint by endpoint.
+
+    python -m bench.compare baseline.json candidate.json [--threshold 10]
+
+Prints p50/p95/p99, RPS and queries per request for both runs with the
+relative change, and exits with status 1 when any endpoint's p95 grew or its
+RPS dropped by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+
+COLUMNS = ("p50_ms", "p95_ms", "p99_ms", "rps", "queries_per_request")
+
+
+def change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def format_cell(before: Optional[float], after: Optional[float]) -> str:
+    delta = change(before, after)
+    suffix = f" ({delta:+.1f}%)" if delta is not None else ""
+    return f"{before if before is not None else '-'} -> {after if after is not None else '-'}{suffix}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.compare", description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regresión tolerada en porcentaje")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    with open(args.candidate, encoding="utf-8") as handle:
+        candidate = json.load(handle)
+
+    print(f"baseline {baseline['meta'].get('commit')}  candidate {candidate['meta'].get('commit')}")
+    regressions = []
+    rows = [("TOTAL", baseline["total"], candidate["total"])] + [
+        (name, baseline["endpoints"].get(name, {}), stats)
+        for name, stats in candidate["endpoints"].items()
+    ]
+
+    for name, before, after in rows:
+        print(name)
+        for column in COLUMNS:
+            print(f"  {column:<20} {format_cell(before.get(column), after.get(column))}")
+
+        p95 = change(before.get("p95_ms"), after.get("p95_ms"))
+        rps = change(before.get("rps"), after.get("rps"))
+        if (p95 is not None and p95 > args.threshold) or (rps is not None and rps < -args.threshold):
+            regressions.append(name)
+
+    if regressions:
+        print(f"\nRegresiones por encima de {args.threshold}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
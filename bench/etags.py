@@ -0,0 +1,100 @@
+"""Regression check for list ETags under edits in the same second.
+
+    python -m app.cli migrate
+    python -m bench.etags --rounds 20
+
+Runs the app in-process against the DATABASE_URL in the environment. Each
+round edits a bench vehicle twice back to back, so both writes usually land
+in the same second (updated_at on SQLite has one-second resolution):
+- PUT brand=A, GET the list and keep its ETag;
+- PUT brand=B, GET again with If-None-Match set to the kept ETag.
+
+The second GET must answer 200 with brand B, never a stale 304. It checks
+GET /api/vehicles/ (fast path over the version columns) and
+GET /api/routes/?expand=vehicle (the vehicle's version is embedded in the
+route ETag). Exits with status 1 on any violation. The vehicle and route it
+creates are deleted at the end.
+"""
+import argparse
+import json
+import sys
+import uuid
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+from app.core.dabatase import engine
+from app.core.pagination import encode_cursor
+from app.main import app
+
+
+def vehicle_list(vehicle_id: int) -> str:
+    return f"/api/vehicles/?limit=1&cursor={encode_cursor(vehicle_id - 1)}"
+
+
+def route_list(vehicle_id: int) -> str:
+    return f"/api/routes/?vehicle_id={vehicle_id}&expand=vehicle"
+
+
+def listed_brand(path: str, body: list) -> str:
+    item = body[0]
+    return item["vehicle"]["brand"] if path.startswith("/api/routes/") else item["brand"]
+
+
+def run(args: argparse.Namespace) -> dict:
+    report: Dict[str, Dict[str, int]] = {}
+    violations: List[str] = []
+
+    with TestClient(app) as client:
+        plate = f"ET-{uuid.uuid4().hex[:7].upper()}"
+        vehicle_id = client.post(
+            "/api/vehicles/", json={"plate_number": plate, "brand": "Bench", "model": "ETag", "year": 2024}
+        ).json()["id"]
+        route_id = client.post(
+            "/api/routes/", json={"vehicle_id": vehicle_id, "origin": "Puebla", "destination": "Toluca"}
+        ).json()["id"]
+
+        lists: Dict[str, Callable[[int], str]] = {"vehicles": vehicle_list, "routes_expand_vehicle": route_list}
+        try:
+            for name, build in lists.items():
+                path = build(vehicle_id)
+                stats = {"rounds": args.rounds, "same_second": 0, "stale_304": 0}
+                for round_number in range(args.rounds):
+                    first = client.put(f"/api/vehicles/{vehicle_id}", json={"brand": f"A{round_number}"}).json()
+                    etag = client.get(path).headers["etag"]
+                    second = client.put(f"/api/vehicles/{vehicle_id}", json={"brand": f"B{round_number}"}).json()
+                    if first["updated_at"][:19] == second["updated_at"][:19]:
+                        stats["same_second"] += 1
+
+                    response = client.get(path, headers={"If-None-Match": etag})
+                    if response.status_code == 304:
+                        stats["stale_304"] += 1
+                        violations.append(f"{name}: ronda {round_number} devolvió 304 tras editar el vehículo")
+                    elif listed_brand(path, response.json()) != f"B{round_number}":
+                        violations.append(f"{name}: ronda {round_number} no refleja la segunda edición")
+                report[name] = stats
+        finally:
+            if not args.keep:
+                client.delete(f"/api/routes/{route_id}")
+                client.delete(f"/api/vehicles/{vehicle_id}")
+
+    return {
+        "database": engine.url.get_backend_name(),
+        "lists": report,
+        "violations": violations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.etags", description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20, help="Pares de ediciones por lista")
+    parser.add_argument("--keep", action="store_true", help="No elimina el vehículo ni la ruta creados")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 1 if result["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
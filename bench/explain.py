@@ -0,0 +1,243 @@
+"""EXPLAIN regression check for the repository queries served by the API.
+
+    python -m bench.seed --reset
+    python -m bench.explain [--analyze] [--force-index]
+
+Runs every read query shape of the repositories against the seeded database,
+captures the SQL they emit and asks the planner how it would execute it. On
+PostgreSQL any "Seq Scan" node is a failure; on SQLite a "SCAN <table>" that is
+not driven by an index fails when the statement filters rows, and a temporary
+B-tree for ORDER BY fails because it means sorting the whole filtered set.
+Exits with status 1 when any query regresses.
+
+The async repositories build the same statements, so checking the sync ones
+covers both. Left out on purpose: stream_all (the CSV export reads the whole
+table by design), the fleet-wide series without a date range (aggregates the
+whole rollup) and unfiltered exact counts (COUNT(*) over the whole table).
+
+On small datasets PostgreSQL prefers sequential scans even when an index
+exists; --force-index disables them for the session so the check only fails
+when no usable index exists at all. --analyze refreshes the PostgreSQL
+statistics first. It is ignored on SQLite: with sqlite_stat1 populated the
+planner rightly reads vehicles in primary key order when almost every row is
+active, so run the check on a freshly seeded file that was never analyzed.
+"""
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, List, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.dabatase import SessionLocal, engine
+from app.enum.RouteStatus import RouteStatus
+from app.model.Performance import Performance
+from app.model.Route import Route
+from app.model.Vehicle import Vehicle
+from app.model.VehicleDailyEfficiency import VehicleDailyEfficiency
+from app.repository.EfficiencyRepository import EfficiencyRepository
+from app.repository.PerformanceRepository import PerformanceRepository
+from app.repository.RouteRepository import RouteRepository
+from app.repository.VehicleRepository import VehicleRepository
+
+
+WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[Session], object]
+
+
+@dataclass
+class Result:
+    name: str
+    statement: str
+    plan: List[str]
+    failures: List[str] = field(default_factory=list)
+
+
+def sample_values(db: Session) -> dict:
+    vehicle_id = db.scalar(select(Route.vehicle_id).order_by(Route.id).limit(1))
+    route_id = db.scalar(select(Performance.route_id).order_by(Performance.route_id).limit(1))
+    middle_id = db.scalar(select(func.max(Route.id))) // 2
+    middle_vehicle = db.scalar(select(func.max(Vehicle.id))) // 2
+    cursor = db.execute(
+        select(Performance.created_at, Performance.route_id)
+        .order_by(Performance.created_at.desc(), Performance.route_id.desc())
+        .offset(db.scalar(select(func.count()).select_from(Performance)) // 2)
+        .limit(1)
+    ).one()
+    last_day = db.scalar(select(func.max(VehicleDailyEfficiency.day)))
+    if None in (vehicle_id, route_id, last_day):
+        raise SystemExit("La base está vacía; ejecuta primero python -m bench.seed")
+
+    return {
+        "vehicle_id": vehicle_id,
+        "plate_number": db.scalar(select(Vehicle.plate_number).where(Vehicle.id == vehicle_id)),
+        "route_id": route_id,
+        "after_route": middle_id,
+        "after_vehicle": middle_vehicle,
+        "after_performance": tuple(cursor),
+        "start": last_day - timedelta(days=30),
+        "end": last_day,
+    }
+
+
+def build_cases(values: dict) -> List[Case]:
+    vehicles = lambda db: VehicleRepository(db)
+    routes = lambda db: RouteRepository(db)
+    performances = lambda db: PerformanceRepository(db)
+    efficiency = lambda db: EfficiencyRepository(db)
+
+    cases = [
+        Case("vehicles.get_by_id", lambda db: vehicles(db).get_by_id(values["vehicle_id"])),
+        Case("vehicles.get_by_plate_number", lambda db: vehicles(db).get_by_plate_number(values["plate_number"])),
+        Case("vehicles.get_all", lambda db: vehicles(db).get_all()),
+        Case("vehicles.get_all after_id", lambda db: vehicles(db).get_all(after_id=values["after_vehicle"])),
+        Case("vehicles.get_all active_only", lambda db: vehicles(db).get_all(active_only=True)),
+        Case("vehicles.count active_only", lambda db: vehicles(db).count("exact", active_only=True)),
+        Case(
+            "vehicles.get_versions active_only after_id",
+            lambda db: vehicles(db).get_versions(active_only=True, after_id=values["after_vehicle"])
+        ),
+        Case("routes.get_by_id", lambda db: routes(db).get_by_id(values["route_id"])),
+        Case("routes.get_existing_ids", lambda db: routes(db).get_existing_ids([values["route_id"]])),
+        Case("routes.get_all", lambda db: routes(db).get_all()),
+        Case("routes.get_all after_id", lambda db: routes(db).get_all(after_id=values["after_route"])),
+        Case("performances.get_by_route_id", lambda db: performances(db).get_by_route_id(values["route_id"])),
+        Case("performances.get_all", lambda db: performances(db).get_all()),
+        Case(
+            "performances.get_all after",
+            lambda db: performances(db).get_all(after=values["after_performance"])
+        ),
+        Case(
+            "performances.get_versions after",
+            lambda db: performances(db).get_versions(after=values["after_performance"])
+        ),
+        Case("efficiency.get_series vehicle", lambda db: efficiency(db).get_series(vehicle_id=values["vehicle_id"])),
+        Case(
+            "efficiency.get_series fleet range",
+            lambda db: efficiency(db).get_series(start=values["start"], end=values["end"])
+        ),
+    ]
+
+    for status in RouteStatus:
+        cases += [
+            Case(f"routes.get_all status={status.value}", lambda db, s=status: routes(db).get_all(status=s)),
+            Case(
+                f"routes.get_all status={status.value} after_id",
+                lambda db, s=status: routes(db).get_all(status=s, after_id=values["after_route"])
+            ),
+            Case(
+                f"routes.get_all vehicle_id status={status.value}",
+                lambda db, s=status: routes(db).get_all(status=s, vehicle_id=values["vehicle_id"])
+            ),
+            Case(f"routes.count status={status.value}", lambda db, s=status: routes(db).count("exact", status=s)),
+        ]
+    cases += [
+        Case("routes.get_all vehicle_id", lambda db: routes(db).get_all(vehicle_id=values["vehicle_id"])),
+        Case("routes.count vehicle_id", lambda db: routes(db).count("exact", vehicle_id=values["vehicle_id"])),
+        Case(
+            "routes.get_versions vehicle_id after_id",
+            lambda db: routes(db).get_versions(vehicle_id=values["vehicle_id"], after_id=values["after_route"])
+        ),
+    ]
+    return cases
+
+
+def capture(db: Session, case: Case) -> List[Tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        case.run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def walk_postgres(node: dict, depth: int = 0):
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from walk_postgres(child, depth + 1)
+
+
+def explain_postgres(db: Session, name: str, statement: str, parameters) -> Result:
+    raw = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    result = Result(name, statement, [])
+    for depth, node in walk_postgres(plan[0]["Plan"]):
+        relation = node.get("Relation Name", "")
+        index = node.get("Index Name", "")
+        result.plan.append(f"{'  ' * depth}{node['Node Type']} {relation} {index}".rstrip())
+        if node["Node Type"] == "Seq Scan":
+            result.failures.append(f"Seq Scan sobre {relation}")
+    return result
+
+
+def explain_sqlite(db: Session, name: str, statement: str, parameters) -> Result:
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    filtered = WHERE.search(statement) is not None
+    result = Result(name, statement, [row[-1] for row in rows])
+    for detail in result.plan:
+        if detail.startswith("SCAN ") and " USING " not in detail and filtered:
+            result.failures.append(detail)
+        if "TEMP B-TREE FOR ORDER BY" in detail:
+            result.failures.append(detail)
+    return result
+
+
+def run(args: argparse.Namespace) -> List[Result]:
+    dialect = engine.dialect.name
+    explain = explain_postgres if dialect == "postgresql" else explain_sqlite
+    results = []
+
+    with SessionLocal() as db:
+        if dialect == "postgresql":
+            if args.analyze:
+                db.execute(text("ANALYZE"))
+                db.commit()
+            if args.force_index:
+                db.execute(text("SET enable_seqscan = off"))
+
+        values = sample_values(db)
+        for case in build_cases(values):
+            for statement, parameters in capture(db, case):
+                results.append(explain(db, case.name, statement, parameters))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.explain", description=__doc__.splitlines()[0])
+    parser.add_argument("--analyze", action="store_true", help="Ejecuta ANALYZE antes de pedir los planes (solo PostgreSQL)")
+    parser.add_argument("--force-index", action="store_true", help="Desactiva seq scans en PostgreSQL (datasets chicos)")
+    parser.add_argument("--verbose", action="store_true", help="Imprime el plan de cada consulta")
+    args = parser.parse_args()
+
+    failed = 0
+    for result in run(args):
+        status = "FAIL" if result.failures else "ok"
+        print(f"[{status}] {result.name}")
+        if result.failures or args.verbose:
+            for line in result.plan:
+                print(f"    {line}")
+        failed += bool(result.failures)
+
+    if failed:
+        print(f"\n{failed} consultas sin índice utilizable")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
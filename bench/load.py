@@ -0,0 +1,382 @@
+"""Fixed-concurrency load driver for the vehicles, routes and performances routers.
+
+    python -m bench.load --base-url http://localhost:8000 --concurrency 16 --duration 30 --output run.json
+
+Every endpoint of VehicleController, RouteController and PerformanceController
+is exercised through weighted scenarios. Write scenarios clean up after
+themselves (create -> ... -> delete) so repeated runs see a stable dataset.
+Workers draw from random.Random(seed + worker), so the request mix is the same
+on every run. The report is JSON: p50/p95/p99 latency, RPS, error count and
+the mean X-Query-Count per endpoint, plus the commit it was measured on.
+Seed first with ``python -m bench.seed --reset`` for results comparable across
+commits.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+
+Scenario = Callable[["LoadContext", httpx.AsyncClient, random.Random], Awaitable[None]]
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_codes: Dict[str, int] = defaultdict(int)
+        self.queries: List[int] = []
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            "count": len(ordered),
+            "errors": self.errors,
+            "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            "status_codes": dict(sorted(self.status_codes.items())),
+        }
+
+
+class LoadContext:
+
+    def __init__(self, vehicle_ids: List[int], route_ids: List[int], run_tag: str, count_mode: str = "none"):
+        self.vehicle_ids = vehicle_ids
+        self.route_ids = route_ids
+        self.run_tag = run_tag
+        self.count_mode = count_mode
+        self.recording = False
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._sequence = 0
+
+    def next_plate(self) -> str:
+        self._sequence += 1
+        return f"{self.run_tag}{self._sequence:06X}"
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        name: str,
+        url: str,
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+
+        if self.recording:
+            stats = self.stats[name]
+            stats.latencies.append(elapsed)
+            stats.status_codes[str(response.status_code) if response is not None else "error"] += 1
+            if response is None or response.status_code >= 400:
+                stats.errors += 1
+            elif "x-query-count" in response.headers:
+                stats.queries.append(int(response.headers["x-query-count"]))
+        return response
+
+
+def json_or_none(response: Optional[httpx.Response]):
+    if response is None or response.status_code >= 400:
+        return None
+    return response.json()
+
+
+async def list_vehicles(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    first = await ctx.call(
+        client, "GET", "GET /api/vehicles/", "/api/vehicles/",
+        params={"limit": 100, "active_only": rng.random() < 0.5, "count": ctx.count_mode}
+    )
+    cursor = first.headers.get("x-next-cursor") if first is not None else None
+    if cursor:
+        await ctx.call(
+            client, "GET", "GET /api/vehicles/ (cursor)", "/api/vehicles/",
+            params={"limit": 100, "cursor": cursor}
+        )
+
+
+# Marcas/modelos de bench.seed y fragmentos de placa SD-NNNNNN
+SEARCH_TERMS = ("nissan", "toyota", "isuzu", "hilux", "transit", "ranger", "ELF", "van", "SD-00", "SD-0001")
+
+
+async def search_vehicles(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    query = rng.choice(SEARCH_TERMS + (f"{rng.randint(0, 999):03d}",))
+    await ctx.call(
+        client, "GET", "GET /api/vehicles/search", "/api/vehicles/search",
+        params={"q": query, "limit": 20, "active_only": rng.random() < 0.5}
+    )
+
+
+async def get_vehicle(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    await ctx.call(
+        client, "GET", "GET /api/vehicles/{vehicle_id}", f"/api/vehicles/{rng.choice(ctx.vehicle_ids)}"
+    )
+
+
+async def vehicle_lifecycle(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    created = json_or_none(await ctx.call(
+        client, "POST", "POST /api/vehicles/", "/api/vehicles/",
+        json={"plate_number": ctx.next_plate(), "brand": "Bench", "model": "Load", "year": rng.randint(2010, 2025)}
+    ))
+    if created is None:
+        return
+    vehicle_id = created["id"]
+    await ctx.call(
+        client, "PUT", "PUT /api/vehicles/{vehicle_id}", f"/api/vehicles/{vehicle_id}",
+        json={"model": "Load 2"}
+    )
+    await ctx.call(client, "PATCH", "PATCH /api/vehicles/{vehicle_id}/deactivate", f"/api/vehicles/{vehicle_id}/deactivate")
+    await ctx.call(client, "PATCH", "PATCH /api/vehicles/{vehicle_id}/activate", f"/api/vehicles/{vehicle_id}/activate")
+    await ctx.call(
+        client, "DELETE", "DELETE /api/vehicles/{vehicle_id}", f"/api/vehicles/{vehicle_id}",
+        params={"soft": False}
+    )
+
+
+async def bulk_import(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    plates = [ctx.next_plate() for _ in range(50)]
+    body = "".join(
+        json.dumps({"plate_number": plate, "brand": "Bench", "model": "Bulk", "year": 2020}) + "\n"
+        for plate in plates
+    )
+    await ctx.call(
+        client, "POST", "POST /api/vehicles/bulk", "/api/vehicles/bulk",
+        content=body.encode("utf-8"), headers={"Content-Type": "application/x-ndjson"}
+    )
+
+
+async def list_routes(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    params = {"limit": 100, "status": rng.choice(["assigned", "in_progress", "completed"]), "count": ctx.count_mode}
+    if rng.random() < 0.3:
+        params["vehicle_id"] = rng.choice(ctx.vehicle_ids)
+    await ctx.call(client, "GET", "GET /api/routes/", "/api/routes/", params=params)
+
+
+async def get_route(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    await ctx.call(client, "GET", "GET /api/routes/{route_id}", f"/api/routes/{rng.choice(ctx.route_ids)}")
+
+
+def completion(rng: random.Random) -> dict:
+    distance = round(rng.uniform(10, 600), 2)
+    return {
+        "distance_km": distance,
+        "fuel_consumed": round(distance / rng.uniform(6, 10), 2),
+        "duration_minutes": rng.randint(15, 600),
+    }
+
+
+async def create_route(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> Optional[int]:
+    created = json_or_none(await ctx.call(
+        client, "POST", "POST /api/routes/", "/api/routes/",
+        json={"vehicle_id": rng.choice(ctx.vehicle_ids), "origin": "Bench A", "destination": "Bench B"}
+    ))
+    return created["id"] if created else None
+
+
+async def route_lifecycle(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    route_id = await create_route(ctx, client, rng)
+    if route_id is None:
+        return
+    await ctx.call(
+        client, "PUT", "PUT /api/routes/{route_id}", f"/api/routes/{route_id}",
+        json={"status": "in_progress"}
+    )
+    await ctx.call(
+        client, "PATCH", "PATCH /api/routes/{route_id}/complete", f"/api/routes/{route_id}/complete",
+        json=completion(rng)
+    )
+    await ctx.call(client, "DELETE", "DELETE /api/routes/{route_id}", f"/api/routes/{route_id}")
+
+
+async def batch_complete(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    route_ids = [route_id for route_id in [await create_route(ctx, client, rng) for _ in range(10)] if route_id]
+    if not route_ids:
+        return
+    await ctx.call(
+        client, "PATCH", "PATCH /api/routes/complete", "/api/routes/complete",
+        json=[{"route_id": route_id, **completion(rng)} for route_id in route_ids]
+    )
+    for route_id in route_ids:
+        await ctx.call(client, "DELETE", "DELETE /api/routes/{route_id}", f"/api/routes/{route_id}")
+
+
+async def list_performances(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    first = await ctx.call(
+        client, "GET", "GET /api/performances/", "/api/performances/",
+        params={"limit": 100, "count": ctx.count_mode}
+    )
+    cursor = first.headers.get("x-next-cursor") if first is not None else None
+    if cursor:
+        await ctx.call(
+            client, "GET", "GET /api/performances/ (cursor)", "/api/performances/",
+            params={"limit": 100, "cursor": cursor}
+        )
+
+
+async def export_performances(ctx: LoadContext, client: httpx.AsyncClient, rng: random.Random) -> None:
+    await ctx.call(
+        client, "GET", "GET /api/performances/export", "/api/performances/export",
+        params={"format": rng.choice(["ndjson", "csv"])}
+    )
+
+
+SCENARIOS: Dict[str, Tuple[int, Scenario]] = {
+    "list_vehicles": (15, list_vehicles),
+    "get_vehicle": (20, get_vehicle),
+    "search_vehicles": (5, search_vehicles),
+    "vehicle_lifecycle": (4, vehicle_lifecycle),
+    "bulk_import": (1, bulk_import),
+    "list_routes": (15, list_routes),
+    "get_route": (20, get_route),
+    "route_lifecycle": (6, route_lifecycle),
+    "batch_complete": (1, batch_complete),
+    "list_performances": (10, list_performances),
+    "export_performances": (1, export_performances),
+}
+
+
+async def collect_ids(client: httpx.AsyncClient, path: str, sample: int) -> List[int]:
+    ids: List[int] = []
+    params = {"limit": 500}
+    while len(ids) < sample:
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": 500, "cursor": cursor}
+    return ids[:sample]
+
+
+async def worker(
+    ctx: LoadContext,
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    scenarios: List[Scenario],
+    weights: List[int],
+    deadline: float,
+) -> None:
+    while time.perf_counter() < deadline:
+        await rng.choices(scenarios, weights)[0](ctx, client, rng)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    scenarios = [SCENARIOS[name][1] for name in names]
+    weights = [SCENARIOS[name][0] for name in names]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        health = (await client.get("/health")).json()
+        vehicle_ids = await collect_ids(client, "/api/vehicles/", args.sample)
+        route_ids = await collect_ids(client, "/api/routes/", args.sample)
+        if not vehicle_ids or not route_ids:
+            raise SystemExit("No hay datos: ejecuta primero python -m bench.seed")
+
+        ctx = LoadContext(vehicle_ids, route_ids, run_tag=f"L{int(time.time()) % 4096:03X}", count_mode=args.count)
+
+        async def phase(seconds: float, offset: int) -> float:
+            started = time.perf_counter()
+            deadline = started + seconds
+            await asyncio.gather(*(
+                worker(ctx, client, random.Random(args.seed + offset + index), scenarios, weights, deadline)
+                for index in range(args.concurrency)
+            ))
+            return time.perf_counter() - started
+
+        if args.warmup:
+            await phase(args.warmup, offset=10_000)
+        ctx.recording = True
+        elapsed = await phase(args.duration, offset=0)
+
+    endpoints = {name: stats.summary(elapsed) for name, stats in sorted(ctx.stats.items())}
+    total = EndpointStats()
+    for stats in ctx.stats.values():
+        total.latencies.extend(stats.latencies)
+        total.errors += stats.errors
+        total.queries.extend(stats.queries)
+        for code, count in stats.status_codes.items():
+            total.status_codes[code] += count
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(UTC).isoformat(),
+            "base_url": args.base_url,
+            "database_mode": health.get("database", {}).get("mode"),
+            "concurrency": args.concurrency,
+            "duration_seconds": round(elapsed, 3),
+            "warmup_seconds": args.warmup,
+            "seed": args.seed,
+            "scenarios": names,
+            "count": args.count,
+        },
+        "total": total.summary(elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Segundos de calentamiento no medidos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sample", type=int, default=2000, help="IDs de vehículos/rutas a muestrear")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--count", choices=["none", "exact", "estimated"], default="none",
+        help="Modo de X-Total-Count en la primera página de cada listado"
+    )
+    parser.add_argument("--scenarios", help=f"Subconjunto separado por comas de: {', '.join(SCENARIOS)}")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
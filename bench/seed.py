@@ -0,0 +1,206 @@
+"""Synthetic fleet generator for benchmarks.
+
+    python -m bench.seed --vehicles 1000 --routes 50000 --reset
+
+Seeds vehicles, routes with a realistic status mix and the performances of
+the completed ones through multi-row INSERTs, then rebuilds the daily
+efficiency rollup. Targets whatever DATABASE_URL points at (local Postgres or
+a SQLite file). The same --seed and --base-time always produce the same data.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Dict, Iterator, List, Sequence
+
+from sqlalchemy import insert
+
+from app.core.dabatase import Base, SessionLocal, engine
+from app.core.schema import migrate
+from app.enum.RouteStatus import RouteStatus
+from app.model.Performance import Performance
+from app.model.Route import Route
+from app.model.Vehicle import Vehicle
+from app.repository.EfficiencyRepository import EfficiencyRepository
+
+
+CITIES = (
+    "Ciudad de México", "Guadalajara", "Monterrey", "Puebla", "Querétaro", "León", "Toluca",
+    "Tijuana", "Mérida", "San Luis Potosí", "Aguascalientes", "Saltillo", "Veracruz", "Morelia",
+    "Chihuahua", "Hermosillo", "Culiacán", "Oaxaca", "Cancún", "Torreón",
+)
+MODELS = {
+    "Nissan": ("NP300", "Urvan", "Versa"),
+    "Toyota": ("Hilux", "Hiace", "Tacoma"),
+    "Ford": ("Ranger", "Transit", "F-150"),
+    "Chevrolet": ("S10", "Express", "Silverado"),
+    "Volkswagen": ("Amarok", "Crafter", "Saveiro"),
+    "Isuzu": ("ELF 300", "ELF 600", "D-Max"),
+}
+# Kilómetros por litro y velocidad media (km/h) aproximados por marca
+PROFILES = {
+    "Nissan": (9.5, 62.0),
+    "Toyota": (9.0, 64.0),
+    "Ford": (7.5, 60.0),
+    "Chevrolet": (7.8, 61.0),
+    "Volkswagen": (8.8, 63.0),
+    "Isuzu": (6.2, 55.0),
+}
+
+
+def chunked(rows: Sequence[dict], size: int) -> Iterator[Sequence[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def build_vehicles(rng: random.Random, count: int, base_time: datetime) -> List[dict]:
+    brands = sorted(MODELS)
+    vehicles = []
+    for index in range(1, count + 1):
+        brand = rng.choice(brands)
+        vehicles.append({
+            "user_id": rng.randint(1, max(count // 10, 1)),
+            "plate_number": f"SD-{index:06d}",
+            "brand": brand,
+            "model": rng.choice(MODELS[brand]),
+            "year": rng.randint(2008, 2025),
+            "is_active": rng.random() >= 0.05,
+            "created_at": base_time - timedelta(days=rng.randint(120, 900)),
+        })
+    return vehicles
+
+
+def pick_status(rng: random.Random, completed: float, in_progress: float) -> RouteStatus:
+    draw = rng.random()
+    if draw < completed:
+        return RouteStatus.COMPLETED
+    if draw < completed + in_progress:
+        return RouteStatus.IN_PROGRESS
+    return RouteStatus.ASSIGNED
+
+
+def build_routes(
+    rng: random.Random,
+    count: int,
+    vehicles: Dict[int, str],
+    base_time: datetime,
+    days: int,
+    completed: float,
+    in_progress: float,
+) -> List[dict]:
+    vehicle_ids = sorted(vehicles)
+    routes = []
+    for _ in range(count):
+        vehicle_id = rng.choice(vehicle_ids)
+        origin, destination = rng.sample(CITIES, 2)
+        status = pick_status(rng, completed, in_progress)
+        assigned_at = base_time - timedelta(days=rng.uniform(0, days))
+        route = {
+            "vehicle_id": vehicle_id,
+            "origin": origin,
+            "destination": destination,
+            "status": status,
+            "assigned_at": assigned_at,
+            "created_at": assigned_at,
+            "started_at": None,
+            "completed_at": None,
+        }
+
+        if status != RouteStatus.ASSIGNED:
+            route["started_at"] = assigned_at + timedelta(minutes=rng.randint(5, 240))
+        if status == RouteStatus.COMPLETED:
+            kml, speed = PROFILES[vehicles[vehicle_id]]
+            distance = round(rng.lognormvariate(4.5, 0.8), 2)
+            duration = max(int(distance / rng.gauss(speed, 8.0) * 60), 1)
+            route["completed_at"] = route["started_at"] + timedelta(minutes=duration)
+            route["performance"] = {
+                "distance_km": distance,
+                "fuel_consumed": round(distance / max(rng.gauss(kml, 0.8), 2.0), 2),
+                "duration": duration,
+                "notes": None,
+            }
+        routes.append(route)
+    return routes
+
+
+def prepare_schema(reset: bool) -> None:
+    with engine.begin() as connection:
+        if reset:
+            Base.metadata.drop_all(bind=connection)
+        migrate(connection)
+
+
+def seed(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    prepare_schema(args.reset)
+
+    with SessionLocal() as db:
+        vehicle_rows = build_vehicles(rng, args.vehicles, args.base_time)
+        vehicles: Dict[int, str] = {}
+        for chunk in chunked(vehicle_rows, args.chunk_size):
+            ids = db.execute(
+                insert(Vehicle).returning(Vehicle.id, sort_by_parameter_order=True),
+                list(chunk)
+            ).scalars().all()
+            vehicles.update((vehicle_id, row["brand"]) for vehicle_id, row in zip(ids, chunk))
+
+        route_rows = build_routes(
+            rng, args.routes, vehicles, args.base_time, args.days, args.completed, args.in_progress
+        )
+        performances = 0
+        for chunk in chunked(route_rows, args.chunk_size):
+            ids = db.execute(
+                insert(Route).returning(Route.id, sort_by_parameter_order=True),
+                [{key: value for key, value in row.items() if key != "performance"} for row in chunk]
+            ).scalars().all()
+            performance_rows = [
+                {**row["performance"], "route_id": route_id, "created_at": row["completed_at"]}
+                for route_id, row in zip(ids, chunk)
+                if "performance" in row
+            ]
+            if performance_rows:
+                db.execute(insert(Performance), performance_rows)
+                performances += len(performance_rows)
+
+        db.commit()
+        rollup_rows = EfficiencyRepository(db).rebuild()
+
+    return {
+        "database": engine.url.get_backend_name(),
+        "seed": args.seed,
+        "base_time": args.base_time.isoformat(),
+        "vehicles": len(vehicles),
+        "routes": len(route_rows),
+        "performances": performances,
+        "rollup_rows": rollup_rows,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bench.seed", description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=180, help="Ventana de asignación de rutas hacia atrás desde --base-time")
+    parser.add_argument("--completed", type=float, default=0.7, help="Fracción de rutas completadas")
+    parser.add_argument("--in-progress", type=float, default=0.1, help="Fracción de rutas en progreso")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--base-time",
+        type=lambda value: datetime.fromisoformat(value).astimezone(UTC),
+        default=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Filas por INSERT")
+    parser.add_argument("--reset", action="store_true", help="Elimina y recrea todas las tablas antes de sembrar")
+    return parser
+
+
+def main() -> None:
+    print(json.dumps(seed(build_parser().parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
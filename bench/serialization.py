@@ -0,0 +1,86 @@
+"""Per-row cost of serializing a list page, before and after single-pass serialization.
+
+    python -m bench.serialization [--rows 500] [--repeat 200]
+
+"before" reproduces the old path: ``model_validate`` per row in the service,
+then FastAPI validating ``response_model=List[...]`` again and encoding with
+``jsonable_encoder`` + ``json``. "after" is ``validate_list`` + ``list_response``.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import list_response, validate_list
+from app.enum.RouteStatus import RouteStatus
+from app.schema.Route import RouteResponse
+
+
+LOOP = asyncio.new_event_loop()
+RESPONSE_FIELD = create_model_field(name="Response_get_all_routes", type_=List[RouteResponse], mode="serialization")
+
+
+def build_rows(count: int) -> List[SimpleNamespace]:
+    now = datetime.now(UTC)
+    return [
+        SimpleNamespace(
+            id=index,
+            vehicle_id=index % 50 + 1,
+            origin=f"Origen {index}",
+            destination=f"Destino {index}",
+            status=RouteStatus.COMPLETED,
+            assigned_at=now - timedelta(hours=3),
+            started_at=now - timedelta(hours=2),
+            completed_at=now,
+            created_at=now - timedelta(hours=3),
+            updated_at=now,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def before(rows: List[SimpleNamespace]) -> bytes:
+    routes = [RouteResponse.model_validate(row) for row in rows]
+    content = LOOP.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=routes))
+    return JSONResponse(content).body
+
+
+def after(rows: List[SimpleNamespace]) -> bytes:
+    routes = validate_list(RouteResponse, rows)
+    return list_response(RouteResponse, routes).body
+
+
+def measure(name: str, path: Callable[[List[SimpleNamespace]], bytes], rows: List[SimpleNamespace], repeat: int) -> float:
+    path(rows)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        path(rows)
+    elapsed = time.perf_counter() - start
+    per_row = elapsed / (repeat * len(rows)) * 1e6
+    print(f"{name:>7}: {elapsed / repeat * 1e3:8.3f} ms/página  {per_row:6.2f} µs/fila")
+    return per_row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    assert json.loads(before(rows)) == json.loads(after(rows))
+
+    old = measure("before", before, rows, args.repeat)
+    new = measure("after", after, rows, args.repeat)
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
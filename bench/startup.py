@@ -0,0 +1,119 @@
+"""Startup-time benchmark: import time and time to first request.
+
+    python -m app.cli migrate
+    python -m bench.startup --runs 5 [--output startup.json]
+
+Each run measures, in fresh processes against the DATABASE_URL in the
+environment:
+- import_ms: importing app.main in a bare interpreter;
+- ready_ms: from spawning uvicorn until /health answers 200 (includes the
+  lifespan schema check and warmup);
+- first_query_ms / second_query_ms: latency of the first and second
+  GET /api/vehicles/?limit=1 right after the server is ready. The gap between
+  both shows what the warmup left for the first user request.
+
+Reports the median of every column plus the raw runs as JSON.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from bench.load import git_commit
+
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def timed_get(client: httpx.Client, url: str) -> float:
+    started = time.perf_counter()
+    client.get(url).raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_server(timeout: float) -> Dict[str, float]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            while True:
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn terminó con código {process.returncode} durante el arranque")
+                if time.perf_counter() - started > timeout:
+                    raise SystemExit(f"el servidor no respondió en {timeout}s")
+                try:
+                    if client.get(f"{base_url}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            ready = (time.perf_counter() - started) * 1000
+            return {
+                "ready_ms": ready,
+                "first_query_ms": timed_get(client, f"{base_url}/api/vehicles/?limit=1"),
+                "second_query_ms": timed_get(client, f"{base_url}/api/vehicles/?limit=1"),
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def median(runs: List[Dict[str, float]], column: str) -> float:
+    return round(statistics.median(run[column] for run in runs), 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Segundos máximos de espera por arranque")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        run = {"import_ms": measure_import(), **measure_server(args.timeout)}
+        runs.append({key: round(value, 2) for key, value in run.items()})
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "database_mode": os.environ.get("DATABASE_MODE", "sync"),
+            "runs": args.runs,
+        },
+        "median": {column: median(runs, column) for column in runs[0]},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
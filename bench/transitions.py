@@ -0,0 +1,197 @@
+"""Concurrency stress test for route status transitions.
+
+    python -m app.cli migrate
+    python -m bench.transitions --routes 50 --concurrency 16
+
+Creates fresh routes and, for each one, releases --concurrency threads at
+the same time (barrier) against the service layer:
+- start: every thread sends PUT status=in_progress with the version it read
+  (without a version, asking for the status the route already has is an
+  idempotent 200, so the race needs the version to have a single winner);
+- complete: every thread completes the route;
+- versioned: every thread completes the route with the version it read.
+
+Exactly one thread per route must win each race. Losers must get 409, or
+400 "ya fue completada". Completed routes must end with exactly one
+performance and one rollup increment.
+
+The script also counts the SQL statements each call issues. A winning
+start must take one statement, a winning completion three (UPDATE,
+performance INSERT, rollup upsert); the route event NOTIFY sent inside the
+same transaction on PostgreSQL is not counted. Exits with status 1 on any violation.
+The routes it creates are deleted at the end.
+"""
+import argparse
+import json
+import sys
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+
+from app.core.dabatase import SessionLocal, engine
+from app.enum.RouteStatus import RouteStatus
+from app.model.Performance import Performance
+from app.model.Vehicle import Vehicle
+from app.model.VehicleDailyEfficiency import VehicleDailyEfficiency
+from app.schema.Route import RouteCreate, RouteUpdate
+from app.schema.RouteComplete import RouteComplete
+from app.schema.Vehicle import VehicleCreate
+from app.service.RouteService import RouteService
+from app.service.VehicleService import VehicleService
+
+
+EXPECTED_STATEMENTS = {"start": 1, "complete": 3, "versioned": 3}
+PAYLOAD = RouteComplete(distance_km=120.0, fuel_consumed=14.5, duration_minutes=95)
+
+_calls = threading.local()
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    # El NOTIFY de eventos viaja en la misma transacción pero no forma parte de la transición
+    if getattr(_calls, "active", False) and "pg_notify" not in statement:
+        _calls.statements += 1
+
+
+def attempt(action: Callable[[RouteService], object]) -> Tuple[int, int]:
+    _calls.active, _calls.statements = True, 0
+    try:
+        with SessionLocal() as db:
+            try:
+                action(RouteService(db))
+                code = 200
+            except HTTPException as error:
+                code = error.status_code
+    finally:
+        _calls.active = False
+    return code, _calls.statements
+
+
+def race(pool: ThreadPoolExecutor, concurrency: int, action: Callable[[RouteService], object]) -> List[Tuple[int, int]]:
+    barrier = threading.Barrier(concurrency)
+
+    def run() -> Tuple[int, int]:
+        barrier.wait()
+        return attempt(action)
+
+    return [future.result() for future in [pool.submit(run) for _ in range(concurrency)]]
+
+
+def bench_vehicle() -> int:
+    with SessionLocal() as db:
+        vehicle = db.scalar(select(Vehicle).where(Vehicle.plate_number == "BENCH-CAS"))
+        if vehicle is not None:
+            return vehicle.id
+        return VehicleService(db).create_vehicle(
+            VehicleCreate(plate_number="BENCH-CAS", brand="Bench", model="Transitions", year=2024)
+        ).id
+
+
+def create_routes(vehicle_id: int, count: int) -> List[int]:
+    with SessionLocal() as db:
+        service = RouteService(db)
+        return [
+            service.create_route(RouteCreate(vehicle_id=vehicle_id, origin="Puebla", destination="Toluca")).id
+            for _ in range(count)
+        ]
+
+
+def rollup_routes(vehicle_id: int) -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.coalesce(func.sum(VehicleDailyEfficiency.route_count), 0))
+            .where(VehicleDailyEfficiency.vehicle_id == vehicle_id)
+        )
+
+
+def run(args: argparse.Namespace) -> dict:
+    vehicle_id = bench_vehicle()
+    rollup_before = rollup_routes(vehicle_id)
+    scenarios: Dict[str, Callable[[int], Callable[[RouteService], object]]] = {
+        "start": lambda route_id: lambda service: service.update_route(
+            route_id, RouteUpdate(status=RouteStatus.IN_PROGRESS, version=service.get_route_by_id(route_id).version)
+        ),
+        "complete": lambda route_id: lambda service: service.complete_route(route_id, PAYLOAD),
+        "versioned": lambda route_id: lambda service: service.complete_route(
+            route_id, PAYLOAD, expected_version=service.get_route_by_id(route_id).version
+        ),
+    }
+
+    report = {}
+    violations = []
+    created: List[int] = []
+    completed: List[int] = []
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for name, build in scenarios.items():
+                route_ids = create_routes(vehicle_id, args.routes)
+                created += route_ids
+                codes: Counter = Counter()
+                winner_statements = defaultdict(int)
+                for route_id in route_ids:
+                    outcomes = race(pool, args.concurrency, build(route_id))
+                    codes.update(str(code) for code, _ in outcomes)
+                    winners = [statements for code, statements in outcomes if code == 200]
+                    if len(winners) != 1:
+                        violations.append(f"{name}: ruta {route_id} con {len(winners)} ganadores")
+                    for statements in winners:
+                        winner_statements[statements] += 1
+                        # La lectura previa de la versión no cuenta como parte de la transición
+                        if statements - (name in ("start", "versioned")) > EXPECTED_STATEMENTS[name]:
+                            violations.append(f"{name}: ruta {route_id} usó {statements} sentencias")
+                    losers = {code for code, _ in outcomes if code != 200}
+                    if losers - {400, 409}:
+                        violations.append(f"{name}: ruta {route_id} respondió {sorted(losers)}")
+                if name != "start":
+                    completed += route_ids
+                report[name] = {
+                    "routes": len(route_ids),
+                    "attempts": len(route_ids) * args.concurrency,
+                    "status_codes": dict(codes),
+                    "winner_statements": dict(winner_statements),
+                }
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    with SessionLocal() as db:
+        performances = db.scalar(
+            select(func.count()).select_from(Performance).where(Performance.route_id.in_(completed))
+        )
+    if performances != len(completed):
+        violations.append(f"{performances} performances para {len(completed)} rutas completadas")
+    rollup_delta = rollup_routes(vehicle_id) - rollup_before
+    if rollup_delta != len(completed):
+        violations.append(f"el rollup sumó {rollup_delta} rutas para {len(completed)} completadas")
+
+    if not args.keep:
+        with SessionLocal() as db:
+            service = RouteService(db)
+            for route_id in created:
+                service.delete_route(route_id)
+
+    return {
+        "database": engine.url.get_backend_name(),
+        "concurrency": args.concurrency,
+        "scenarios": report,
+        "violations": violations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.transitions", description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=50, help="Rutas por escenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Hilos que compiten por cada ruta")
+    parser.add_argument("--keep", action="store_true", help="No elimina las rutas creadas")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 1 if result["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())